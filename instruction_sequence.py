@@ -0,0 +1,159 @@
+import random
+
+from page_replacement_engine import FenwickTree
+
+
+# 指令序列生成 (无重复地址)
+# 空闲地址用树状数组维护，"在 m 之前/之后的空闲地址中随机取一个" 只需 O(log n)，
+# 整个序列 O(n log n) 生成，可用于 10^7 规模的地址空间。
+
+
+class FreeAddressPool:
+    """空闲地址集合，地址为 start, start+step, start+2*step, ... 共 count 个"""
+
+    def __init__(self, count, start=0, step=1):
+        self.count = count
+        self.start = start
+        self.step = step
+        self.free = bytearray(b'\x01') * count
+        self.tree = FenwickTree(count, fill=1)
+        self.remaining = count
+
+    def __len__(self):
+        return self.remaining
+
+    def _slot(self, addr):
+        offset = addr - self.start
+        if offset < 0 or offset % self.step:
+            return None
+        slot = offset // self.step
+        return slot if slot < self.count else None
+
+    def __contains__(self, addr):
+        slot = self._slot(addr)
+        return slot is not None and self.free[slot] == 1
+
+    def remove(self, addr):
+        slot = self._slot(addr)
+        self.free[slot] = 0
+        self.tree.add(slot, -1)
+        self.remaining -= 1
+
+    def _nth(self, n):
+        return self.start + self.step * self.tree.find_kth(n)
+
+    def _slots_below(self, addr):
+        """地址小于 addr 的位置数"""
+        return min(max(-(-(addr - self.start) // self.step), 0), self.count)
+
+    def count_below(self, addr):
+        slots = self._slots_below(addr)
+        return self.tree.prefix_sum(slots - 1) if slots else 0
+
+    def choice(self, rng=random):
+        """在所有空闲地址中随机取一个，集合为空时返回 None"""
+        if not self.remaining:
+            return None
+        return self._nth(rng.randrange(self.remaining))
+
+    def choice_below(self, addr, rng=random):
+        """在小于 addr 的空闲地址中随机取一个，没有时返回 None"""
+        below = self.count_below(addr)
+        if not below:
+            return None
+        return self._nth(rng.randrange(below))
+
+    def choice_above(self, addr, rng=random):
+        """在大于 addr 的空闲地址中随机取一个，没有时返回 None"""
+        not_above = self.count_below(addr + 1)
+        above = self.remaining - not_above
+        if above <= 0:
+            return None
+        return self._nth(not_above + rng.randrange(above))
+
+
+# 1. 上机实验5Gemini 的规则：~50% 顺序执行、~25% 前向跳转、~25% 后向跳转
+def generate_instruction_sequence(length=320, rng=random):
+    """生成地址 0..length-1 各出现一次的指令序列"""
+    if length <= 0:
+        return []
+
+    pool = FreeAddressPool(length)
+    sequence = []
+
+    start_addr = pool.choice(rng)
+    sequence.append(start_addr)
+    pool.remove(start_addr)
+
+    while len(pool):
+        last_instr = sequence[-1]
+        choice = rng.random()
+        next_addr = None
+
+        # 尝试顺序执行 (50% 概率)
+        if choice < 0.50 and last_instr + 1 in pool:
+            next_addr = last_instr + 1
+
+        # 尝试前向跳转 (25% 概率，顺序执行失败时也尝试)
+        if next_addr is None and choice < 0.75:
+            next_addr = pool.choice_below(last_instr, rng)
+
+        # 尝试后向跳转 (25% 概率 + 作为其他失败情况的备选)
+        if next_addr is None:
+            next_addr = pool.choice_above(last_instr, rng)
+
+        # 全局备选方案：从剩余的池中随机选一个
+        if next_addr is None:
+            next_addr = pool.choice(rng)
+
+        sequence.append(next_addr)
+        pool.remove(next_addr)
+
+    return sequence
+
+
+# 2. 上机实验5ds2 的规则：偶地址 m 顺序执行到 m+1，再跳到 m 之前的偶地址 m' 顺序执行到 m'+1，
+#    然后跳到 m' 之后的偶地址作为新的 m；每轮 4 条指令，不足部分用剩余地址随机补齐
+def generate_paired_instructions(length=320, rng=random):
+    """生成地址 0..length-1 各出现一次的指令序列"""
+    available = bytearray(b'\x01') * length
+    even_pool = FreeAddressPool((length + 1) // 2, step=2)
+    instructions = []
+
+    def take(addr):
+        instructions.append(addr)
+        available[addr] = 0
+        if addr % 2 == 0:
+            even_pool.remove(addr)
+
+    m = even_pool.choice(rng)
+    for _ in range(length // 4):
+        if m is None:
+            m = even_pool.choice(rng)
+            if m is None:
+                break
+
+        take(m)
+        if m + 1 < length and available[m + 1]:
+            take(m + 1)
+
+        m_prime = even_pool.choice_below(m, rng)
+        if m_prime is None:
+            m_prime = even_pool.choice(rng)
+            if m_prime is None:
+                break
+
+        take(m_prime)
+        if m_prime + 1 < length and available[m_prime + 1]:
+            take(m_prime + 1)
+
+        m = even_pool.choice_above(m_prime, rng)
+        if m is None:
+            m = even_pool.choice(rng)
+
+    if len(instructions) < length:
+        remaining = [addr for addr in range(length) if available[addr]]
+        rng.shuffle(remaining)
+        instructions.extend(remaining)
+
+    return instructions[:length]
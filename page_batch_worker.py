@@ -0,0 +1,64 @@
+import queue
+import threading
+
+
+# 批量运行的后台工作线程
+# 工作线程逐项计算结果并放入队列，界面线程用 after() 定时取出显示，
+# 计算过程中界面保持响应，并支持真正的暂停/继续和取消。
+
+POLL_INTERVAL_MS = 50
+
+
+class BatchWorker(threading.Thread):
+    """在后台线程中依次取出 results 中的每一项，通过队列交给界面线程
+
+    results 为可迭代对象 (通常是生成器)，每一项的计算都在工作线程中进行。
+    队列中的消息为 ('result', 项)、('error', 异常) 或 ('done', 是否被取消)。
+    """
+
+    def __init__(self, results):
+        super().__init__(daemon=True)
+        self.results = results
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+
+    @property
+    def paused(self):
+        return not self.resumed.is_set()
+
+    def pause(self):
+        self.resumed.clear()
+
+    def resume(self):
+        self.resumed.set()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.resumed.set()  # 暂停中的线程也要唤醒后才能退出
+
+    def run(self):
+        iterator = iter(self.results)
+        try:
+            while True:
+                self.resumed.wait()
+                if self.cancelled.is_set():
+                    break
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self.messages.put(('result', item))
+        except Exception as e:
+            self.messages.put(('error', e))
+        finally:
+            self.messages.put(('done', self.cancelled.is_set()))
+
+    def drain(self):
+        """不阻塞地取出当前队列中的全部消息"""
+        while True:
+            try:
+                yield self.messages.get_nowait()
+            except queue.Empty:
+                return
@@ -0,0 +1,257 @@
+import argparse
+import itertools
+import json
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import page_sweep
+
+
+# Belady 异常扫描：页框数增加时缺页次数反而增加
+# LRU、OPT 等栈算法不会出现 Belady 异常；FIFO、CLOCK、第二次机会等非栈算法可能出现。
+# 对每条页地址流计算相邻页框数的缺页次数，后者更多即为异常 (任意两个页框数之间的异常必然
+# 在某一对相邻页框数上体现)。发现异常后用增量删除 (delta debugging) 把页地址流缩到
+# 仍能复现该异常的最短形式，页号按首次出现的顺序重新编号，相同的最小轨迹只保存一次。
+# 随机扫描按种子分块交给多个进程，每完成一轮就把新发现写入 anomalies.jsonl，
+# 并把下一个种子写入 checkpoint.json，中断后再次运行从断点继续。
+
+ANOMALY_ALGORITHMS = ('FIFO', 'SECOND_CHANCE', 'CLOCK')
+ANOMALY_COLUMNS = ('source', 'algorithm', 'frames', 'more_frames', 'page_faults', 'more_page_faults', 'trace')
+CHECKPOINT_FILE = 'checkpoint.json'
+ANOMALIES_FILE = 'anomalies.jsonl'
+TRACES_DIR = 'traces'
+
+
+def random_trace(seed, length=20, page_count=5):
+    """均匀随机的短页地址流；页面少、序列短时异常最容易出现，也最容易缩小"""
+    rng = random.Random(seed)
+    return [rng.randrange(page_count) for _ in range(length)]
+
+
+def canonical(pages):
+    """按首次出现的顺序把页号重新编为 1, 2, 3, ..."""
+    labels = {}
+    return [labels.setdefault(page, len(labels) + 1) for page in pages]
+
+
+def fault_counts(pages, algorithm, frame_counts=None, **params):
+    """返回 {页框数: 缺页次数}；frame_counts 默认为 1 到不同页面数 (再多页框结果不变)"""
+    if frame_counts is None:
+        frame_counts = range(1, len(set(pages)) + 1)
+    frame_counts = sorted(frame_counts)
+    if not frame_counts:
+        return {}
+    return page_sweep.simulate_frame_counts(pages, algorithm, frame_counts, **params)
+
+
+def find_anomalies(pages, algorithm, frame_counts=None, **params):
+    """返回 [(页框数, 更多的页框数, 缺页次数, 更多页框时的缺页次数)]，按页框数排列"""
+    faults = fault_counts(pages, algorithm, frame_counts, **params)
+    frames = sorted(faults)
+    return [(small, large, faults[small], faults[large])
+            for small, large in zip(frames, frames[1:]) if faults[large] > faults[small]]
+
+
+def is_anomalous(pages, algorithm, small, large, **params):
+    if len(pages) <= small:
+        return False
+    faults = page_sweep.simulate_frame_counts(pages, algorithm, (small, large), **params)
+    return faults[large] > faults[small]
+
+
+def minimize_trace(pages, algorithm, small, large, **params):
+    """把页地址流缩到仍满足 (large 个页框的缺页次数 > small 个页框的缺页次数) 的最短形式
+
+    从一半长度开始逐段尝试删除，删不动时段长减半，直到删除任何一次访问都会使异常消失。
+    """
+    trace = list(pages)
+    chunk = max(1, len(trace) // 2)
+    while True:
+        removed = False
+        i = 0
+        while i < len(trace):
+            candidate = trace[:i] + trace[i + chunk:]
+            if is_anomalous(candidate, algorithm, small, large, **params):
+                trace = candidate
+                removed = True
+            else:
+                i += chunk
+        if chunk > 1:
+            chunk //= 2
+        elif not removed:
+            break
+    return canonical(trace)
+
+
+def _anomaly_records(source, pages, algorithms, frame_counts, params):
+    """对一条页地址流检查各算法，每个算法只缩小并报告第一处异常"""
+    records = []
+    for algorithm in algorithms:
+        anomalies = find_anomalies(pages, algorithm, frame_counts, **params.get(algorithm, {}))
+        if not anomalies:
+            continue
+        small, large, _, _ = anomalies[0]
+        trace = minimize_trace(pages, algorithm, small, large, **params.get(algorithm, {}))
+        faults = page_sweep.simulate_frame_counts(trace, algorithm, (small, large), **params.get(algorithm, {}))
+        records.append((source, algorithm, small, large, faults[small], faults[large], trace))
+    return records
+
+
+def _scan_seeds(task):
+    first_seed, count, algorithms, frame_counts, generator, generator_options, params = task
+    records = []
+    for seed in range(first_seed, first_seed + count):
+        pages = generator(seed, **generator_options)
+        records.extend(_anomaly_records(f"seed {seed}", pages, algorithms, frame_counts, params))
+    return records
+
+
+def _scan_trace(task):
+    import page_trace_io
+
+    path, page_size, fmt, algorithms, frame_counts, params = task
+    pages = array('q', page_trace_io.trace_pages(path, page_size, fmt))
+    return _anomaly_records(path, pages, algorithms, frame_counts, params)
+
+
+# 结果保存
+def save_trace(path, pages, comment=''):
+    """把页地址流写成文本轨迹 (每行一个页号)，可用 page_trace_io.read_trace 读回"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in comment.splitlines():
+            f.write(f"# {line}\n")
+        f.writelines(f"{page}\n" for page in pages)
+
+
+class AnomalyLog:
+    """output_dir 下的扫描结果：异常列表、最小轨迹文件和断点"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        os.makedirs(os.path.join(output_dir, TRACES_DIR), exist_ok=True)
+        self.seen = set()
+        path = os.path.join(output_dir, ANOMALIES_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.seen.add((record['algorithm'], record['frames'], record['more_frames'],
+                                   tuple(record['trace'])))
+
+    def add(self, records):
+        """记录新发现的异常，返回其中此前未出现过的条数"""
+        added = 0
+        with open(os.path.join(self.output_dir, ANOMALIES_FILE), 'a', encoding='utf-8') as f:
+            for record in records:
+                source, algorithm, small, large, faults, more_faults, trace = record
+                key = (algorithm, small, large, tuple(trace))
+                if key in self.seen:
+                    continue
+                self.seen.add(key)
+                added += 1
+                f.write(json.dumps(dict(zip(ANOMALY_COLUMNS, record)), ensure_ascii=False) + "\n")
+                name = f"{algorithm.lower()}_{small}_{large}_{len(self.seen)}.txt"
+                save_trace(os.path.join(self.output_dir, TRACES_DIR, name), trace,
+                           f"{algorithm}: {small} 个页框缺页 {faults} 次，{large} 个页框缺页 {more_faults} 次\n"
+                           f"来源: {source}")
+        return added
+
+    def load_checkpoint(self, default):
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return default
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['next_seed']
+
+    def save_checkpoint(self, next_seed):
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'next_seed': next_seed}, f)
+        os.replace(path + '.tmp', path)
+
+
+def scan_random(output_dir, start=0, stop=None, algorithms=ANOMALY_ALGORITHMS, frame_counts=None,
+                generator=None, generator_options=None, params=None, chunk_size=2000, max_workers=None,
+                progress=None):
+    """并行扫描种子 start..stop-1 生成的页地址流 (stop 为 None 时一直运行)，返回新发现的异常条数
+
+    generator(seed, **generator_options) 返回页地址流，默认为 random_trace，须为模块级函数以便传给子进程；
+    params 为 {算法名: 额外参数字典}；progress(下一个种子, 新发现条数) 在每轮结束后调用。
+    """
+    log = AnomalyLog(output_dir)
+    generator = generator or random_trace
+    generator_options = generator_options or {}
+    params = params or {}
+    workers = max_workers or os.cpu_count() or 1
+    seed = max(start, log.load_checkpoint(start))
+    found = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while stop is None or seed < stop:
+            # 每轮给每个进程几块，整轮完成后再写断点，保证断点之前的种子都已检查
+            tasks = []
+            for first in itertools.islice(itertools.count(seed, chunk_size), 4 * workers):
+                if stop is not None and first >= stop:
+                    break
+                count = chunk_size if stop is None else min(chunk_size, stop - first)
+                tasks.append((first, count, algorithms, frame_counts, generator, generator_options, params))
+            for records in executor.map(_scan_seeds, tasks):
+                found += log.add(records)
+            seed = tasks[-1][0] + tasks[-1][1]
+            log.save_checkpoint(seed)
+            if progress:
+                progress(seed, found)
+    return found
+
+
+def scan_traces(output_dir, paths, algorithms=ANOMALY_ALGORITHMS, frame_counts=None, page_size=1, fmt='auto',
+                params=None, max_workers=None):
+    """并行检查给定的轨迹文件，返回新发现的异常条数"""
+    log = AnomalyLog(output_dir)
+    tasks = [(path, page_size, fmt, algorithms, frame_counts, params or {}) for path in paths]
+    found = 0
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        for records in executor.map(_scan_trace, tasks):
+            found += log.add(records)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫描 FIFO 等非栈算法的 Belady 异常并保存最小复现轨迹")
+    parser.add_argument('traces', nargs='*', help="要检查的轨迹文件；不给出时扫描随机页地址流")
+    parser.add_argument('--output', default='belady', help="结果目录 (异常列表、最小轨迹、断点)")
+    parser.add_argument('--algorithms', default=','.join(ANOMALY_ALGORITHMS), help="逗号分隔的算法名")
+    parser.add_argument('--min-frames', type=int, default=1)
+    parser.add_argument('--max-frames', type=int, default=None, help="默认到不同页面数为止")
+    parser.add_argument('--start', type=int, default=0, help="随机扫描的起始种子")
+    parser.add_argument('--count', type=int, default=None, help="随机扫描的种子个数，默认一直运行")
+    parser.add_argument('--length', type=int, default=20, help="随机页地址流长度")
+    parser.add_argument('--pages', type=int, default=5, help="随机页地址流的不同页面数")
+    parser.add_argument('--page-size', type=int, default=1, help="轨迹文件每页包含的地址数")
+    parser.add_argument('--format', default='auto', help="轨迹文件格式")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    algorithms = tuple(name.strip().upper() for name in args.algorithms.split(',') if name.strip())
+    frame_counts = None
+    if args.max_frames is not None:
+        frame_counts = range(args.min_frames, args.max_frames + 1)
+    elif args.min_frames > 1:
+        parser.error("指定 --min-frames 时也要指定 --max-frames")
+
+    if args.traces:
+        found = scan_traces(args.output, args.traces, algorithms, frame_counts, args.page_size, args.format,
+                            max_workers=args.workers)
+    else:
+        stop = None if args.count is None else args.start + args.count
+        found = scan_random(args.output, args.start, stop, algorithms, frame_counts,
+                            generator_options={'length': args.length, 'page_count': args.pages},
+                            max_workers=args.workers,
+                            progress=lambda seed, total: print(f"已检查到种子 {seed}，新发现 {total} 条", flush=True))
+    print(f"新发现 {found} 条 Belady 异常，结果在 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+from array import array
+
+import page_replacement_engine as engine
+import page_sweep
+
+
+# 无界面的命令行入口：页地址流来自轨迹文件或随机种子，按算法 × 页框数计算缺页次数，
+# 结果写成 CSV、JSON Lines 或 Parquet，可在没有显示器的服务器上批量运行。
+# 本模块不导入 tkinter / matplotlib；只有用 --gui 打开图形界面时才导入对应的界面模块。
+# 轨迹文件按需读取：SHARDS 边读边采样，内存只与采样页面数有关；其他算法需要时才把页号流整条读入内存。
+#
+# 例：python page_cli.py --seeds 0-99 --policies FIFO,LRU,OPT --frames 4-32 -o result.csv
+#     python page_cli.py --trace app.u64.gz --page-size 4096 --frames 16-1024:16 -o result.parquet
+#     python page_cli.py --trace app.u64w.gz --rw --policies FIFO,LRU,CLEAN_CLOCK --frames 16-256:16
+#     python page_cli.py --trace app.u64.gz --page-sizes 512-65536 --frames 1-256 -o surface.csv
+#     python page_cli.py --gui ds2
+
+# hit_rate_error 为 SHARDS 估计的约 95% 误差上限，精确模拟的算法留空
+RESULT_COLUMNS = ('source', 'algorithm', 'frames', 'references', 'page_faults', 'hit_rate', 'hit_rate_error')
+# --rw 模式按轨迹中的读写标记模拟，多出脏页的写回次数
+RW_RESULT_COLUMNS = RESULT_COLUMNS + ('write_backs',)
+# --page-sizes 模式输出页面大小 × 页框数的命中率曲面 (见 page_sweep.page_size_surface)
+SURFACE_RESULT_COLUMNS = ('source', 'algorithm') + page_sweep.SURFACE_COLUMNS
+OUTPUT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}
+GUI_MODULES = {
+    'ds': '上机实验5ds',
+    'ds2': '上机实验5ds2',
+    'gemini': '上机实验5Gemini',
+    'doubao': '上机实验5豆包',
+}
+
+
+def parse_range(text):
+    """解析 '4-32'、'4-32:4'、'4,8,16' 及其组合 (如 '1-4,8')，返回去重排序后的整数列表"""
+    values = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        step = 1
+        if ':' in part:
+            part, step = part.split(':')
+            step = int(step)
+        if '-' in part:
+            first, last = part.split('-')
+            values.update(range(int(first), int(last) + 1, step))
+        else:
+            values.add(int(part))
+    return sorted(values)
+
+
+class TracePages:
+    """轨迹文件的页号流，每次迭代都重新读文件，不在内存中保存"""
+
+    def __init__(self, path, page_size=1, fmt='auto'):
+        self.path = path
+        self.page_size = page_size
+        self.fmt = fmt
+
+    def __iter__(self):
+        import page_trace_io
+
+        return page_trace_io.trace_pages(self.path, self.page_size, self.fmt)
+
+
+def page_streams(trace=None, seeds=(), page_size=None, fmt='auto', length=320):
+    """逐个产生 (来源, 页地址流)
+
+    trace 不为 None 时给出轨迹文件的 TracePages (page_size 为每页地址数，默认 1)；
+    否则按 seeds 中的每个种子用上机实验5Gemini的规则生成 length 条指令 (page_size 默认 10)。
+    """
+    if trace is not None:
+        yield trace, TracePages(trace, page_size or 1, fmt)
+        return
+    for seed in seeds:
+        instructions = page_sweep.default_generator(seed, length)
+        yield f"seed={seed}", array('i', (addr // (page_size or 10) for addr in instructions))
+
+
+def parse_page_sizes(text):
+    """解析页面大小：'4096,8192' 等逗号分隔的列表，或 '512-65536' 表示其间所有 2 的幂"""
+    if ',' not in text and ':' not in text and '-' in text:
+        first, last = (int(value) for value in text.split('-'))
+        sizes = []
+        size = 1
+        while size <= last:
+            if size >= first:
+                sizes.append(size)
+            size *= 2
+        return sizes
+    return parse_range(text)
+
+
+def address_streams(trace=None, seeds=(), fmt='auto', length=320):
+    """逐个产生 (来源, 地址流)：轨迹文件的原始地址 (不读入内存)，或按种子生成的指令地址"""
+    if trace is not None:
+        yield trace, TracePages(trace, 1, fmt)
+        return
+    for seed in seeds:
+        yield f"seed={seed}", array('i', page_sweep.default_generator(seed, length))
+
+
+def surface_rows(streams, algorithms, page_sizes, frame_counts, params=None):
+    """对每条地址流、每个算法求页面大小 × 页框数的命中率曲面，逐行产生按 SURFACE_RESULT_COLUMNS 排列的元组"""
+    params = params or {}
+    for source, addresses in streams:
+        for algorithm in algorithms:
+            for row in page_sweep.page_size_surface(addresses, page_sizes, frame_counts, algorithm,
+                                                    **params.get(algorithm, {})):
+                yield (source, algorithm) + row
+
+
+def rw_page_streams(trace, page_size=None, fmt='auto'):
+    """读出带读写标记的轨迹，返回 [(来源, 页地址流, 写标志)]
+
+    轨迹格式须带读写标记 (文本 R/W 标记、u32w、u64w)，否则在写出任何结果之前报错。
+    """
+    import page_trace_io
+
+    resolved = page_trace_io.detect_format(trace) if fmt == 'auto' else fmt
+    if resolved != 'text' and resolved not in page_trace_io.RW_FORMATS:
+        raise ValueError(f"{resolved} 格式的轨迹没有读写标记，--rw 需要文本 R/W 标记或 "
+                         f"{' / '.join(page_trace_io.RW_FORMATS)} 格式")
+    pages = array('q')
+    writes = bytearray()
+    for page, write in page_trace_io.trace_pages_rw(trace, page_size or 1, resolved):
+        pages.append(page)
+        writes.append(write)
+    return [(trace, pages, writes)]
+
+
+def rw_result_rows(streams, algorithms, frame_counts, params=None):
+    """按读写标记计算，逐行产生按 RW_RESULT_COLUMNS 排列的元组"""
+    params = params or {}
+    for source, pages, writes in streams:
+        references = len(pages)
+        for algorithm in algorithms:
+            results = page_sweep.simulate_frame_counts_rw(pages, writes, algorithm, frame_counts,
+                                                          **params.get(algorithm, {}))
+            for k in frame_counts:
+                faults, write_backs = results[k]
+                hit_rate = 1 - faults / references if references else 0.0
+                yield source, algorithm, k, references, faults, hit_rate, None, write_backs
+
+
+def result_rows(streams, algorithms, frame_counts, params=None):
+    """对每条页地址流、每个算法计算各页框数的结果，逐行产生按 RESULT_COLUMNS 排列的元组"""
+    params = params or {}
+    for source, pages in streams:
+        for algorithm in algorithms:
+            if algorithm == 'SHARDS':
+                # 一遍扫描的采样估计直接读页号流，轨迹文件不必整条读入内存
+                references, results = page_sweep.shards_frame_counts(pages, frame_counts, **params.get(algorithm, {}))
+            else:
+                if isinstance(pages, TracePages):
+                    pages = array('q', pages)
+                references = len(pages)
+                results = page_sweep.simulate_frame_counts_with_error(pages, algorithm, frame_counts,
+                                                                      **params.get(algorithm, {}))
+            for k in frame_counts:
+                faults, error = results[k]
+                if faults is None:
+                    hit_rate = None  # SHARDS 没有采样到页面
+                else:
+                    hit_rate = 1 - faults / references if references else 0.0
+                yield source, algorithm, k, references, faults, hit_rate, error
+
+
+# 输出
+def output_format(path, fmt=None):
+    if fmt:
+        return fmt
+    name = path[:-3] if path.endswith('.gz') else path
+    return OUTPUT_FORMATS.get(os.path.splitext(name)[1].lower(), 'csv')
+
+
+def write_csv(f, rows, columns=RESULT_COLUMNS):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row)
+
+
+def write_jsonl(f, rows, columns=RESULT_COLUMNS):
+    for row in rows:
+        f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+
+
+def write_parquet(path, rows, columns=RESULT_COLUMNS):
+    """Parquet 需要 pyarrow，只在选择该格式时导入"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("写 Parquet 文件需要安装 pyarrow") from e
+    values = [list(column) for column in zip(*rows)] or [[] for _ in columns]
+    pq.write_table(pa.table(dict(zip(columns, values))), path)
+
+
+def write_results(path, rows, fmt=None, columns=RESULT_COLUMNS):
+    """把结果行写到 path (为 None 或 '-' 时写到标准输出)；CSV 和 JSON Lines 边计算边写出"""
+    if path in (None, '-'):
+        fmt = fmt or 'csv'
+        if fmt == 'parquet':
+            raise ValueError("Parquet 不能写到标准输出，请用 -o 指定文件")
+        (write_csv if fmt == 'csv' else write_jsonl)(sys.stdout, rows, columns)
+        return
+    fmt = output_format(path, fmt)
+    if fmt == 'parquet':
+        write_parquet(path, rows, columns)
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        (write_csv if fmt == 'csv' else write_jsonl)(f, rows, columns)
+
+
+def launch_gui(name):
+    """导入并运行图形界面 (此时才导入 tkinter / matplotlib)"""
+    importlib.import_module(GUI_MODULES[name]).main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="页面置换算法的命令行模拟 (无需图形界面)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--trace', help="轨迹文件 (text / u32 / u64 等，可 gzip 压缩)")
+    source.add_argument('--seeds', default='0', help="随机种子，如 0 或 0-99，默认 0")
+    source.add_argument('--gui', choices=sorted(GUI_MODULES), help="打开图形界面而不做命令行计算")
+    parser.add_argument('--format', default='auto', help="轨迹格式，默认按扩展名判断")
+    parser.add_argument('--page-size', type=int, default=None,
+                        help="每页包含的地址数 (轨迹默认 1，随机指令序列默认 10)")
+    parser.add_argument('--length', type=int, default=320, help="随机指令序列长度")
+    parser.add_argument('--policies', default=None,
+                        help="逗号分隔的算法名，可含 SHARDS；默认为全部算法 (--rw 时为支持脏页的算法)")
+    parser.add_argument('--frames', default='4-32', help="页框数范围，如 4-32、16-1024:16、4,8,16")
+    parser.add_argument('--params', default=None,
+                        help='各算法的额外参数 (JSON)，如 \'{"LFU": {"tie_break": "fifo"}}\'')
+    parser.add_argument('--page-sizes', default=None,
+                        help="页面大小扫描：输出页面大小 × 页框数的命中率曲面，如 512-65536 (其间 2 的幂) 或 10,20,40")
+    parser.add_argument('--rw', action='store_true',
+                        help="按轨迹中的读写标记模拟 (文本 R/W 标记或 u32w/u64w)，输出脏页写回次数")
+    parser.add_argument('-o', '--output', default=None, help="输出文件，默认写到标准输出 (CSV)")
+    parser.add_argument('--output-format', choices=('csv', 'jsonl', 'parquet'), default=None,
+                        help="输出格式，默认按输出文件扩展名判断")
+    args = parser.parse_args(argv)
+
+    if args.gui:
+        launch_gui(args.gui)
+        return
+
+    policies = args.policies or ','.join(page_sweep.RW_ALGORITHMS if args.rw else engine.ALGORITHMS)
+    algorithms = [name.strip().upper() for name in policies.split(',') if name.strip()]
+    unknown = [name for name in algorithms if name not in engine.POLICIES and name not in ('OPT', 'SHARDS')]
+    if unknown:
+        parser.error(f"未知的算法: {', '.join(unknown)}")
+    page_sizes = None
+    if args.page_sizes is not None:
+        if args.rw or args.page_size is not None:
+            parser.error("--page-sizes 不能与 --rw 或 --page-size 同时使用")
+        if 'SHARDS' in algorithms:
+            parser.error("--page-sizes 不支持 SHARDS")
+        page_sizes = parse_page_sizes(args.page_sizes)
+        if not page_sizes:
+            parser.error("没有可用的页面大小 (范围写法只取其间 2 的幂)")
+        if page_sizes[0] < 1:
+            parser.error("页面大小必须为正整数")
+    if args.rw:
+        if args.trace is None:
+            parser.error("--rw 需要用 --trace 指定带读写标记的轨迹文件")
+        no_dirty = [name for name in algorithms if name not in page_sweep.RW_ALGORITHMS]
+        if no_dirty:
+            parser.error(f"{', '.join(no_dirty)} 不记录脏页，--rw 可用的算法: {', '.join(page_sweep.RW_ALGORITHMS)}")
+    frame_counts = parse_range(args.frames)
+    if not frame_counts or frame_counts[0] < 1:
+        parser.error("页框数必须为正整数")
+    params = {name.upper(): value for name, value in json.loads(args.params).items()} if args.params else {}
+
+    try:
+        if page_sizes is not None:
+            streams = address_streams(args.trace, parse_range(args.seeds), args.format, args.length)
+            write_results(args.output, surface_rows(streams, algorithms, page_sizes, frame_counts, params),
+                          args.output_format, SURFACE_RESULT_COLUMNS)
+        elif args.rw:
+            rows = rw_result_rows(rw_page_streams(args.trace, args.page_size, args.format), algorithms, frame_counts,
+                                  params)
+            write_results(args.output, rows, args.output_format, RW_RESULT_COLUMNS)
+        else:
+            streams = page_streams(args.trace, parse_range(args.seeds), args.page_size, args.format, args.length)
+            write_results(args.output, result_rows(streams, algorithms, frame_counts, params), args.output_format)
+    except (ImportError, ValueError) as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+import argparse
+import csv
+import importlib
+import random
+import time
+
+import instruction_sequence
+import page_replacement_engine as engine
+
+
+# 差分测试：四个实验模块 (上机实验5ds、5ds2、5Gemini、5豆包) 中的 FIFO/LRU/OPT/LFU 与引擎逐次对比
+# FIFO、LRU 仍直接调用各模块中的实现；OPT、LFU 在各模块中已改用引擎，原来的逐次扫描实现收在
+# 本模块中 (reference_*)，作为引擎的参照。引擎的其他执行路径 (游程压缩、栈距离、NumPy) 也一并对比。
+# 各实现的淘汰规则并不相同，尤其是 LFU 次数相同时淘汰谁：ds/ds2 按老化计数淘汰最久未访问的，
+# Gemini 按 (次数, 装入时间) 淘汰最早装入的，豆包按 (次数, 最后使用时间) 淘汰最久未使用的。
+# 每个实现登记它应当等价的引擎配置，比较命中/缺页序列，报告第一处不一致的位置和不一致的次数；
+# 另给出各实现的吞吐量 (每秒处理的访问次数)。
+# 已知的不一致：ds/ds2 原来的 LFU 用 `if page_to_remove` 判断是否已选出页面，把页 0 当作未选出，
+# 页 0 参与次数相同的比较时会淘汰错页面；改为 `is not None` 后与引擎 (tie_break='lru') 完全一致。
+# 实验模块导入时会导入 tkinter，无法导入的模块跳过并在结果中注明。
+
+DIVERGENCE_COLUMNS = ('implementation', 'algorithm', 'trace', 'frames', 'first_index', 'mismatches',
+                      'page_faults', 'expected_page_faults')
+THROUGHPUT_COLUMNS = ('implementation', 'algorithm', 'references', 'seconds', 'references_per_second')
+DEFAULT_FRAME_COUNTS = (1, 2, 3, 4, 8, 16)
+
+
+# 1. 原来的逐次扫描实现 (OPT、LFU) 及 2Q 的参照实现
+def reference_ds_opt(page_stream, memory_size):
+    """上机实验5ds / 5ds2 原来的 OPT：逐个驻留页面向后扫描下一次访问位置"""
+    memory = set()
+    hit_miss_sequence = []
+
+    for i, page in enumerate(page_stream):
+        if page not in memory:
+            hit_miss_sequence.append('M')
+            if len(memory) == memory_size:
+                farthest_use = -1
+                page_to_remove = None
+
+                for mem_page in memory:
+                    found = False
+                    for j in range(i + 1, len(page_stream)):
+                        if page_stream[j] == mem_page:
+                            if j > farthest_use:
+                                farthest_use = j
+                                page_to_remove = mem_page
+                            found = True
+                            break
+
+                    if not found:
+                        page_to_remove = mem_page
+                        break
+
+                if page_to_remove is not None:
+                    memory.remove(page_to_remove)
+                else:
+                    memory.remove(next(iter(memory)))
+
+            memory.add(page)
+        else:
+            hit_miss_sequence.append('H')
+
+    return hit_miss_sequence
+
+
+def reference_ds_lfu(page_stream, memory_size):
+    """上机实验5ds / 5ds2 原来的 LFU：每次访问给其他页面的老化计数加 1，次数相同淘汰老化计数最大的"""
+    memory = {}
+    hit_miss_sequence = []
+
+    for page in page_stream:
+        for mem_page in memory:
+            if mem_page != page:
+                memory[mem_page] = (memory[mem_page][0], memory[mem_page][1] + 1)
+
+        if page not in memory:
+            hit_miss_sequence.append('M')
+            if len(memory) == memory_size:
+                min_freq = float('inf')
+                page_to_remove = None
+
+                for mem_page, (freq, age) in memory.items():
+                    if freq < min_freq or (
+                            freq == min_freq and age > (memory[page_to_remove][1] if page_to_remove else 0)):
+                        min_freq = freq
+                        page_to_remove = mem_page
+
+                if page_to_remove is not None:
+                    del memory[page_to_remove]
+
+            memory[page] = [1, 0]
+        else:
+            hit_miss_sequence.append('H')
+            memory[page] = [memory[page][0] + 1, 0]
+
+    return hit_miss_sequence
+
+
+def reference_gemini_opt(page_stream, frame_count):
+    """上机实验5Gemini 原来的 OPT：对每个驻留页面在剩余序列中查找下一次访问"""
+    memory = []
+    hit_miss_sequence = []
+
+    for i, page in enumerate(page_stream):
+        if page not in memory:
+            if len(memory) < frame_count:
+                memory.append(page)
+            else:
+                future_uses = {}
+                for mem_page in memory:
+                    try:
+                        next_use_index = page_stream[i + 1:].index(mem_page)
+                        future_uses[mem_page] = next_use_index
+                    except ValueError:
+                        future_uses[mem_page] = float('inf')
+
+                page_to_replace = max(future_uses, key=future_uses.get)
+                memory[memory.index(page_to_replace)] = page
+            hit_miss_sequence.append('MISS')
+        else:
+            hit_miss_sequence.append('HIT')
+
+    return hit_miss_sequence
+
+
+def reference_gemini_lfu(page_stream, frame_count):
+    """上机实验5Gemini 原来的 LFU：按 (次数, 装入时间) 淘汰"""
+    memory = {}  # page -> [frequency, entry_time]
+    hit_miss_sequence = []
+
+    for t, page in enumerate(page_stream):
+        if page in memory:
+            memory[page][0] += 1
+            hit_miss_sequence.append('HIT')
+        else:
+            if len(memory) < frame_count:
+                memory[page] = [1, t]
+            else:
+                lfu_page = min(memory.keys(), key=lambda p: (memory[p][0], memory[p][1]))
+                del memory[lfu_page]
+                memory[page] = [1, t]
+            hit_miss_sequence.append('MISS')
+
+    return hit_miss_sequence
+
+
+def reference_doubao_opt(page_stream, frame_count):
+    """上机实验5豆包 原来的 OPT：用 list.index 查找下一次访问"""
+    frames = []
+    hit_miss = []
+
+    for i in range(len(page_stream)):
+        page = page_stream[i]
+        if page in frames:
+            hit_miss.append(True)
+        else:
+            hit_miss.append(False)
+            if len(frames) >= frame_count:
+                farthest = -1
+                victim = None
+                for f in frames:
+                    try:
+                        pos = page_stream.index(f, i + 1)
+                    except ValueError:
+                        pos = float('inf')
+                    if pos > farthest:
+                        farthest = pos
+                        victim = f
+                frames.remove(victim)
+            frames.append(page)
+
+    return hit_miss
+
+
+def reference_doubao_lfu(page_stream, frame_count):
+    """上机实验5豆包 原来的 LFU：按 (次数, 最后使用时间) 淘汰"""
+    frames = {}  # {页面: (访问次数, 最后使用时间)}
+    hit_miss = []
+    time = 0
+
+    for page in page_stream:
+        time += 1
+        if page in frames:
+            count, _ = frames[page]
+            frames[page] = (count + 1, time)
+            hit_miss.append(True)
+        else:
+            hit_miss.append(False)
+            if len(frames) >= frame_count:
+                victim = min(frames.items(), key=lambda x: (x[1][0], x[1][1]))[0]
+                del frames[victim]
+            frames[page] = (1, time)
+
+    return hit_miss
+
+
+def reference_two_queue(page_stream, frame_count, in_ratio=0.25, out_ratio=0.5):
+    """按 Johnson & Shasha 的伪代码直接用列表实现的 2Q (完整版)，作为引擎 TwoQueuePolicy 的参照
+
+    列表头部为最早进入的页；A1out 中再次访问的页先从 A1out 中取出，再腾出页框放入 Am。
+    """
+    kin = max(1, int(frame_count * in_ratio))
+    kout = max(1, int(frame_count * out_ratio))
+    a1in, a1out, am = [], [], []
+    hit_miss = []
+
+    for page in page_stream:
+        if page in am:
+            am.remove(page)
+            am.append(page)
+            hit_miss.append(True)
+            continue
+        if page in a1in:
+            hit_miss.append(True)
+            continue
+
+        hit_miss.append(False)
+        remembered = page in a1out
+        if remembered:
+            a1out.remove(page)
+        # reclaimfor：没有空闲页框时，A1in 超过 Kin (或 Am 为空) 则从 A1in 淘汰并记入 A1out，否则从 Am 淘汰
+        if len(a1in) + len(am) >= frame_count:
+            if len(a1in) > kin or not am:
+                a1out.append(a1in.pop(0))
+                if len(a1out) > kout:
+                    a1out.pop(0)
+            else:
+                am.pop(0)
+        (am if remembered else a1in).append(page)
+
+    return hit_miss
+
+
+# 2. 被测实现
+# 每项为 (名称, 算法, 应当等价的引擎参数, 加载函数)；加载函数返回 f(页地址流, 页框数) -> 命中/缺页序列
+def _simulator_method(module_name, method):
+    def load():
+        simulator = importlib.import_module(module_name).PageReplacementSimulator()
+
+        def run(page_stream, frame_count):
+            simulator.page_stream = page_stream
+            return getattr(simulator, method)(frame_count)[1]
+        return run
+    return load
+
+
+def _module_function(module_name, function, result_index):
+    def load():
+        f = getattr(importlib.import_module(module_name), function)
+        return lambda page_stream, frame_count: f(page_stream, frame_count)[result_index]
+    return load
+
+
+def _engine_runs(algorithm, params):
+    def run(page_stream, frame_count):
+        runs = engine.run_lengths(page_stream)
+        if algorithm == 'OPT':
+            return engine.simulate_opt_runs(runs, frame_count)[1]
+        return engine.run_policy_runs(engine.make_policy(algorithm, frame_count, **params), runs)[1]
+    return lambda: run
+
+
+def _engine_stack_distance():
+    return lambda page_stream, frame_count: engine.lru_hit_miss(engine.lru_stack_distances(page_stream), frame_count)
+
+
+def _arrays(algorithm, params):
+    def load():
+        arrays = importlib.import_module('page_stream_arrays')
+
+        def run(page_stream, frame_count):
+            pages = arrays.convert_to_page_stream(page_stream, 1)
+            if algorithm == 'OPT':
+                return arrays.simulate_opt(pages, frame_count)[1]
+            if algorithm == 'LRU':
+                return arrays.lru_hit_miss(arrays.lru_stack_distances(pages), frame_count)
+            return arrays.run_policy(engine.make_policy(algorithm, frame_count, **params), pages)[1]
+        return run
+    return load
+
+
+IMPLEMENTATIONS = [
+    ('ds.fifo', 'FIFO', {}, _simulator_method('上机实验5ds', 'fifo_algorithm')),
+    ('ds2.fifo', 'FIFO', {}, _simulator_method('上机实验5ds2', 'fifo_algorithm')),
+    ('gemini.fifo', 'FIFO', {}, _module_function('上机实验5Gemini', 'simulate_fifo', 1)),
+    ('doubao.fifo', 'FIFO', {}, _module_function('上机实验5豆包_core', 'fifo', 1)),
+    ('engine.runs', 'FIFO', {}, _engine_runs('FIFO', {})),
+    ('arrays', 'FIFO', {}, _arrays('FIFO', {})),
+
+    ('ds.lru', 'LRU', {}, _simulator_method('上机实验5ds', 'lru_algorithm')),
+    ('ds2.lru', 'LRU', {}, _simulator_method('上机实验5ds2', 'lru_algorithm')),
+    ('gemini.lru', 'LRU', {}, _module_function('上机实验5Gemini', 'simulate_lru', 1)),
+    ('doubao.lru', 'LRU', {}, _module_function('上机实验5豆包_core', 'lru', 1)),
+    ('engine.runs', 'LRU', {}, _engine_runs('LRU', {})),
+    ('engine.stack_distance', 'LRU', {}, _engine_stack_distance),
+    ('arrays.stack_distance', 'LRU', {}, _arrays('LRU', {})),
+
+    ('ds/ds2.opt (原实现)', 'OPT', {}, lambda: reference_ds_opt),
+    ('gemini.opt (原实现)', 'OPT', {}, lambda: reference_gemini_opt),
+    ('doubao.opt (原实现)', 'OPT', {}, lambda: reference_doubao_opt),
+    ('ds2.opt', 'OPT', {}, _simulator_method('上机实验5ds2', 'opt_algorithm')),
+    ('gemini.opt', 'OPT', {}, _module_function('上机实验5Gemini', 'simulate_opt', 1)),
+    ('engine.runs', 'OPT', {}, _engine_runs('OPT', {})),
+    ('arrays', 'OPT', {}, _arrays('OPT', {})),
+
+    ('ds/ds2.lfu (原实现)', 'LFU', {'tie_break': 'lru'}, lambda: reference_ds_lfu),
+    ('gemini.lfu (原实现)', 'LFU', {'tie_break': 'fifo'}, lambda: reference_gemini_lfu),
+    ('doubao.lfu (原实现)', 'LFU', {'tie_break': 'lru'}, lambda: reference_doubao_lfu),
+    ('ds2.lfu', 'LFU', {'tie_break': 'lru'}, _simulator_method('上机实验5ds2', 'lfu_algorithm')),
+    ('gemini.lfu', 'LFU', {'tie_break': 'fifo'}, _module_function('上机实验5Gemini', 'simulate_lfu', 1)),
+    ('doubao.lfu', 'LFU', {'tie_break': 'lru'}, _module_function('上机实验5豆包_core', 'lfu', 1)),
+    ('engine.runs', 'LFU', {'tie_break': 'lru'}, _engine_runs('LFU', {'tie_break': 'lru'})),
+    ('engine.runs.fifo', 'LFU', {'tie_break': 'fifo'}, _engine_runs('LFU', {'tie_break': 'fifo'})),
+    ('arrays', 'LFU', {'tie_break': 'lru'}, _arrays('LFU', {'tie_break': 'lru'})),
+
+    ('2q (参照实现)', '2Q', {}, lambda: reference_two_queue),
+    ('engine.runs', '2Q', {}, _engine_runs('2Q', {})),
+]
+
+
+def expected_hits(algorithm, page_stream, frame_count, **params):
+    """引擎给出的命中/缺页序列 (bytearray)"""
+    if algorithm == 'OPT':
+        return engine.simulate_opt(page_stream, frame_count)[1]
+    return engine.run_policy(engine.make_policy(algorithm, frame_count, **params), page_stream)[1]
+
+
+def as_hits(sequence):
+    """把各实现的命中/缺页序列 ('H'/'M'、'HIT'/'MISS'、True/False、0/1) 统一为 bytearray"""
+    return bytearray(item in ('H', 'HIT') if isinstance(item, str) else bool(item) for item in sequence)
+
+
+def load_implementations(implementations=None):
+    """加载各实现，返回 ([(名称, 算法, 引擎参数, 函数)], [(名称, 无法加载的原因)])"""
+    loaded = []
+    skipped = []
+    for name, algorithm, params, loader in implementations or IMPLEMENTATIONS:
+        try:
+            loaded.append((name, algorithm, params, loader()))
+        except ImportError as e:
+            skipped.append((name, str(e)))
+    return loaded, skipped
+
+
+# 3. 测试用的页地址流
+def random_traces(seeds=range(20), length=320):
+    """随机页地址流：各实验的指令生成规则以及均匀随机的小页面集合"""
+    for seed in seeds:
+        rng = random.Random(seed)
+        yield f"gemini seed={seed}", [a // 10 for a in instruction_sequence.generate_instruction_sequence(length, rng)]
+        yield f"paired seed={seed}", [a // 10 for a in instruction_sequence.generate_paired_instructions(length, rng)]
+        page_count = rng.choice((3, 5, 8, 16))
+        yield f"uniform{page_count} seed={seed}", [rng.randrange(page_count) for _ in range(length)]
+
+
+def adversarial_traces():
+    """针对淘汰规则差异构造的页地址流"""
+    yield 'belady', [1, 2, 3, 4, 1, 2, 5, 1, 2, 3, 4, 5]
+    yield 'same page', [0] * 50
+    for n in (3, 5, 9, 17):
+        yield f"loop{n}", list(range(n)) * 8
+        yield f"zigzag{n}", (list(range(n)) + list(range(n - 1, -1, -1))) * 4
+    # 热点页与长扫描交替：LRU/FIFO 被扫描冲掉热点，LFU 保留热点
+    yield 'hot+scan', [p for i in range(40) for p in (0, 1, 100 + i)]
+    # 所有页面访问次数相同：LFU 完全由次数相同时的规则决定，页 0 参与其中
+    yield 'equal counts', [p for _ in range(6) for p in (0, 1, 2, 3, 4, 5)] + [6, 0, 7, 1, 8, 2]
+    # 早期高频、之后不再访问的页：LFU 把它一直留在内存中
+    yield 'stale frequent', [9] * 20 + [p for _ in range(10) for p in (0, 1, 2, 3)]
+    # 页 0 的次数与其他页相同且最久未访问
+    yield 'page 0 tie', [0, 1, 2, 1, 2, 0, 3, 4, 3, 4, 5, 0, 5, 6]
+
+
+def differential(traces, frame_counts=DEFAULT_FRAME_COUNTS, implementations=None):
+    """对比各实现与引擎，返回 (不一致记录列表 (按 DIVERGENCE_COLUMNS 排列), 对比次数, 跳过的实现)"""
+    loaded, skipped = load_implementations(implementations)
+    divergences = []
+    comparisons = 0
+    for trace_name, pages in traces:
+        for k in frame_counts:
+            expected = {}
+            for name, algorithm, params, run in loaded:
+                key = (algorithm, tuple(sorted(params.items())))
+                if key not in expected:
+                    expected[key] = expected_hits(algorithm, pages, k, **params)
+                reference = expected[key]
+                hits = as_hits(run(list(pages), k))
+                comparisons += 1
+                if hits == reference:
+                    continue
+                mismatches = [i for i, (a, b) in enumerate(zip(hits, reference)) if a != b]
+                first = mismatches[0] if mismatches else min(len(hits), len(reference))
+                divergences.append((name, algorithm, trace_name, k, first,
+                                    len(mismatches) + abs(len(hits) - len(reference)),
+                                    hits.count(0), reference.count(0)))
+    return divergences, comparisons, skipped
+
+
+# 4. 吞吐量
+def throughput(length=2000, frame_count=8, seed=0, min_seconds=0.2, implementations=None):
+    """在同一页地址流上测各实现的吞吐量，返回按 THROUGHPUT_COLUMNS 排列的结果行
+
+    每个实现重复运行直到累计用时不少于 min_seconds；引擎本身 ('engine') 作为对照也列出。
+    """
+    pages = [a // 10 for a in instruction_sequence.generate_instruction_sequence(length, random.Random(seed))]
+    loaded, _ = load_implementations(implementations)
+    for algorithm in ('FIFO', 'LRU', 'OPT', 'LFU'):
+        params = {'tie_break': 'lru'} if algorithm == 'LFU' else {}
+        loaded.append(('engine', algorithm, params,
+                       lambda page_stream, k, algorithm=algorithm, params=params:
+                       expected_hits(algorithm, page_stream, k, **params)))
+
+    rows = []
+    for name, algorithm, params, run in loaded:
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            run(list(pages), frame_count)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+        references = runs * len(pages)
+        rows.append((name, algorithm + (f" ({params['tie_break']})" if params else ''), references,
+                     round(elapsed, 4), round(references / elapsed)))
+    return rows
+
+
+def format_divergences(divergences, comparisons, skipped):
+    """按实现汇总不一致记录，每个实现给出一个例子"""
+    lines = [f"对比 {comparisons} 次，不一致 {len(divergences)} 次"]
+    for name, reason in skipped:
+        lines.append(f"  跳过 {name}: {reason}")
+    summary = {}
+    for record in divergences:
+        summary.setdefault((record[0], record[1]), []).append(record)
+    for (name, algorithm), records in summary.items():
+        _, _, trace, k, first, mismatches, faults, expected = records[0]
+        lines.append(f"  {name:<22}{algorithm:<6}不一致 {len(records):>4} 次，例：{trace}，{k} 个页框，"
+                     f"第 {first} 次访问起，{mismatches} 处不同，缺页 {faults} / 引擎 {expected}")
+    return "\n".join(lines)
+
+
+def format_throughput(rows):
+    lines = ["{:<24}{:<14}{:>16}".format('implementation', 'algorithm', 'references/s')]
+    for name, algorithm, _, _, rate in rows:
+        lines.append(f"{name:<24}{algorithm:<14}{rate:>16,}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FIFO/LRU/OPT/LFU 各实现与引擎的差分测试及吞吐量对比")
+    parser.add_argument('--seeds', type=int, default=20, help="随机页地址流的种子个数")
+    parser.add_argument('--length', type=int, default=320, help="随机页地址流长度")
+    parser.add_argument('--frames', default=','.join(map(str, DEFAULT_FRAME_COUNTS)), help="逗号分隔的页框数")
+    parser.add_argument('--throughput-length', type=int, default=2000, help="吞吐量测试的页地址流长度，0 为不测")
+    parser.add_argument('--csv', help="把不一致记录写成 CSV")
+    args = parser.parse_args(argv)
+
+    frame_counts = [int(k) for k in args.frames.split(',') if k.strip()]
+    traces = list(random_traces(range(args.seeds), args.length)) + list(adversarial_traces())
+    divergences, comparisons, skipped = differential(traces, frame_counts)
+    print(format_divergences(divergences, comparisons, skipped))
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(DIVERGENCE_COLUMNS)
+            writer.writerows(divergences)
+    if args.throughput_length:
+        print()
+        print(format_throughput(throughput(args.throughput_length)))
+
+
+if __name__ == "__main__":
+    main()
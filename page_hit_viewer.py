@@ -0,0 +1,209 @@
+import tkinter as tk
+from tkinter import ttk
+
+import page_replacement_engine as engine
+
+
+# 虚拟化的命中/缺页序列查看器
+# 只绘制当前可见的几行，数据直接取自页地址流和命中数组，百万级访问也不会拖慢界面。
+# 顶部的概览条按 (命中/缺页, 连续次数) 游程汇总，颜色越红表示该段缺页越多，点击可跳转。
+
+
+class HitMissViewer(ttk.Frame):
+    """命中/缺页序列查看器
+
+    set_trace(pages, hits, snapshot) 设置要显示的序列：
+    pages 为页地址流，hits 为命中数组 (1=命中, 0=缺页)，
+    snapshot(index) 返回第 index 次访问之后驻留的页面，用于点击或跳转时显示内存快照。
+    """
+
+    CELL_WIDTH = 44
+    ROW_HEIGHT = 34
+    GUTTER = 70
+    OVERVIEW_HEIGHT = 16
+    HIT_COLOR = "#c8ecc8"
+    MISS_COLOR = "#f4c2c2"
+    SELECTED_COLOR = "#ffe08a"
+
+    def __init__(self, master, labels=('M', 'H'), **kwargs):
+        super().__init__(master, **kwargs)
+        self.labels = labels
+        self.pages = []
+        self.hits = bytearray()
+        self.snapshot = None
+        self.runs = []
+        self.first_row = 0
+        self.selected = None
+
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill=tk.X)
+        ttk.Label(control_frame, text="跳转到第").pack(side=tk.LEFT)
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(control_frame, textvariable=self.jump_var, width=10)
+        jump_entry.pack(side=tk.LEFT, padx=2)
+        jump_entry.bind('<Return>', lambda event: self.jump_from_entry())
+        ttk.Label(control_frame, text="次访问").pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="跳转", command=self.jump_from_entry).pack(side=tk.LEFT, padx=5)
+        self.snapshot_var = tk.StringVar(value="点击某次访问查看当时驻留的页面")
+        ttk.Label(control_frame, textvariable=self.snapshot_var).pack(side=tk.LEFT, padx=10)
+
+        self.overview = tk.Canvas(self, height=self.OVERVIEW_HEIGHT, highlightthickness=0, background="white")
+        self.overview.pack(fill=tk.X, pady=2)
+        self.overview.bind('<Configure>', lambda event: self.draw_overview())
+        self.overview.bind('<Button-1>', self.on_overview_click)
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(body, highlightthickness=0, background="white")
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<Button-1>', self.on_cell_click)
+        self.canvas.bind('<MouseWheel>', lambda event: self.scroll_rows(-1 if event.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda event: self.scroll_rows(-1))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll_rows(1))
+
+    # 数据
+    def set_trace(self, pages, hits, snapshot=None):
+        self.pages = pages
+        self.hits = hits
+        self.snapshot = snapshot
+        self.runs = engine.run_lengths(hits)
+        self.first_row = 0
+        self.selected = None
+        self.snapshot_var.set("点击某次访问查看当时驻留的页面")
+        self.draw_overview()
+        self.redraw()
+
+    def columns(self):
+        return max(1, (self.canvas.winfo_width() - self.GUTTER) // self.CELL_WIDTH)
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def total_rows(self):
+        return -(-len(self.hits) // self.columns())
+
+    # 滚动
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to_row(int(float(amount) * self.total_rows()))
+        elif unit == 'pages':
+            self.scroll_rows(int(amount) * self.visible_rows())
+        else:
+            self.scroll_rows(int(amount))
+
+    def scroll_rows(self, delta):
+        self.scroll_to_row(self.first_row + delta)
+
+    def scroll_to_row(self, row):
+        last_first_row = max(0, self.total_rows() - self.visible_rows())
+        self.first_row = min(max(row, 0), last_first_row)
+        self.redraw()
+
+    # 绘制
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        total = len(self.hits)
+        total_rows = self.total_rows()
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+
+        columns = self.columns()
+        rows = self.visible_rows()
+        first = self.first_row * columns
+        last = min(total, (self.first_row + rows) * columns)
+        miss_label, hit_label = self.labels
+        for index in range(first, last):
+            row, col = divmod(index - first, columns)
+            x = self.GUTTER + col * self.CELL_WIDTH
+            y = row * self.ROW_HEIGHT
+            if col == 0:
+                canvas.create_text(self.GUTTER - 6, y + self.ROW_HEIGHT // 2, text=str(index), anchor='e',
+                                   fill="gray40")
+            hit = self.hits[index]
+            if index == self.selected:
+                color = self.SELECTED_COLOR
+            else:
+                color = self.HIT_COLOR if hit else self.MISS_COLOR
+            canvas.create_rectangle(x + 1, y + 1, x + self.CELL_WIDTH - 1, y + self.ROW_HEIGHT - 1,
+                                    fill=color, outline="")
+            canvas.create_text(x + self.CELL_WIDTH // 2, y + 10, text=str(self.pages[index]))
+            canvas.create_text(x + self.CELL_WIDTH // 2, y + 24, text=hit_label if hit else miss_label,
+                               fill="gray25", font=("Courier", 8))
+
+        self.scrollbar.set(self.first_row / total_rows, min(1.0, (self.first_row + rows) / total_rows))
+
+    def draw_overview(self):
+        """按游程汇总画出整条序列的缺页分布"""
+        overview = self.overview
+        overview.delete('all')
+        total = len(self.hits)
+        width = overview.winfo_width()
+        if not total or width <= 1:
+            return
+
+        # 每个像素列统计落在其中的缺页次数，跨列的游程按比例拆分
+        misses = [0.0] * width
+        position = 0
+        scale = width / total
+        for hit, count in self.runs:
+            if not hit:
+                start = position * scale
+                end = (position + count) * scale
+                col = int(start)
+                while col < width and col < end:
+                    misses[col] += (min(end, col + 1) - max(start, col)) / scale
+                    col += 1
+            position += count
+
+        per_column = total / width
+        for col, miss_count in enumerate(misses):
+            ratio = min(1.0, miss_count / per_column)
+            shade = int(255 * (1 - ratio))
+            overview.create_line(col, 0, col, self.OVERVIEW_HEIGHT, fill=f"#ff{shade:02x}{shade:02x}")
+
+    # 交互
+    def on_overview_click(self, event):
+        if len(self.hits):
+            self.jump_to(int(event.x / max(1, self.overview.winfo_width()) * len(self.hits)))
+
+    def on_cell_click(self, event):
+        if event.x < self.GUTTER:
+            return
+        col = (event.x - self.GUTTER) // self.CELL_WIDTH
+        columns = self.columns()
+        if col >= columns:
+            return
+        index = (self.first_row + event.y // self.ROW_HEIGHT) * columns + col
+        if index < len(self.hits):
+            self.select(index)
+
+    def jump_from_entry(self):
+        try:
+            index = int(self.jump_var.get())
+        except ValueError:
+            return
+        self.jump_to(index)
+
+    def jump_to(self, index):
+        """滚动到第 index 次访问并选中"""
+        if not len(self.hits):
+            return
+        index = min(max(index, 0), len(self.hits) - 1)
+        row = index // self.columns()
+        if not self.first_row <= row < self.first_row + self.visible_rows():
+            self.first_row = row
+        self.select(index)
+
+    def select(self, index):
+        self.selected = index
+        miss_label, hit_label = self.labels
+        text = f"第 {index} 次访问: 页 {self.pages[index]}, {hit_label if self.hits[index] else miss_label}"
+        if self.snapshot is not None:
+            text += f", 访问后驻留页面: {sorted(self.snapshot(index))}"
+        self.snapshot_var.set(text)
+        self.scroll_to_row(self.first_row)
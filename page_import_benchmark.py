@@ -0,0 +1,93 @@
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+# 启动时间基准：对每个入口模块多次运行 python -X importtime -c "import 模块"，
+# 取该模块的累计导入时间 (含其导入的全部模块) 以及整个进程的用时，报告最小值和中位数。
+# 第一次运行用于生成字节码缓存，不计入结果。
+
+ENTRY_POINTS = (
+    'page_replacement_engine',
+    'page_cli',
+    '上机实验5豆包_core',
+    '上机实验5豆包',
+    '上机实验5ds2',
+    '上机实验5ds',
+    '上机实验5Gemini',
+)
+BENCHMARK_COLUMNS = ('module', 'import_us_min', 'import_us_median', 'process_ms_min', 'process_ms_median',
+                     'heavy_modules')
+# 出现在导入记录中时单独报告的重量级依赖
+HEAVY_MODULES = ('tkinter', 'matplotlib', 'numpy', 'pyarrow')
+
+
+def import_time(module, python=sys.executable):
+    """运行一次 python -X importtime，返回 (模块累计导入时间 us, 进程用时 ms, 导入的重量级依赖)"""
+    start = time.perf_counter()
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, encoding='utf-8')
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr.strip().splitlines()[-1]}")
+
+    cumulative = None
+    heavy = set()
+    # 每行形如 "import time:       123 |       4567 | module"，子模块的名字前有缩进
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not cumulative_us.strip().isdigit():
+            continue  # 表头
+        if name.strip() == module and not name[1:].startswith(' '):
+            cumulative = int(cumulative_us)
+        top = name.strip().split('.')[0]
+        if top in HEAVY_MODULES:
+            heavy.add(top)
+    return cumulative, elapsed, sorted(heavy)
+
+
+def benchmark(modules=ENTRY_POINTS, repeat=5, python=sys.executable):
+    """返回按 BENCHMARK_COLUMNS 排列的结果行，无法导入的模块 (缺少依赖) 跳过并提示"""
+    rows = []
+    for module in modules:
+        try:
+            import_time(module, python)
+            samples = [import_time(module, python) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            continue
+        imports = [sample[0] for sample in samples]
+        processes = [sample[1] for sample in samples]
+        rows.append((module, min(imports), statistics.median(imports), round(min(processes), 1),
+                     round(statistics.median(processes), 1), ' '.join(samples[-1][2])))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="记录各入口模块的 python -X importtime 启动时间")
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--csv', help="把结果写成 CSV")
+    args = parser.parse_args(argv)
+
+    rows = benchmark(args.modules, args.repeat)
+    print("{:<26}{:>14}{:>14}{:>12}{:>12}  {}".format('模块', '导入(us,最小)', '导入(us,中位)', '进程(ms,最小)',
+                                                     '进程(ms,中位)', '重量级依赖'))
+    for module, import_min, import_median, process_min, process_median, heavy in rows:
+        print(f"{module:<26}{import_min:>14}{import_median:>14.0f}{process_min:>12}{process_median:>12}  {heavy}")
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(BENCHMARK_COLUMNS)
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
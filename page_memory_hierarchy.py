@@ -0,0 +1,120 @@
+import page_replacement_engine as engine
+
+
+# 存储层次模拟：多级快表 (TLB) + 页表 + 页框
+# 每次访存依次查各级快表，都未命中时查页表；页面不在内存时发生缺页，从外存调入。
+# 快表和页框都复用引擎中的置换策略：快表为全相联，默认按 LRU 替换；页框按指定的页面置换算法管理。
+# 页面被换出时，各级快表中该页的表项立即作废 (移出快表)，页面再次调入后不会命中旧的地址映射，
+# 作废的表项也不再占用快表容量；快表的替换算法须支持 invalidate (FIFO、LRU、SECOND_CHANCE、CLOCK)。
+# 各级延迟可配置 (单位自定，默认按纳秒取常见的量级)，按访问窗口统计有效访问时间 (EAT)。
+
+DEFAULT_LATENCIES = {
+    'tlb': (1, 5),  # 各级快表的查找时间
+    'page_table': 100,  # 查页表 (一次访存)
+    'memory': 100,  # 访问数据本身
+    'page_fault': 5_000_000,  # 缺页处理 (从外存调入)
+}
+
+
+class MemoryHierarchy:
+    """快表 + 页表 + 页框的存储层次
+
+    tlb_sizes 为各级快表的表项数 (默认两级：16 和 64)，tlb_policy 为快表的替换算法；
+    algorithm、frame_count、params 指定页框的置换算法；latencies 覆盖 DEFAULT_LATENCIES 中的部分延迟。
+    """
+
+    def __init__(self, algorithm='LRU', frame_count=4, tlb_sizes=(16, 64), tlb_policy='LRU', latencies=None,
+                 **params):
+        self.latencies = dict(DEFAULT_LATENCIES, **(latencies or {}))
+        if len(self.latencies['tlb']) != len(tlb_sizes):
+            raise ValueError("快表级数与快表延迟的个数不一致")
+        self.tlbs = [engine.make_policy(tlb_policy, size) for size in tlb_sizes]
+        if not all(hasattr(tlb, 'invalidate') for tlb in self.tlbs):
+            raise ValueError(f"{tlb_policy} 不支持作废表项，快表请使用 FIFO、LRU、SECOND_CHANCE 或 CLOCK")
+        self.frames = engine.make_policy(algorithm, frame_count, **params)
+        self.tlb_hits = [0] * len(tlb_sizes)  # 各级快表的命中次数
+        self.page_table_hits = 0  # 快表未命中但页面在内存中
+        self.page_faults = 0
+        self.references = 0
+        self.total_time = 0
+
+    def access(self, page):
+        """访问页面，返回本次访问的用时"""
+        self.references += 1
+        latencies = self.latencies
+        frames = self.frames
+        resident = page in frames
+        time = 0
+
+        # 逐级查快表；快表中只有驻留页面的表项
+        level = None
+        for i, (tlb, tlb_latency) in enumerate(zip(self.tlbs, latencies['tlb'])):
+            time += tlb_latency
+            if page in tlb:
+                level = i
+                break
+
+        if level is not None:
+            self.tlb_hits[level] += 1
+        else:
+            time += latencies['page_table']
+            if resident:
+                self.page_table_hits += 1
+            else:
+                self.page_faults += 1
+                time += latencies['page_fault']
+
+        # 页框按置换算法更新，缺页时被换出的页面 (置换策略的 last_victim) 从各级快表中移出；
+        # 命中的那一级及以上的各级快表装入 (或刷新) 该表项，更下级的快表不变
+        frames.access(page)
+        if not resident and frames.last_victim is not None:
+            for tlb in self.tlbs:
+                tlb.invalidate(frames.last_victim)
+        for i, tlb in enumerate(self.tlbs):
+            if level is None or i <= level:
+                tlb.access(page)
+
+        time += latencies['memory']
+        self.total_time += time
+        return time
+
+    def effective_access_time(self):
+        return self.total_time / self.references if self.references else 0.0
+
+    def summary(self):
+        references = self.references or 1
+        return {
+            'references': self.references,
+            'tlb_hit_rates': [hits / references for hits in self.tlb_hits],
+            'page_table_hit_rate': self.page_table_hits / references,
+            'page_fault_rate': self.page_faults / references,
+            'effective_access_time': self.effective_access_time(),
+        }
+
+
+def simulate_hierarchy(page_stream, algorithm='LRU', frame_count=4, window=100, **options):
+    """在存储层次上运行页地址流，返回 (总体统计, 各窗口统计)
+
+    options 传给 MemoryHierarchy (tlb_sizes、tlb_policy、latencies 及置换算法参数)；
+    各窗口统计为 [(起始访问序号, 有效访问时间, 快表命中率, 缺页率)]，每 window 次访问一项。
+    """
+    hierarchy = MemoryHierarchy(algorithm, frame_count, **options)
+    access = hierarchy.access
+    windows = []
+    # 窗口开始时的累计值：(访问次数, 总用时, 快表命中次数, 缺页次数)
+    mark = (0, 0, 0, 0)
+
+    def close_window():
+        references, total_time, tlb_hits, page_faults = mark
+        count = hierarchy.references - references
+        windows.append((references, (hierarchy.total_time - total_time) / count,
+                        (sum(hierarchy.tlb_hits) - tlb_hits) / count, (hierarchy.page_faults - page_faults) / count))
+        return hierarchy.references, hierarchy.total_time, sum(hierarchy.tlb_hits), hierarchy.page_faults
+
+    for page in engine.iter_pages(page_stream):
+        access(page)
+        if hierarchy.references - mark[0] == window:
+            mark = close_window()
+    if hierarchy.references > mark[0]:
+        close_window()
+    return hierarchy.summary(), windows
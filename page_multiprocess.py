@@ -0,0 +1,148 @@
+import random
+from collections import deque
+
+import instruction_sequence
+import page_replacement_engine as engine
+
+
+# 多进程共享页框的模拟
+# 各进程的页地址流按时间片轮转交错执行 (每个进程每次运行 quantum 次访问)，比较两类置换方式：
+#   全局置换  所有进程共用一个页框池，页面以 (进程号, 页号) 区分，缺页时可淘汰任何进程的页
+#   局部置换  每个进程有自己的页框，按平均分配、按进程大小比例分配，或按缺页频率 (PFF) 动态调整
+# 每个进程的状态 (置换策略、缺页计数、PFF 窗口) 按进程号存放在列表中，每次访问 O(1)，
+# 数百个进程时开销也只与访问次数成正比。
+
+LOCAL_ALLOCATIONS = ('equal', 'proportional', 'pff')
+
+
+def generate_process_streams(process_count, length=320, instructions_per_page=10, seed=0):
+    """按上机实验5Gemini的规则为每个进程生成页地址流"""
+    streams = []
+    for pid in range(process_count):
+        instructions = instruction_sequence.generate_instruction_sequence(length, random.Random(seed + pid))
+        streams.append([addr // instructions_per_page for addr in instructions])
+    return streams
+
+
+def interleave(streams, quantum):
+    """按时间片轮转交错各进程的访问，逐个产生 (进程号, 页号)"""
+    ready = deque((pid, 0) for pid, stream in enumerate(streams) if len(stream))
+    while ready:
+        pid, position = ready.popleft()
+        stream = streams[pid]
+        end = min(position + quantum, len(stream))
+        for page in stream[position:end]:
+            yield pid, page
+        if end < len(stream):
+            ready.append((pid, end))
+
+
+def simulate_global(streams, frame_count, quantum=10, algorithm='LRU', **params):
+    """全局置换，返回各进程的缺页次数列表"""
+    policy = engine.make_policy(algorithm, frame_count, **params)
+    access = policy.access
+    faults = [0] * len(streams)
+    for pid, page in interleave(streams, quantum):
+        if not access((pid, page)):
+            faults[pid] += 1
+    return faults
+
+
+def allocate_frames(streams, frame_count, allocation='equal'):
+    """局部置换的初始页框分配，每个进程至少 1 个页框，页框数少于进程数时报错
+
+    'equal' 平均分配；'proportional' 按进程用到的不同页面数成比例分配，两者分出的页框总数恰为 frame_count；
+    'pff' 先分给每个进程平均份额的一半，其余留作空闲页框，运行中按缺页频率调整。
+    """
+    n = len(streams)
+    if frame_count < n:
+        raise ValueError(f"页框数 {frame_count} 少于进程数 {n}，无法给每个进程至少 1 个页框")
+    if allocation == 'equal':
+        weights = [1] * n
+    elif allocation == 'proportional':
+        weights = [len(set(stream)) or 1 for stream in streams]
+    elif allocation == 'pff':
+        return [max(1, frame_count // (2 * n))] * n
+    else:
+        raise ValueError(f"未知的页框分配方式: {allocation}")
+
+    # 按比例取整后，剩余的页框分给小数部分最大的进程；
+    # 份额不足 1 的进程补成 1 个页框时总数可能超出，超出的部分从分得最多的进程收回
+    total = sum(weights)
+    shares = [frame_count * w / total for w in weights]
+    frames = [max(1, int(share)) for share in shares]
+    remaining = frame_count - sum(frames)
+    for pid in sorted(range(n), key=lambda i: shares[i] - int(shares[i]), reverse=True)[:max(remaining, 0)]:
+        frames[pid] += 1
+    while remaining < 0:
+        frames[max(range(n), key=frames.__getitem__)] -= 1
+        remaining += 1
+    return frames
+
+
+def simulate_local(streams, frame_count, quantum=10, algorithm='LRU', allocation='equal',
+                   pff_window=20, pff_upper=0.3, pff_lower=0.05, **params):
+    """局部置换，返回 (各进程的缺页次数列表, 各进程最终的页框数列表)
+
+    allocation 为 'pff' 时，每个进程每运行 pff_window 次访问检查一次缺页率：
+    高于 pff_upper 且有空闲页框时增加 1 个页框，低于 pff_lower 时交还 1 个页框；
+    交还页框需要置换策略支持 resize (FIFO、LRU、SECOND_CHANCE)。
+    """
+    allocated = allocate_frames(streams, frame_count, allocation)
+    policies = [engine.make_policy(algorithm, frames, **params) for frames in allocated]
+    if allocation == 'pff' and not all(hasattr(policy, 'resize') for policy in policies):
+        raise ValueError(f"{algorithm} 不支持调整页框数，PFF 请使用 FIFO、LRU 或 SECOND_CHANCE")
+
+    faults = [0] * len(streams)
+    free_frames = frame_count - sum(allocated)
+    window_references = [0] * len(streams)
+    window_faults = [0] * len(streams)
+    pff = allocation == 'pff'
+
+    for pid, page in interleave(streams, quantum):
+        policy = policies[pid]
+        if not policy.access(page):
+            faults[pid] += 1
+            window_faults[pid] += 1
+        if not pff:
+            continue
+
+        window_references[pid] += 1
+        if window_references[pid] == pff_window:
+            rate = window_faults[pid] / pff_window
+            if rate > pff_upper and free_frames > 0:
+                allocated[pid] += 1
+                free_frames -= 1
+                policy.resize(allocated[pid])
+            elif rate < pff_lower and allocated[pid] > 1:
+                allocated[pid] -= 1
+                free_frames += 1
+                policy.resize(allocated[pid])
+            window_references[pid] = window_faults[pid] = 0
+
+    return faults, allocated
+
+
+def compare_replacement(streams, frame_count, quantum=10, algorithm='LRU', **params):
+    """比较全局置换与各种局部分配方式，返回 {方式: (总缺页次数, 缺页率, 各进程缺页次数)}"""
+    references = sum(len(stream) for stream in streams)
+    results = {}
+    faults = simulate_global(streams, frame_count, quantum, algorithm, **params)
+    results['global'] = faults
+    for allocation in LOCAL_ALLOCATIONS:
+        if allocation == 'pff' and not hasattr(engine.POLICIES[algorithm.upper()], 'resize'):
+            continue
+        faults, _ = simulate_local(streams, frame_count, quantum, algorithm, allocation, **params)
+        results[allocation] = faults
+    return {mode: (sum(faults), sum(faults) / references if references else 0.0, faults)
+            for mode, faults in results.items()}
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.time()
+    process_streams = generate_process_streams(200)
+    for mode, (total_faults, fault_rate, _) in compare_replacement(process_streams, 200 * 8, quantum=20).items():
+        print(f"{mode:<14}缺页 {total_faults:>8}  缺页率 {fault_rate:.4f}")
+    print(f"用时 {time.time() - start:.2f} 秒")
@@ -0,0 +1,224 @@
+import page_replacement_engine as engine
+
+
+# 预取 (预调页)
+# PrefetchingPolicy 包装任意置换策略：每次按需访问之后询问预取器要提前调入哪些页，
+# 不在内存中的页通过 access 调入 (对 LRU/LFU 等相当于一次访问，会更新其使用记录)。
+# 统计指标：
+#   准确率  被预取且在淘汰前用到的页 / 预取的页数
+#   覆盖率  预取命中 / (预取命中 + 按需缺页)，即原本会缺页的访问中有多少被预取消除
+#   污染    被预取但在用到之前就被淘汰的页数 (白占页框，还可能挤掉有用的页)，
+#           按被包装策略的 last_victim 在淘汰时计入，未用到的预取页最多只记页框数个
+# 每次最多预取页框数的一半，避免预读窗口大于内存时预取的页互相挤掉。
+
+class NextNPrefetcher:
+    """顺序预取：缺页或用到预取页时，预取其后的 n 页"""
+
+    def __init__(self, n=1):
+        self.n = n
+
+    def predict(self, page, hit, prefetch_hit):
+        if hit and not prefetch_hit:
+            return []
+        return [page + i for i in range(1, self.n + 1)]
+
+
+class StridePrefetcher:
+    """步长预取：连续两次访问间隔相同 (且不为 0) 时，按该步长预取 degree 页
+
+    同一页的连续重复访问 (顺序执行时很常见) 不参与步长检测，步长取相邻两个不同页之间的间隔。
+    """
+
+    def __init__(self, degree=1):
+        self.degree = degree
+        self.previous = None
+        self.stride = None
+
+    def predict(self, page, hit, prefetch_hit):
+        if page == self.previous:
+            return []
+        pages = []
+        if self.previous is not None:
+            stride = page - self.previous
+            if stride and stride == self.stride:
+                pages = [page + stride * i for i in range(1, self.degree + 1)]
+            self.stride = stride
+        self.previous = page
+        return pages
+
+
+class ReadaheadPrefetcher:
+    """自适应预读 (仿 Linux 的按需预读)
+
+    顺序缺页时同步预读 initial 页；访问到预读窗口的首页 (标记页) 说明顺序访问在继续，
+    窗口加倍 (不超过 max_size) 并异步预读下一个窗口；随机缺页时窗口复位。
+    同一页的连续重复访问不改变预读状态。
+    """
+
+    def __init__(self, initial=4, max_size=32):
+        self.initial = initial
+        self.max_size = max_size
+        self.size = 0
+        self.marker = None
+        self.window_end = None
+        self.previous = None
+
+    def predict(self, page, hit, prefetch_hit):
+        if page == self.previous:
+            return []
+        sequential = self.previous is not None and page == self.previous + 1
+        self.previous = page
+        if page == self.marker:
+            self.size = min(2 * self.size, self.max_size)
+            start = self.window_end
+        elif not hit and sequential:
+            self.size = min(self.initial, self.max_size)
+            start = page + 1
+        else:
+            if not hit:
+                self.size = 0
+                self.marker = None
+            return []
+        self.marker = start
+        self.window_end = start + self.size
+        return list(range(start, self.window_end))
+
+
+PREFETCHERS = {
+    'NEXT_N': NextNPrefetcher,
+    'STRIDE': StridePrefetcher,
+    'READAHEAD': ReadaheadPrefetcher,
+}
+
+
+class PrefetchingPolicy:
+    """带预取的置换策略，接口与被包装的策略相同
+
+    被包装的策略须在缺页时给出 last_victim (POLICIES 中的策略都有)；
+    page_limit 不为 None 时只预取 0..page_limit-1 范围内的页 (进程的虚拟地址空间)。
+    """
+
+    def __init__(self, policy, prefetcher, page_limit=None):
+        self.policy = policy
+        self.prefetcher = prefetcher
+        self.page_limit = page_limit
+        self.budget = max(1, getattr(policy, 'frame_count', 2) // 2)
+        if hasattr(prefetcher, 'max_size'):
+            # 预读窗口不超过每次的预取上限，否则窗口后半段取不进来，下一个窗口之前会留下空洞
+            prefetcher.max_size = min(prefetcher.max_size, self.budget)
+        self.pending = set()  # 已预取、尚未被访问且仍在内存中的页
+        self.demand_faults = 0
+        self.prefetches = 0
+        self.useful = 0
+        self.polluting = 0
+
+    def __contains__(self, page):
+        return page in self.policy
+
+    def __len__(self):
+        return len(self.policy)
+
+    def pages(self):
+        return self.policy.pages()
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，返回命中次数
+
+        该页驻留后的重复访问都命中，交给被包装的策略一次处理，不触发预取；
+        只有预取把刚调入的页挤掉时 (如 LFU 中新页访问次数最少) 才逐次处理。
+        """
+        hits = self.access(page)
+        remaining = count - 1
+        while remaining and page not in self.policy:
+            hits += self.access(page)
+            remaining -= 1
+        if remaining:
+            self.policy.access_run(page, remaining)
+        return hits + remaining
+
+    def _load(self, page):
+        """调入页面；被挤掉的页若是还没用到的预取页，计为污染"""
+        policy = self.policy
+        policy.access(page)
+        victim = policy.last_victim
+        if victim is not None and victim in self.pending:
+            self.pending.discard(victim)
+            self.polluting += 1
+
+    def access(self, page):
+        policy = self.policy
+        pending = self.pending
+        hit = page in policy
+        prefetch_hit = page in pending
+        if prefetch_hit:
+            pending.discard(page)
+            self.useful += 1
+        if hit:
+            policy.access(page)
+        else:
+            self.demand_faults += 1
+            self._load(page)
+
+        limit = self.page_limit
+        budget = self.budget
+        for candidate in self.prefetcher.predict(page, hit, prefetch_hit):
+            if candidate < 0 or (limit is not None and candidate >= limit) or candidate in policy:
+                continue
+            if not budget:
+                break
+            budget -= 1
+            self._load(candidate)
+            pending.add(candidate)
+            self.prefetches += 1
+        return hit
+
+    def statistics(self):
+        """返回 (准确率, 覆盖率, 污染页数)；仍在内存中未用到的预取页不计入污染"""
+        accuracy = self.useful / self.prefetches if self.prefetches else 0.0
+        covered = self.useful + self.demand_faults
+        coverage = self.useful / covered if covered else 0.0
+        return accuracy, coverage, self.polluting
+
+
+def compare_prefetchers(page_stream, algorithm='LRU', frame_count=4, prefetchers=None, page_limit=None, **params):
+    """对比不预取与各预取器，返回 [(预取器, 缺页次数, 比不预取减少的比例, 预取页数, 准确率, 覆盖率, 污染页数)]
+
+    prefetchers 为 {名称: 预取器工厂}，默认使用 PREFETCHERS 中各预取器的默认参数。
+    """
+    baseline, _, _ = engine.run_policy(engine.make_policy(algorithm, frame_count, **params), page_stream)
+    rows = [('NONE', baseline, 0.0, 0, 0.0, 0.0, 0)]
+    for name, factory in (prefetchers or PREFETCHERS).items():
+        policy = PrefetchingPolicy(engine.make_policy(algorithm, frame_count, **params), factory(), page_limit)
+        faults, _, _ = engine.run_policy(policy, page_stream)
+        accuracy, coverage, polluting = policy.statistics()
+        reduction = 1 - faults / baseline if baseline else 0.0
+        rows.append((name, faults, reduction, policy.prefetches, accuracy, coverage, polluting))
+    return rows
+
+
+def replay_trace(path, algorithm='LRU', frame_count=4, prefetcher='NEXT_N', page_size=1, fmt='auto',
+                 page_limit=None, **params):
+    """带预取回放轨迹文件 (边读边做游程压缩，见 page_trace_io.replay_trace)
+
+    prefetcher 为 PREFETCHERS 中的名称或预取器对象；返回 (访问次数, 缺页次数, 预取页数, 准确率, 覆盖率, 污染页数)。
+    """
+    import page_trace_io
+
+    if isinstance(prefetcher, str):
+        prefetcher = PREFETCHERS[prefetcher.upper()]()
+    policy = PrefetchingPolicy(engine.make_policy(algorithm, frame_count, **params), prefetcher, page_limit)
+    references, faults = engine.replay_runs(policy, engine.iter_runs(page_trace_io.trace_pages(path, page_size, fmt)))
+    return (references, faults, policy.prefetches) + policy.statistics()
+
+
+if __name__ == "__main__":
+    import instruction_sequence
+
+    instructions = instruction_sequence.generate_paired_instructions(320)
+    pages = [addr // 10 for addr in instructions]
+    for frames in (4, 8, 16):
+        print(f"LRU, {frames} 个页框")
+        for name, faults, reduction, issued, accuracy, coverage, polluting in compare_prefetchers(
+                pages, 'LRU', frames, page_limit=32):
+            print(f"  {name:<10}缺页 {faults:>4}  减少 {reduction:6.1%}  预取 {issued:>4}  "
+                  f"准确率 {accuracy:.2f}  覆盖率 {coverage:.2f}  污染 {polluting:>4}")
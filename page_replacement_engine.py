@@ -0,0 +1,1160 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+
+
+# 页面置换算法公共引擎
+# 命中/缺页序列统一用 bytearray 表示 (1=命中, 0=缺页)，每次访问只占 1 字节，
+# 各上机实验模块再按自己的格式 ('H'/'M'、'HIT'/'MISS'、True/False) 转换显示。
+# 页地址流可以是列表，也可以是 NumPy 数组 (见 page_stream_arrays.py)；
+# 下一次访问位置、栈距离等中间结果存放在 array 中，NumPy 可直接零拷贝查看。
+
+CHUNK_SIZE = 1 << 16
+
+
+def iter_pages(page_stream, chunk_size=CHUNK_SIZE):
+    """逐个产生页号；NumPy 数组按块转换为 Python 整数，避免逐元素装箱的开销"""
+    if hasattr(page_stream, 'tolist'):
+        for start in range(0, len(page_stream), chunk_size):
+            yield from page_stream[start:start + chunk_size].tolist()
+    else:
+        yield from page_stream
+
+
+def run_policy(policy, page_stream):
+    """用给定的置换策略依次处理页地址流，返回 (缺页次数, 命中/缺页序列, 最终驻留页面)"""
+    access = policy.access
+    hit_miss = bytearray(len(page_stream))
+    page_faults = 0
+    for i, page in enumerate(iter_pages(page_stream)):
+        if access(page):
+            hit_miss[i] = 1
+        else:
+            page_faults += 1
+    return page_faults, hit_miss, policy.pages()
+
+
+def iter_runs(sequence):
+    """逐个产生 (值, 连续重复次数)"""
+    current = None
+    count = 0
+    for value in iter_pages(sequence):
+        if count and value == current:
+            count += 1
+        else:
+            if count:
+                yield current, count
+            current = value
+            count = 1
+    if count:
+        yield current, count
+
+
+def run_lengths(sequence):
+    """把序列压缩为 (值, 连续重复次数) 列表"""
+    return list(iter_runs(sequence))
+
+
+# 游程压缩的页地址流
+# 顺序执行的指令大多落在同一页，页地址流中常有长串相同的页号。连续重复的访问必然命中，
+# 各置换策略的 access_run(page, count) 一次处理整个游程，返回其中的命中次数。
+def run_policy_runs(policy, runs):
+    """用置换策略处理 (页号, 重复次数) 序列，返回 (缺页次数, 展开后的命中/缺页序列, 最终驻留页面)"""
+    if not isinstance(runs, list):
+        runs = list(runs)
+    access_run = policy.access_run
+    hit_miss = bytearray(b'\x01') * sum(count for _, count in runs)
+    page_faults = 0
+    position = 0
+    for page, count in runs:
+        if access_run(page, count) < count:
+            hit_miss[position] = 0
+            page_faults += 1
+        position += count
+    return page_faults, hit_miss, policy.pages()
+
+
+def run_policy_rw(policy, page_stream, writes):
+    """按读写标记处理页地址流，返回 (缺页次数, 写回次数, 命中/缺页序列)
+
+    writes 与页地址流等长，非 0 表示该次访问为写；策略须支持 access(page, write)
+    (FIFO、LRU、SECOND_CHANCE、CLOCK、CLEAN_CLOCK)。结束时仍驻留的脏页不计入写回次数，见 policy.dirty。
+    """
+    access = policy.access
+    hit_miss = bytearray(len(page_stream))
+    page_faults = 0
+    for i, (page, write) in enumerate(zip(iter_pages(page_stream), iter_pages(writes))):
+        if access(page, write):
+            hit_miss[i] = 1
+        else:
+            page_faults += 1
+    return page_faults, policy.write_backs, hit_miss
+
+
+def replay_runs(policy, runs):
+    """流式处理 (页号, 重复次数) 序列，不保存命中序列，返回 (访问次数, 缺页次数)"""
+    access_run = policy.access_run
+    references = hits = 0
+    for page, count in runs:
+        references += count
+        hits += access_run(page, count)
+    return references, references - hits
+
+
+def resident_after(policy, page_stream, index):
+    """用置换策略处理页地址流的前 index+1 次访问，返回此时驻留的页面"""
+    access = policy.access
+    for t, page in enumerate(iter_pages(page_stream)):
+        if t > index:
+            break
+        access(page)
+    return policy.pages()
+
+
+# 1. FIFO / LRU
+# 每种置换策略都提供 access(page) -> 是否命中、access_run(page, count) -> 命中次数、
+# pages() -> 驻留页面，以及 in / len 运算。
+# FIFO、LRU、第二次机会和 CLOCK 还支持 access(page, write=True)：被写过的页记为脏页，
+# 脏页被淘汰时要写回外存，写回次数记在 write_backs 中 (见 run_policy_rw)；
+# 这几种策略也支持 invalidate(page)，把页面直接移出 (如快表中对应的页已被换出)，不计写回。
+# POLICIES 中的策略在缺页时把被淘汰的页记在 last_victim 中 (页框未满、没有淘汰时为 None)，
+# 只在 access 返回 False 之后读取才有意义。
+class FIFOPolicy:
+    """FIFO 置换策略：按装入顺序淘汰"""
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.frames = OrderedDict()
+        self.dirty = set()
+        self.write_backs = 0
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def pages(self):
+        return list(self.frames)
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，返回命中次数 (重复访问不改变状态)"""
+        return self.access(page) + count - 1
+
+    def resize(self, frame_count):
+        """改变页框数，页框减少时从队首淘汰多出的页面"""
+        self.frame_count = frame_count
+        while len(self.frames) > frame_count:
+            self._evicted(self.frames.popitem(last=False)[0])
+
+    def invalidate(self, page):
+        """把页面移出页框，空出的页框留给下一次缺页"""
+        self.frames.pop(page, None)
+        self.dirty.discard(page)
+
+    def _evicted(self, victim):
+        self.last_victim = victim
+        if victim in self.dirty:
+            self.dirty.discard(victim)
+            self.write_backs += 1
+
+    def access(self, page, write=False):
+        frames = self.frames
+        if write:
+            self.dirty.add(page)
+        if page in frames:
+            return True
+        self.last_victim = None
+        if len(frames) >= self.frame_count:
+            self._evicted(frames.popitem(last=False)[0])
+        frames[page] = None
+        return False
+
+
+class LRUPolicy(FIFOPolicy):
+    """LRU 置换策略：命中时移到队尾，淘汰队首最久未使用的页"""
+
+    def access(self, page, write=False):
+        frames = self.frames
+        if write:
+            self.dirty.add(page)
+        if page in frames:
+            frames.move_to_end(page)
+            return True
+        self.last_victim = None
+        if len(frames) >= self.frame_count:
+            self._evicted(frames.popitem(last=False)[0])
+        frames[page] = None
+        return False
+
+
+# 2. OPT 最佳淘汰算法
+def next_use_index(page_stream):
+    """一次反向扫描求出每次访问之后同一页面的下一次访问位置 (不再访问记为 len(page_stream))"""
+    n = len(page_stream)
+    next_use = array('q', [n]) * n
+    last_seen = {}
+    for i in range(n - 1, -1, -1):
+        page = page_stream[i]
+        next_use[i] = last_seen.get(page, n)
+        last_seen[page] = i
+    return next_use
+
+
+class OPTPolicy:
+    """OPT 置换策略：驻留页面放入按下一次访问位置排序的大根堆，每次访问 O(log k)"""
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.frames = {}  # 页面 -> 下一次访问位置
+        self.heap = []  # (-下一次访问位置, 页面)，过期条目延迟删除
+
+    def __contains__(self, page):
+        return page in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def pages(self):
+        return list(self.frames)
+
+    def access(self, page, next_use):
+        """访问页面，返回 True 表示命中；next_use 为该页面下一次被访问的位置"""
+        frames = self.frames
+        hit = page in frames
+        if not hit and len(frames) >= self.frame_count:
+            self._evict()
+        frames[page] = next_use
+        heapq.heappush(self.heap, (-next_use, page))
+        # 命中时旧条目不立即删除，堆中过期条目过多时整体重建，保持堆大小为 O(k)
+        if len(self.heap) > 2 * self.frame_count + 16:
+            self.heap = [(-pos, p) for p, pos in frames.items()]
+            heapq.heapify(self.heap)
+        return hit
+
+    def access_run(self, page, count, next_use):
+        """连续访问同一页面 count 次，next_use 为游程之后该页面下一次被访问的位置"""
+        return self.access(page, next_use) + count - 1
+
+    def _evict(self):
+        frames = self.frames
+        heap = self.heap
+        while heap:
+            neg_pos, page = heapq.heappop(heap)
+            if frames.get(page) == -neg_pos:
+                del frames[page]
+                return page
+        return None
+
+
+def simulate_opt(page_stream, frame_count, next_use=None):
+    """最佳淘汰算法 (OPT)，返回 (缺页次数, 命中/缺页序列, 最终驻留页面)
+
+    next_use 可传入预先求好的下一次访问位置，省去反向扫描。
+    """
+    if next_use is None:
+        next_use = next_use_index(page_stream)
+    policy = OPTPolicy(frame_count)
+    access = policy.access
+    hit_miss = bytearray(len(page_stream))
+    page_faults = 0
+    for i, (page, page_next_use) in enumerate(zip(iter_pages(page_stream), iter_pages(next_use))):
+        if access(page, page_next_use):
+            hit_miss[i] = 1
+        else:
+            page_faults += 1
+    return page_faults, hit_miss, policy.pages()
+
+
+def simulate_opt_runs(runs, frame_count):
+    """在 (页号, 重复次数) 序列上运行 OPT，返回值同 simulate_opt
+
+    游程首次访问之间的先后顺序与原序列一致，按游程序号求下一次访问位置即可。
+    """
+    if not isinstance(runs, list):
+        runs = list(runs)
+    next_use = next_use_index([page for page, _ in runs])
+    policy = OPTPolicy(frame_count)
+    access = policy.access
+    hit_miss = bytearray(b'\x01') * sum(count for _, count in runs)
+    page_faults = 0
+    position = 0
+    for (page, count), page_next_use in zip(runs, next_use):
+        if not access(page, page_next_use):
+            hit_miss[position] = 0
+            page_faults += 1
+        position += count
+    return page_faults, hit_miss, policy.pages()
+
+
+def opt_resident_after(page_stream, frame_count, index, next_use=None):
+    """OPT 处理前 index+1 次访问后驻留的页面"""
+    if next_use is None:
+        next_use = next_use_index(page_stream)
+    policy = OPTPolicy(frame_count)
+    for t, (page, page_next_use) in enumerate(zip(iter_pages(page_stream), iter_pages(next_use))):
+        if t > index:
+            break
+        policy.access(page, page_next_use)
+    return policy.pages()
+
+
+# 3. LRU 栈距离 (Mattson 算法)
+class FenwickTree:
+    """树状数组：单点修改、前缀求和、按名次查找均为 O(log n)
+
+    fill=1 时所有位置初始为 1 (用于维护空闲地址集合)，O(n) 建树。
+    """
+
+    def __init__(self, size, fill=0):
+        self.size = size
+        if fill:
+            self.tree = array('i', (fill * (i & -i) for i in range(size + 1)))
+        else:
+            self.tree = array('i', [0]) * (size + 1)
+
+    def add(self, index, delta):
+        """位置 index (从0开始) 加上 delta"""
+        tree = self.tree
+        i = index + 1
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """位置 0..index 的和"""
+        tree = self.tree
+        total = 0
+        i = index + 1
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find_kth(self, k):
+        """各位置均非负时，返回前缀和首次超过 k 的位置 (即第 k 个 1 的位置，k 从0开始)"""
+        tree = self.tree
+        pos = 0
+        remaining = k + 1
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] < remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+def lru_stack_distances(page_stream):
+    """求每次访问的 LRU 栈距离 (栈顶为1，首次访问记为0)
+
+    树状数组中只在每个页面最后一次访问的位置上记 1，
+    上次访问之后出现过的不同页面数 + 1 即为栈距离，整体 O(n log n)。
+    """
+    n = len(page_stream)
+    tree = FenwickTree(n)
+    last_access = {}
+    distances = array('i', [0]) * n
+    for t, page in enumerate(iter_pages(page_stream)):
+        prev = last_access.get(page)
+        if prev is not None:
+            distances[t] = len(last_access) - tree.prefix_sum(prev) + 1
+            tree.add(prev, -1)
+        tree.add(t, 1)
+        last_access[page] = t
+    return distances
+
+
+def lru_hit_counts(page_stream, max_frames=None):
+    """一次扫描求出页框数为 1..max_frames 时 LRU 的命中次数
+
+    返回列表 hits，hits[k] 为 k 个页框时的命中次数 (hits[0] = 0)；
+    max_frames 默认取不同页面数，超过该值后命中次数不再变化。
+    """
+    distances = lru_stack_distances(page_stream)
+    if max_frames is None:
+        max_frames = len(set(iter_pages(page_stream)))
+    histogram = [0] * (max_frames + 1)
+    for d in distances:
+        if 0 < d <= max_frames:
+            histogram[d] += 1
+    hits = [0] * (max_frames + 1)
+    total = 0
+    for k in range(1, max_frames + 1):
+        total += histogram[k]
+        hits[k] = total
+    return hits
+
+
+def lru_hit_miss(distances, frame_count):
+    """由栈距离得到指定页框数下的 LRU 命中/缺页序列"""
+    return bytearray(1 if 0 < d <= frame_count else 0 for d in distances)
+
+
+# 4. LFU 最少访问页面算法
+class LFUPolicy:
+    """LFU 置换策略：按访问次数分桶，命中、装入、淘汰均为常数时间
+
+    tie_break 指定访问次数相同时淘汰哪一页：
+    'lru'  淘汰最久未被访问的页 (上机实验5豆包 / 5ds2 的语义)，每个桶为 OrderedDict，O(1)；
+    'fifo' 淘汰最早装入内存的页 (上机实验5Gemini 的语义)，每个桶为按装入时间排序的堆，O(log k)。
+    """
+
+    def __init__(self, frame_count, tie_break='lru'):
+        if tie_break not in ('lru', 'fifo'):
+            raise ValueError(f"未知的LFU同频淘汰规则: {tie_break}")
+        self.frame_count = frame_count
+        self.tie_break = tie_break
+        self.freq = {}  # 页面 -> 访问次数
+        self.buckets = {}  # 访问次数 -> 该次数下的页面
+        self.bucket_sizes = {}  # 访问次数 -> 桶中有效页面数 ('fifo' 模式的堆中有过期条目)
+        self.entry_time = {}  # 页面 -> 装入时间 ('fifo' 模式)
+        self.min_freq = 0
+        self.clock = 0
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.freq
+
+    def __len__(self):
+        return len(self.freq)
+
+    def pages(self):
+        return list(self.freq)
+
+    def access(self, page):
+        """访问页面，返回 True 表示命中"""
+        self.clock += 1
+        freq = self.freq
+        count = freq.get(page)
+        if count is not None:
+            self._remove(page, count)
+            if count == self.min_freq and not self.bucket_sizes.get(count):
+                self.min_freq = count + 1
+            freq[page] = count + 1
+            self._add(page, count + 1)
+            return True
+
+        self.last_victim = self._evict() if len(freq) >= self.frame_count else None
+        freq[page] = 1
+        self.entry_time[page] = self.clock
+        self._add(page, 1)
+        self.min_freq = 1
+        return False
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，访问次数一次加到位，返回命中次数"""
+        hit = self.access(page)
+        if count > 1:
+            self.clock += count - 1
+            old = self.freq[page]
+            new = old + count - 1
+            self._remove(page, old)
+            if old == self.min_freq and not self.bucket_sizes.get(old):
+                # 逐次访问时最小访问次数会跟着该页上升，直到遇到还有其他页面的桶
+                self.min_freq = min((f for f in self.bucket_sizes if old < f < new), default=new)
+            self.freq[page] = new
+            self._add(page, new)
+        return hit + count - 1
+
+    def _add(self, page, count):
+        bucket = self.buckets.get(count)
+        if self.tie_break == 'lru':
+            if bucket is None:
+                bucket = self.buckets[count] = OrderedDict()
+            bucket[page] = None
+        else:
+            if bucket is None:
+                bucket = self.buckets[count] = []
+            heapq.heappush(bucket, (self.entry_time[page], page))
+        self.bucket_sizes[count] = self.bucket_sizes.get(count, 0) + 1
+
+    def _remove(self, page, count):
+        bucket = self.buckets[count]
+        self.bucket_sizes[count] -= 1
+        size = self.bucket_sizes[count]
+        if not size:
+            del self.buckets[count]
+            del self.bucket_sizes[count]
+        elif self.tie_break == 'lru':
+            del bucket[page]
+        elif len(bucket) > 2 * size + 16:
+            # 'fifo' 模式下堆中的条目延迟删除，过期条目过多时整体重建
+            freq = self.freq
+            entry_time = self.entry_time
+            bucket[:] = [(t, p) for t, p in bucket if freq.get(p) == count and entry_time[p] == t and p != page]
+            heapq.heapify(bucket)
+
+    def _evict(self):
+        count = self.min_freq
+        bucket = self.buckets[count]
+        if self.tie_break == 'lru':
+            victim, _ = bucket.popitem(last=False)
+        else:
+            while True:
+                entry, victim = heapq.heappop(bucket)
+                if self.freq.get(victim) == count and self.entry_time[victim] == entry:
+                    break
+        del self.freq[victim]
+        del self.entry_time[victim]
+        self.bucket_sizes[count] -= 1
+        if not self.bucket_sizes[count]:
+            del self.buckets[count]
+            del self.bucket_sizes[count]
+        return victim
+
+
+def simulate_lfu(page_stream, frame_count, tie_break='lru'):
+    """最少访问页面算法 (LFU)，tie_break 见 LFUPolicy"""
+    return run_policy(LFUPolicy(frame_count, tie_break), page_stream)
+
+
+def simulate_fifo(page_stream, frame_count):
+    """先进先出算法 (FIFO)"""
+    return run_policy(FIFOPolicy(frame_count), page_stream)
+
+
+def simulate_lru(page_stream, frame_count):
+    """最近最少使用算法 (LRU)"""
+    return run_policy(LRUPolicy(frame_count), page_stream)
+
+
+# 5. CLOCK / 第二次机会
+class ClockPolicy:
+    """CLOCK 置换策略：页框排成环形，指针扫过访问位为 1 的页时清零，淘汰第一个访问位为 0 的页"""
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.slots = []  # 页框中的页面
+        self.referenced = []  # 对应页框的访问位
+        self.index = {}  # 页面 -> 页框号
+        self.hand = 0
+        self.dirty = set()
+        self.write_backs = 0
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def pages(self):
+        return list(self.slots)
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，返回命中次数 (重复访问不改变状态)"""
+        return self.access(page) + count - 1
+
+    def invalidate(self, page):
+        """把页面移出环，后面的页框前移一位，指针仍指向原来的页"""
+        slot = self.index.pop(page, None)
+        if slot is None:
+            return
+        self.dirty.discard(page)
+        del self.slots[slot]
+        del self.referenced[slot]
+        for i in range(slot, len(self.slots)):
+            self.index[self.slots[i]] = i
+        if slot < self.hand:
+            self.hand -= 1
+        if self.hand >= len(self.slots):
+            self.hand = 0
+
+    def access(self, page, write=False):
+        if write:
+            self.dirty.add(page)
+        slot = self.index.get(page)
+        if slot is not None:
+            self.referenced[slot] = True
+            return True
+
+        if len(self.slots) < self.frame_count:
+            self.last_victim = None
+            self.index[page] = len(self.slots)
+            self.slots.append(page)
+            self.referenced.append(True)
+            return False
+
+        hand = self._victim()
+        victim = self.last_victim = self.slots[hand]
+        del self.index[victim]
+        if victim in self.dirty:
+            self.dirty.discard(victim)
+            self.write_backs += 1
+        self.slots[hand] = page
+        self.referenced[hand] = True
+        self.index[page] = hand
+        self.hand = (hand + 1) % self.frame_count
+        return False
+
+    def _victim(self):
+        """从指针处开始扫描，清除沿途的访问位，返回第一个访问位为 0 的页框号"""
+        referenced = self.referenced
+        hand = self.hand
+        while referenced[hand]:
+            referenced[hand] = False
+            hand = (hand + 1) % self.frame_count
+        return hand
+
+
+class CleanFirstClockPolicy(ClockPolicy):
+    """优先淘汰干净页的 CLOCK (改进型 CLOCK / 增强的第二次机会)
+
+    按 (访问位, 脏位) 把页分为四类，淘汰顺序为 (0,0) > (0,1) > (1,0) > (1,1)：
+    第一圈只找 (0,0) 且不改访问位；找不到时第二圈找 (0,1)，并清除沿途的访问位；仍找不到则重复。
+    未被引用的干净页淘汰时不需要写回，减少写回次数。
+    """
+
+    def _victim(self):
+        referenced = self.referenced
+        slots = self.slots
+        dirty = self.dirty
+        count = self.frame_count
+        while True:
+            hand = self.hand
+            for _ in range(count):
+                if not referenced[hand] and slots[hand] not in dirty:
+                    return hand
+                hand = (hand + 1) % count
+            for _ in range(count):
+                if not referenced[hand] and slots[hand] in dirty:
+                    return hand
+                referenced[hand] = False
+                hand = (hand + 1) % count
+
+
+class SecondChancePolicy(FIFOPolicy):
+    """第二次机会置换策略：FIFO 队列加访问位，队首页访问位为 1 时清零并移到队尾
+
+    淘汰结果与 CLOCK 相同，区别只在于用队列实现而不是环形指针。
+    """
+
+    def access(self, page, write=False):
+        frames = self.frames
+        if write:
+            self.dirty.add(page)
+        if page in frames:
+            frames[page] = True
+            return True
+        self.last_victim = None
+        if len(frames) >= self.frame_count:
+            while True:
+                victim, referenced = frames.popitem(last=False)
+                if not referenced:
+                    break
+                frames[victim] = False
+            self._evicted(victim)
+        frames[page] = True
+        return False
+
+
+# 6. ARC 自适应替换
+class ARCPolicy:
+    """ARC 置换策略 (Megiddo & Modha)
+
+    T1 为只访问过一次的页，T2 为访问过多次的页，B1/B2 为刚从 T1/T2 淘汰的页号 (幽灵表)；
+    幽灵命中时调整目标值 p，在"最近"与"频繁"之间自适应分配页框。
+    """
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.p = 0.0
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.t1 or page in self.t2
+
+    def __len__(self):
+        return len(self.t1) + len(self.t2)
+
+    def pages(self):
+        return list(self.t1) + list(self.t2)
+
+    def _replace(self, in_b2):
+        t1 = self.t1
+        if t1 and (len(t1) > self.p or (in_b2 and len(t1) == self.p)):
+            victim, _ = t1.popitem(last=False)
+            self.b1[victim] = None
+        elif self.t2:
+            victim, _ = self.t2.popitem(last=False)
+            self.b2[victim] = None
+        else:
+            victim, _ = t1.popitem(last=False)
+            self.b1[victim] = None
+        self.last_victim = victim
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次：第二次访问把页面从 T1 移入 T2，之后的访问不改变状态"""
+        hits = self.access(page)
+        if count > 1 and page in self.t1:
+            hits += self.access(page) + count - 2
+        else:
+            hits += count - 1
+        return hits
+
+    def access(self, page):
+        c = self.frame_count
+        t1, t2, b1, b2 = self.t1, self.t2, self.b1, self.b2
+        if page in t1:
+            del t1[page]
+            t2[page] = None
+            return True
+        if page in t2:
+            t2.move_to_end(page)
+            return True
+
+        self.last_victim = None
+        if page in b1:
+            self.p = min(c, self.p + max(len(b2) / len(b1), 1))
+            self._replace(False)
+            del b1[page]
+            t2[page] = None
+            return False
+        if page in b2:
+            self.p = max(0.0, self.p - max(len(b1) / len(b2), 1))
+            self._replace(True)
+            del b2[page]
+            t2[page] = None
+            return False
+
+        l1 = len(t1) + len(b1)
+        if l1 >= c:
+            if len(t1) < c:
+                b1.popitem(last=False)
+                self._replace(False)
+            else:
+                self.last_victim, _ = t1.popitem(last=False)
+        else:
+            total = l1 + len(t2) + len(b2)
+            if total >= c:
+                if total >= 2 * c:
+                    b2.popitem(last=False)
+                if len(t1) + len(t2) >= c:
+                    self._replace(False)
+        t1[page] = None
+        return False
+
+
+# 7. 2Q
+class TwoQueuePolicy:
+    """2Q 置换策略 (Johnson & Shasha 完整版)
+
+    首次访问的页进入 FIFO 队列 A1in，被挤出后只在幽灵队列 A1out 中保留页号；
+    在 A1out 中再次被访问的页才进入 LRU 队列 Am，一次性扫描不会冲掉 Am 中的热点页。
+    """
+
+    def __init__(self, frame_count, in_ratio=0.25, out_ratio=0.5):
+        self.frame_count = frame_count
+        self.kin = max(1, int(frame_count * in_ratio))
+        self.kout = max(1, int(frame_count * out_ratio))
+        self.a1in = OrderedDict()
+        self.a1out = OrderedDict()
+        self.am = OrderedDict()
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.am or page in self.a1in
+
+    def __len__(self):
+        return len(self.am) + len(self.a1in)
+
+    def pages(self):
+        return list(self.a1in) + list(self.am)
+
+    def _reclaim(self):
+        self.last_victim = None
+        if len(self.a1in) + len(self.am) < self.frame_count:
+            return
+        if len(self.a1in) > self.kin or not self.am:
+            victim, _ = self.a1in.popitem(last=False)
+            self.a1out[victim] = None
+            if len(self.a1out) > self.kout:
+                self.a1out.popitem(last=False)
+        else:
+            victim, _ = self.am.popitem(last=False)
+        self.last_victim = victim
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，返回命中次数 (重复访问不改变状态)"""
+        return self.access(page) + count - 1
+
+    def access(self, page):
+        if page in self.am:
+            self.am.move_to_end(page)
+            return True
+        if page in self.a1in:
+            return True
+
+        # 先从 A1out 中取出，腾出页框时 A1out 的淘汰不能把该页挤掉
+        remembered = page in self.a1out
+        if remembered:
+            del self.a1out[page]
+        self._reclaim()
+        if remembered:
+            self.am[page] = None
+        else:
+            self.a1in[page] = None
+        return False
+
+
+# 8. LIRS
+class LIRSPolicy:
+    """LIRS 置换策略 (Jiang & Zhang)
+
+    按两次访问之间出现的不同页面数 (IRR) 区分 LIR 页与 HIR 页：
+    栈 S 记录最近访问过的页 (栈底总是 LIR 页)，队列 Q 记录驻留的 HIR 页，淘汰总是从 Q 队首进行。
+    hir_ratio 为分给驻留 HIR 页的页框比例；S 中保留的非驻留 HIR 页最多 ghost_ratio * 页框数 个。
+    """
+
+    LIR, HIR, GHOST = 0, 1, 2
+
+    def __init__(self, frame_count, hir_ratio=0.01, ghost_ratio=2):
+        self.frame_count = frame_count
+        hir_size = max(1, int(frame_count * hir_ratio))
+        self.lir_size = max(frame_count - hir_size, 0)
+        self.ghost_limit = max(1, int(frame_count * ghost_ratio))
+        self.state = {}  # 页面 -> LIR / HIR (驻留) / GHOST (非驻留，只在 S 中)
+        self.stack = OrderedDict()  # 栈 S，栈底在前
+        self.queue = OrderedDict()  # 驻留 HIR 页，队首在前
+        self.ghosts = OrderedDict()  # S 中的非驻留 HIR 页，按成为非驻留的先后排列
+        self.lir_count = 0
+        self.resident = 0
+        self.last_victim = None
+
+    def __contains__(self, page):
+        state = self.state.get(page)
+        return state is not None and state != self.GHOST
+
+    def __len__(self):
+        return self.resident
+
+    def pages(self):
+        return [page for page, state in self.state.items() if state != self.GHOST]
+
+    def _prune(self):
+        """弹出栈底的 HIR 页，直到栈底为 LIR 页"""
+        stack = self.stack
+        state = self.state
+        while stack:
+            bottom = next(iter(stack))
+            if state[bottom] == self.LIR:
+                break
+            del stack[bottom]
+            if state[bottom] == self.GHOST:
+                del state[bottom]
+                del self.ghosts[bottom]
+
+    def _demote_bottom(self):
+        """把栈底的 LIR 页降为驻留 HIR 页"""
+        self._prune()
+        bottom, _ = self.stack.popitem(last=False)
+        self.state[bottom] = self.HIR
+        self.queue[bottom] = None
+        self.lir_count -= 1
+        self._prune()
+
+    def _make_lir(self, page):
+        self.state[page] = self.LIR
+        self.lir_count += 1
+        self.stack[page] = None
+        self.stack.move_to_end(page)
+        while self.lir_count > self.lir_size:
+            self._demote_bottom()
+
+    def _evict(self):
+        state = self.state
+        if self.queue:
+            victim, _ = self.queue.popitem(last=False)
+            if victim in self.stack:
+                state[victim] = self.GHOST
+                self.ghosts[victim] = None
+                if len(self.ghosts) > self.ghost_limit:
+                    oldest, _ = self.ghosts.popitem(last=False)
+                    del self.stack[oldest]
+                    del state[oldest]
+            else:
+                del state[victim]
+        else:
+            self._prune()
+            victim, _ = self.stack.popitem(last=False)
+            del state[victim]
+            self.lir_count -= 1
+            self._prune()
+        self.resident -= 1
+        self.last_victim = victim
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次
+
+        第二次访问把栈中的驻留 HIR 页升为 LIR 页，之后的访问不改变状态；
+        只有 1 个页框时没有 LIR 页，页面在 HIR 的两种状态间交替，只能逐次处理。
+        """
+        hits = self.access(page)
+        repeats = 0
+        while repeats < count - 1 and self.state[page] != self.LIR:
+            hits += self.access(page)
+            repeats += 1
+        return hits + count - 1 - repeats
+
+    def access(self, page):
+        state = self.state
+        stack = self.stack
+        current = state.get(page)
+
+        if current == self.LIR:
+            at_bottom = next(iter(stack)) == page
+            stack.move_to_end(page)
+            if at_bottom:
+                self._prune()
+            return True
+
+        if current == self.HIR:
+            if page in stack:
+                del self.queue[page]
+                self._make_lir(page)
+            else:
+                stack[page] = None
+                self.queue.move_to_end(page)
+            return True
+
+        # 缺页，淘汰时可能顺带清理掉该页在 S 中的记录，需要重新取状态
+        self.last_victim = None
+        if self.resident >= self.frame_count:
+            self._evict()
+            current = state.get(page)
+        self.resident += 1
+
+        if current == self.GHOST:
+            del self.ghosts[page]
+            self._make_lir(page)
+        elif self.lir_count < self.lir_size:
+            self._make_lir(page)
+        else:
+            state[page] = self.HIR
+            stack[page] = None
+            stack.move_to_end(page)
+            self.queue[page] = None
+        return False
+
+
+# 9. 工作集 / WSClock
+class WorkingSetPolicy:
+    """工作集置换策略：驻留集为最近 window 次访问中出现过的页面，页框数随之变化
+
+    用滑动窗口维护窗口内每个页面的出现次数，窗口按 [页面, 连续次数] 游程存放，每次访问均摊 O(1)。
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.recent = deque()  # 窗口内的访问，[页面, 连续次数]
+        self.length = 0  # 窗口内的访问次数
+        self.counts = {}  # 页面 -> 在窗口内出现的次数
+
+    def __contains__(self, page):
+        return page in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def pages(self):
+        return list(self.counts)
+
+    def access(self, page):
+        return self.access_run(page, 1) == 1
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，返回命中次数"""
+        counts = self.counts
+        recent = self.recent
+        hit = page in counts
+        counts[page] = counts.get(page, 0) + count
+        if recent and recent[-1][0] == page:
+            recent[-1][1] += count
+        else:
+            recent.append([page, count])
+        self.length += count
+
+        # 窗口左端移出多余的访问，游程可能只移出一部分
+        excess = self.length - self.window
+        while excess > 0:
+            run = recent[0]
+            old, removed = run[0], min(run[1], excess)
+            run[1] -= removed
+            if not run[1]:
+                recent.popleft()
+            if counts[old] == removed:
+                del counts[old]
+            else:
+                counts[old] -= removed
+            excess -= removed
+            self.length -= removed
+        return hit + count - 1
+
+
+def simulate_working_set(page_stream, window):
+    """工作集算法，返回 (缺页次数, 命中/缺页序列, 每次访问后的工作集大小)"""
+    policy = WorkingSetPolicy(window)
+    access = policy.access
+    counts = policy.counts
+    hit_miss = bytearray(len(page_stream))
+    sizes = array('i', [0]) * len(page_stream)
+    page_faults = 0
+    for i, page in enumerate(iter_pages(page_stream)):
+        if access(page):
+            hit_miss[i] = 1
+        else:
+            page_faults += 1
+        sizes[i] = len(counts)
+    return page_faults, hit_miss, sizes
+
+
+def working_set_report(page_stream, window, interval=100):
+    """工作集算法按每 interval 次访问分段统计，返回 [(起始访问序号, 命中率, 平均工作集大小, 最大工作集大小)]"""
+    _, hit_miss, sizes = simulate_working_set(page_stream, window)
+    report = []
+    for start in range(0, len(hit_miss), interval):
+        hits = hit_miss[start:start + interval]
+        segment = sizes[start:start + interval]
+        report.append((start, sum(hits) / len(hits), sum(segment) / len(segment), max(segment)))
+    return report
+
+
+def working_set_curve(page_stream, max_window):
+    """一次扫描求出窗口为 1..max_window 时工作集算法的缺页次数和平均工作集大小
+
+    页面两次相邻访问的间隔为 g 时，第二次访问在窗口 >= g 时命中；
+    一次访问使该页在之后 min(g, 窗口) 次访问的工作集中 (最后一次访问算到序列末尾)。
+    返回列表，第 w 项为 (w, 缺页次数, 平均工作集大小)，第 0 项不使用。
+    """
+    n = len(page_stream)
+    reuse_gaps = [0] * (max_window + 2)  # 相邻两次访问的间隔，超过 max_window 的合并计数
+    span_gaps = [0] * (max_window + 2)  # 每次访问到下一次访问 (或序列末尾) 的距离
+    last_access = {}
+    for t, page in enumerate(iter_pages(page_stream)):
+        prev = last_access.get(page)
+        if prev is not None:
+            gap = min(t - prev, max_window + 1)
+            reuse_gaps[gap] += 1
+            span_gaps[gap] += 1
+        last_access[page] = t
+    for t in last_access.values():
+        span_gaps[min(n - t, max_window + 1)] += 1
+
+    curve = [(0, n, 0.0)]
+    hits = 0
+    covered = 0  # 所有访问的 min(g, 窗口) 之和
+    longer = n  # 距离 >= 当前窗口的访问数
+    for w in range(1, max_window + 1):
+        covered += longer
+        longer -= span_gaps[w]
+        hits += reuse_gaps[w]
+        curve.append((w, n - hits, covered / n if n else 0.0))
+    return curve
+
+
+class WSClockPolicy:
+    """WSClock 置换策略：页框排成环形，指针跳过访问位为 1 或距上次使用不超过 tau 次访问的页
+
+    tau 为工作集窗口 (以访问次数计的虚拟时间)，默认取页框数的 2 倍；
+    转一圈仍找不到工作集之外的页时，淘汰最久未使用的页。
+    """
+
+    def __init__(self, frame_count, tau=None):
+        self.frame_count = frame_count
+        self.tau = tau if tau is not None else 2 * frame_count
+        self.slots = []
+        self.referenced = []
+        self.last_use = []
+        self.index = {}
+        self.hand = 0
+        self.time = 0
+        self.last_victim = None
+
+    def __contains__(self, page):
+        return page in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def pages(self):
+        return list(self.slots)
+
+    def access_run(self, page, count):
+        """连续访问同一页面 count 次，虚拟时间推进 count，最后使用时间记为游程末尾"""
+        hit = self.access(page)
+        if count > 1:
+            self.time += count - 1
+            self.last_use[self.index[page]] = self.time
+        return hit + count - 1
+
+    def access(self, page):
+        self.time += 1
+        slot = self.index.get(page)
+        if slot is not None:
+            self.referenced[slot] = True
+            self.last_use[slot] = self.time
+            return True
+
+        if len(self.slots) < self.frame_count:
+            self.index[page] = len(self.slots)
+            self.slots.append(page)
+            self.referenced.append(True)
+            self.last_use.append(self.time)
+            self.last_victim = None
+            return False
+
+        referenced = self.referenced
+        last_use = self.last_use
+        hand = self.hand
+        for _ in range(self.frame_count):
+            if referenced[hand]:
+                referenced[hand] = False
+            elif self.time - last_use[hand] > self.tau:
+                break
+            hand = (hand + 1) % self.frame_count
+        else:
+            hand = min(range(self.frame_count), key=last_use.__getitem__)
+
+        victim = self.last_victim = self.slots[hand]
+        del self.index[victim]
+        self.slots[hand] = page
+        referenced[hand] = True
+        last_use[hand] = self.time
+        self.index[page] = hand
+        self.hand = (hand + 1) % self.frame_count
+        return False
+
+
+# 10. 按名称创建置换策略 (OPT 需要预知未来访问，不在此列，见 simulate_opt；
+#     工作集算法的页框数不固定，见 simulate_working_set)
+POLICIES = {
+    'FIFO': FIFOPolicy,
+    'LRU': LRUPolicy,
+    'LFU': LFUPolicy,
+    'CLOCK': ClockPolicy,
+    'SECOND_CHANCE': SecondChancePolicy,
+    'ARC': ARCPolicy,
+    '2Q': TwoQueuePolicy,
+    'LIRS': LIRSPolicy,
+    'WSCLOCK': WSClockPolicy,
+    'CLEAN_CLOCK': CleanFirstClockPolicy,
+}
+
+# 界面中按此顺序列出全部算法
+ALGORITHMS = ['FIFO', 'LRU', 'OPT', 'LFU', 'CLOCK', 'SECOND_CHANCE', 'ARC', '2Q', 'LIRS', 'WSCLOCK']
+
+
+def make_policy(name, frame_count, **params):
+    """按算法名称创建置换策略，params 为该策略的额外参数 (如 LFU 的 tie_break)"""
+    try:
+        policy_class = POLICIES[name.upper()]
+    except KeyError:
+        raise ValueError(f"未知的页面置换算法: {name}") from None
+    return policy_class(frame_count, **params)
@@ -0,0 +1,245 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+
+import page_replacement_engine as engine
+
+
+# 模拟结果缓存
+# 键为 (页地址流的内容哈希, 算法, 页框数, 策略参数)，页地址流不变时重复运行、切换标签页、
+# 重画图表都直接取出已有结果。内存中按 LRU 保留最近的结果；指定缓存目录时结果同时写入磁盘，
+# 程序重启后仍可复用。缓存只是加速手段，磁盘读写出错或文件内容无效时当作未命中处理。
+# 缓存的结果只有整数、bytes 和它们组成的元组，磁盘上存为 JSON (bytes 用 base64)，
+# 读取时不会执行文件中的任何代码，缓存目录被他人写入也只会得到错误的结果或未命中。
+# 命中/缺页序列随页地址流变长，内存中的条目数和总字节数都有上限；只需要缺页次数的扫描
+# (如按帧数画命中率曲线) 用 fault_count，只缓存一个整数。
+# 缓存目录默认取环境变量 PAGE_RESULT_CACHE_DIR，未设置时只使用内存缓存。
+# 键中带有版本：CACHE_VERSION 在结果格式或模拟语义改变时手动递增，另外再加上模拟引擎源文件的哈希，
+# 引擎代码一改，磁盘上旧版本算出的结果自然不再命中。
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CACHE_DIR_ENV = 'PAGE_RESULT_CACHE_DIR'
+CACHE_VERSION = 3
+
+
+def _engine_digest():
+    """模拟引擎源文件的哈希，读不到源文件时为空"""
+    try:
+        with open(engine.__file__, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    except (OSError, TypeError):
+        return ''
+
+
+VERSION_SALT = f"v{CACHE_VERSION}.{_engine_digest()}"
+
+
+def stream_fingerprint(page_stream):
+    """页地址流的内容哈希 (按 int64 序列计算，列表和 NumPy 数组得到相同结果)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for start in range(0, len(page_stream), engine.CHUNK_SIZE):
+        chunk = page_stream[start:start + engine.CHUNK_SIZE]
+        if hasattr(chunk, 'tolist'):
+            chunk = chunk.tolist()
+        digest.update(array('q', chunk).tobytes())
+    digest.update(len(page_stream).to_bytes(8, 'little'))
+    return digest.hexdigest()
+
+
+def result_key(fingerprint, algorithm, frame_count, params=None):
+    params = sorted((params or {}).items())
+    return f"{VERSION_SALT}|{fingerprint}|{algorithm.upper()}|{frame_count}|{params!r}"
+
+
+def encode_value(value):
+    """把缓存值转换为可写成 JSON 的形式：整数不变，bytes 记为 {'bytes': base64}，元组记为列表"""
+    if isinstance(value, bool) or not isinstance(value, (int, bytes, bytearray, tuple)):
+        raise TypeError(f"结果缓存不支持的值类型: {type(value).__name__}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, tuple):
+        return [encode_value(item) for item in value]
+    return {'bytes': base64.b64encode(value).decode('ascii')}
+
+
+def decode_value(data):
+    """encode_value 的逆变换，内容不符合格式时抛出 ValueError"""
+    if isinstance(data, bool):
+        raise ValueError("缓存文件格式错误")
+    if isinstance(data, int):
+        return data
+    if isinstance(data, list):
+        return tuple(decode_value(item) for item in data)
+    if isinstance(data, dict) and set(data) == {'bytes'} and isinstance(data['bytes'], str):
+        return base64.b64decode(data['bytes'], validate=True)
+    raise ValueError("缓存文件格式错误")
+
+
+def value_size(value):
+    """缓存值大致占用的内存字节数 (元组、列表逐项累加)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(value_size(item) for item in value)
+    return size
+
+
+class ResultCache:
+    """两级结果缓存：内存中最多保留 max_entries 条、共 max_bytes 字节 (LRU 淘汰)，
+    cache_dir 不为 None 时再写入磁盘
+
+    超过 max_bytes 的单个结果不留在内存中 (仍写入磁盘)。可被界面线程和批量运行的工作线程同时使用。
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()  # 键 -> (值, 字节数)
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _path(self, key):
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=20).hexdigest()
+        return os.path.join(self.cache_dir, name[:2], name + '.json')
+
+    def _remember(self, key, value):
+        size = value_size(value)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+
+        if self.cache_dir is not None:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    record = json.load(f)
+                stored_key, value = record['key'], decode_value(record['value'])
+            except (OSError, ValueError, TypeError, KeyError, AttributeError, RecursionError):
+                stored_key = None
+            if stored_key == key:
+                self._remember(key, value)
+                with self.lock:
+                    self.hits += 1
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir is None:
+            return
+        try:
+            data = json.dumps({'key': key, 'value': encode_value(value)})
+        except (TypeError, ValueError):
+            return  # 不能存成 JSON 的值只留在内存中
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，其他进程不会读到写了一半的文件
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """清空内存中的缓存 (磁盘上的文件保留)"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = self.misses = 0
+
+
+shared_cache = ResultCache(cache_dir=os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def _simulate(page_stream, algorithm, frame_count, params):
+    if algorithm == 'OPT':
+        page_faults, hits, pages = engine.simulate_opt(page_stream, frame_count)
+    else:
+        page_faults, hits, pages = engine.run_policy(engine.make_policy(algorithm, frame_count, **params),
+                                                     page_stream)
+    return page_faults, bytes(hits), tuple(pages)
+
+
+def simulate(page_stream, algorithm, frame_count, cache=None, fingerprint=None, **params):
+    """带缓存的模拟，返回 (缺页次数, 命中/缺页序列, 最终驻留页面)
+
+    命中/缺页序列为 bytes (1=命中, 0=缺页)，驻留页面为元组，缓存中的结果不会被调用方修改；
+    fingerprint 可传入预先求好的 stream_fingerprint(page_stream)。
+    """
+    if cache is None:
+        cache = shared_cache
+    algorithm = algorithm.upper()
+    if fingerprint is None:
+        fingerprint = stream_fingerprint(page_stream)
+    key = result_key(fingerprint, algorithm, frame_count, params)
+    return cache.get_or_compute(key, lambda: _simulate(page_stream, algorithm, frame_count, params))
+
+
+def _fault_count(page_stream, algorithm, frame_count, params):
+    # 只要缺页次数时在游程压缩的页地址流上运行，不生成命中序列
+    runs = engine.run_lengths(page_stream)
+    if algorithm == 'OPT':
+        return engine.simulate_opt_runs(runs, frame_count)[0]
+    return engine.replay_runs(engine.make_policy(algorithm, frame_count, **params), runs)[1]
+
+
+def fault_count(page_stream, algorithm, frame_count, cache=None, fingerprint=None, **params):
+    """带缓存的缺页次数，缓存中只保存一个整数，适合按帧数扫描画曲线"""
+    if cache is None:
+        cache = shared_cache
+    algorithm = algorithm.upper()
+    if fingerprint is None:
+        fingerprint = stream_fingerprint(page_stream)
+    key = result_key(fingerprint, algorithm + '-FAULTS', frame_count, params)
+    return cache.get_or_compute(key, lambda: _fault_count(page_stream, algorithm, frame_count, params))
+
+
+def lru_hit_counts(page_stream, max_frames, cache=None, fingerprint=None):
+    """带缓存的 engine.lru_hit_counts"""
+    if cache is None:
+        cache = shared_cache
+    if fingerprint is None:
+        fingerprint = stream_fingerprint(page_stream)
+    key = result_key(fingerprint, 'LRU-HIT-COUNTS', max_frames)
+    return cache.get_or_compute(key, lambda: tuple(engine.lru_hit_counts(page_stream, max_frames)))
@@ -0,0 +1,214 @@
+import bisect
+import heapq
+import itertools
+import math
+
+import page_replacement_engine as engine
+
+
+# SHARDS 采样估计 LRU 缺页率曲线 (Waldspurger et al., FAST'15)
+# 按页号的哈希值做空间采样：哈希值 mod P < T 的页面的全部访问都被采样，采样率 R = T / P。
+# 只对采样到的页面求栈距离，距离除以 R 即为原序列中栈距离的估计，每次采样访问代表 1/R 次访问。
+# 指定 max_pages 时为固定样本数的 SHARDS_max：采样页面超过上限时降低 T，
+# 丢掉哈希值最大的页面，内存占用与序列长度无关。
+# 误差估计：采样页面再按哈希值的另一部分分为 groups 组，每组相当于采样率 R/groups 的独立估计，
+# 各组结果的标准差除以 sqrt(groups) 作为标准误差，报告其 1.96 倍作为约 95% 的误差上限 (偏保守)。
+# 顺序执行时同一页常被连续访问，紧接着重复的访问栈距离确定为 1，不按采样率放大。
+# 一个页面也没有采样到时没有任何估计，缺页率和误差都为 None；采样页面太少时估计也不可信，
+# 指定 min_pages 时从采样率 1 开始，采样页面超过 min_pages 后才像 SHARDS_max 一样逐步降低阈值，
+# 但不低于 rate：最终采样率约为 max(rate, min_pages / 不同页面数)，仍只扫描一遍，不必预先统计不同页面数。
+
+MODULUS = 1 << 24
+MASK64 = (1 << 64) - 1
+Z_95 = 1.96
+MIN_SAMPLED_PAGES = 32
+
+
+def page_hash(page, seed=0):
+    """64 位页号哈希 (splitmix64)"""
+    z = (page * 0x9E3779B97F4A7C15 + seed) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+class OnlineStackDistance:
+    """在线求栈距离，内存只与当前记录的页面数有关
+
+    树状数组只在每个页面最近一次访问的时间戳上记 1；时间戳用完时按先后重新编号，
+    容量随记录的页面数翻倍增长，重新编号的开销均摊到每次访问为 O(log n)。
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.tree = engine.FenwickTree(capacity)
+        self.last = {}  # 页面 -> 最近一次访问的时间戳
+        self.time = 0
+
+    def __len__(self):
+        return len(self.last)
+
+    def access(self, page):
+        """返回栈距离，首次访问返回 0"""
+        prev = self.last.pop(page, None)
+        distance = 0
+        if prev is not None:
+            distance = len(self.last) - self.tree.prefix_sum(prev) + 2
+            self.tree.add(prev, -1)
+        if self.time >= self.capacity:
+            self._compact()
+        self.tree.add(self.time, 1)
+        self.last[page] = self.time
+        self.time += 1
+        return distance
+
+    def remove(self, page):
+        self.tree.add(self.last.pop(page), -1)
+
+    def _compact(self):
+        order = sorted(self.last, key=self.last.get)
+        self.capacity = max(self.capacity, 2 * len(order) + 2)
+        self.last = {page: i for i, page in enumerate(order)}
+        # 前 len(order) 个位置为 1，直接写出树状数组的各个节点
+        self.tree = engine.FenwickTree(self.capacity)
+        tree = self.tree.tree
+        count = len(order)
+        for i in range(1, self.capacity + 1):
+            tree[i] = max(0, min(i, count) - (i - (i & -i)))
+        self.time = count
+
+
+class ShardsMRC:
+    """SHARDS 缺页率曲线估计器
+
+    rate 为初始采样率；max_pages 不为 None 时最多记录 max_pages 个采样页面，采样率随之下降；
+    min_pages 不为 None 时从采样率 1 开始，采样页面超过 min_pages 时降低采样率，但不低于 rate；
+    groups 为误差估计的分组数，seed 为哈希种子。
+    """
+
+    def __init__(self, rate=0.01, max_pages=None, groups=8, seed=0, min_pages=None):
+        if not 0 < rate <= 1:
+            raise ValueError(f"采样率必须在 (0, 1] 内: {rate}")
+        self.floor = max(1, int(rate * MODULUS))
+        self.threshold = MODULUS if min_pages is not None else self.floor
+        self.max_pages = max_pages
+        self.min_pages = min_pages
+        self.groups = groups
+        self.seed = seed
+        self.references = 0
+        self.sampled = 0
+        self.previous = None  # 上一次访问的页面 (不论是否采样)
+        self.stack = OnlineStackDistance()
+        self.group_stacks = [OnlineStackDistance() for _ in range(groups)]
+        self.group_of = {}  # 采样页面 -> 所在组
+        self.largest = []  # (-哈希值, 页面)，用于淘汰哈希值最大的采样页面
+        # 加权的栈距离分布：{估计的栈距离: 权重}，0 表示首次访问
+        self.histogram = {}
+        self.group_histograms = [{} for _ in range(groups)]
+
+    @property
+    def rate(self):
+        return self.threshold / MODULUS
+
+    @property
+    def sampled_pages(self):
+        """当前记录的采样页面数"""
+        return len(self.stack)
+
+    def access(self, page):
+        self.references += 1
+        repeat = page == self.previous
+        self.previous = page
+        h = page_hash(page, self.seed)
+        if h & (MODULUS - 1) < self.threshold:
+            self.sample(page, h, repeat)
+
+    def sample(self, page, h, repeat=False):
+        """处理一次哈希值为 h 的访问 (阈值可能已下降，需重新判断)；repeat 表示与上一次访问是同一页"""
+        value = h & (MODULUS - 1)
+        if value >= self.threshold:
+            return
+        self.sampled += 1
+
+        rate = self.rate
+        group = self.group_of.get(page)
+        if group is None:
+            group = self.group_of[page] = (h >> 32) % self.groups
+            if self.max_pages is not None or self.threshold > self.floor:
+                heapq.heappush(self.largest, (-value, page))
+
+        distance = self.stack.access(page)
+        _add(self.histogram, distance, rate, repeat)
+        group_distance = self.group_stacks[group].access(page)
+        _add(self.group_histograms[group], group_distance, rate / self.groups, repeat)
+
+        if self.max_pages is not None and len(self.stack) > self.max_pages:
+            self._lower_threshold(1)
+        elif self.min_pages is not None and self.threshold > self.floor and len(self.stack) > self.min_pages:
+            self._lower_threshold(self.floor)
+
+    def feed(self, page_stream):
+        access = self.access
+        for page in engine.iter_pages(page_stream):
+            access(page)
+        return self
+
+    def _lower_threshold(self, floor):
+        """把采样阈值降到当前最大的哈希值 (不低于 floor)，丢掉哈希值不小于新阈值的页面"""
+        largest = self.largest
+        self.threshold = max(floor, -largest[0][0])
+        while largest and -largest[0][0] >= self.threshold:
+            _, page = heapq.heappop(largest)
+            self.stack.remove(page)
+            self.group_stacks[self.group_of.pop(page)].remove(page)
+
+    def miss_ratio_curve(self, frame_counts):
+        """返回 [(页框数, 估计缺页率, 95% 误差上限)]
+
+        有采样的分组不足 2 个时误差为 None；一个页面也没有采样到时估计缺页率也为 None。
+        """
+        frame_counts = list(frame_counts)
+        estimate = _miss_ratios(self.histogram, frame_counts)
+        group_estimates = [_miss_ratios(h, frame_counts) for h in self.group_histograms if h]
+        curve = []
+        for i, frames in enumerate(frame_counts):
+            error = None
+            if estimate[i] is not None and len(group_estimates) >= 2:
+                values = [g[i] for g in group_estimates]
+                mean = sum(values) / len(values)
+                variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+                error = Z_95 * math.sqrt(variance / len(values))
+            curve.append((frames, estimate[i], error))
+        return curve
+
+
+def _add(histogram, distance, rate, repeat):
+    """按采样率放大栈距离，记入权重 1 / rate"""
+    if repeat:
+        key = 1
+    else:
+        key = 0 if distance == 0 else max(1, round(distance / rate))
+    histogram[key] = histogram.get(key, 0.0) + 1 / rate
+
+
+def _miss_ratios(histogram, frame_counts):
+    total = sum(histogram.values())
+    if not total:
+        # 没有采样访问时无从估计，不能当作缺页率 0
+        return [None] * len(frame_counts)
+    # 首次访问和栈距离大于页框数的访问为缺页
+    distances = sorted(d for d in histogram if d)
+    cumulative = list(itertools.accumulate(histogram[d] for d in distances))
+    ratios = []
+    for frames in frame_counts:
+        count = bisect.bisect_right(distances, frames)
+        ratios.append(1 - (cumulative[count - 1] if count else 0.0) / total)
+    return ratios
+
+
+def shards_mrc(page_stream, frame_counts, rate=0.01, max_pages=None, groups=8, seed=0, min_pages=None):
+    """一次扫描估计各页框数下 LRU 的缺页率，返回 [(页框数, 估计缺页率, 95% 误差上限)]
+
+    没有采样到任何页面时估计缺页率为 None (见 ShardsMRC.miss_ratio_curve)。
+    """
+    return ShardsMRC(rate, max_pages, groups, seed, min_pages).feed(page_stream).miss_ratio_curve(frame_counts)
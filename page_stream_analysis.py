@@ -0,0 +1,116 @@
+import argparse
+import csv
+import json
+from array import array
+
+import page_replacement_engine as engine
+
+
+# 页地址流分析：重用距离分布、访问间隔分布、各页面访问次数，以及由重用距离得到的缺页率曲线 (MRC)
+# 重用距离即 LRU 栈距离 (两次访问之间出现的不同页面数 + 1)，用树状数组 O(n log n) 求出；
+# 任意页框数下的 LRU 缺页率都可以从重用距离分布直接读出，无需逐个页框数模拟。
+
+MRC_COLUMNS = ('frames', 'misses', 'miss_ratio', 'hit_ratio')
+
+
+def reuse_distance_histogram(page_stream):
+    """返回 (histogram, 首次访问次数)，histogram[d] 为重用距离为 d 的访问次数 (histogram[0] = 0)"""
+    distances = engine.lru_stack_distances(page_stream)
+    histogram = [0] * (max(distances, default=0) + 1)
+    for d in distances:
+        histogram[d] += 1
+    cold_misses = histogram[0]
+    histogram[0] = 0
+    return histogram, cold_misses
+
+
+def gap_histogram(page_stream):
+    """同一页面相邻两次访问之间的间隔 (访问次数之差) 的分布，返回 {间隔: 次数}，按间隔排序"""
+    gaps = {}
+    last_access = {}
+    for t, page in enumerate(engine.iter_pages(page_stream)):
+        prev = last_access.get(page)
+        if prev is not None:
+            gaps[t - prev] = gaps.get(t - prev, 0) + 1
+        last_access[page] = t
+    return dict(sorted(gaps.items()))
+
+
+def page_access_counts(page_stream):
+    """各页面的访问次数，按次数从多到少排列"""
+    counts = {}
+    for page in engine.iter_pages(page_stream):
+        counts[page] = counts.get(page, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def miss_ratio_curve(histogram, cold_misses, max_frames=None):
+    """由重用距离分布求 LRU 缺页率曲线，返回 [(页框数, 缺页次数, 缺页率, 命中率)]，页框数从 1 开始"""
+    references = sum(histogram) + cold_misses
+    if max_frames is None:
+        max_frames = max(len(histogram) - 1, 1)
+    curve = []
+    misses = references
+    for k in range(1, max_frames + 1):
+        if k < len(histogram):
+            misses -= histogram[k]
+        if references:
+            curve.append((k, misses, misses / references, (references - misses) / references))
+        else:
+            curve.append((k, 0, 0.0, 0.0))
+    return curve
+
+
+def analyze(page_stream, max_frames=None):
+    """计算全部分析结果，返回可直接写成 JSON 的字典"""
+    histogram, cold_misses = reuse_distance_histogram(page_stream)
+    counts = page_access_counts(page_stream)
+    return {
+        'references': len(page_stream),
+        'distinct_pages': len(counts),
+        'cold_misses': cold_misses,
+        'reuse_distance_histogram': {d: c for d, c in enumerate(histogram) if c},
+        'gap_histogram': gap_histogram(page_stream),
+        'page_access_counts': counts,
+        'miss_ratio_curve': [dict(zip(MRC_COLUMNS, row)) for row in miss_ratio_curve(histogram, cold_misses, max_frames)],
+    }
+
+
+# 导出
+def export_mrc_csv(path, curve):
+    """把 miss_ratio_curve 的结果写成 CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(MRC_COLUMNS)
+        writer.writerows(curve)
+
+
+def export_json(path, analysis):
+    """把 analyze 的结果写成 JSON (字典的整数键会转为字符串)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, ensure_ascii=False, indent=1)
+
+
+def main(argv=None):
+    import page_trace_io
+
+    parser = argparse.ArgumentParser(description="分析地址轨迹的重用距离并导出缺页率曲线")
+    parser.add_argument('trace', help="轨迹文件 (text / u32 / u64，可 gzip 压缩)")
+    parser.add_argument('--format', default='auto', help="轨迹格式，默认按扩展名判断")
+    parser.add_argument('--page-size', type=int, default=1, help="每页包含的地址数")
+    parser.add_argument('--max-frames', type=int, default=None, help="缺页率曲线的最大页框数")
+    parser.add_argument('--csv', help="缺页率曲线输出路径")
+    parser.add_argument('--json', help="完整分析结果输出路径")
+    args = parser.parse_args(argv)
+
+    pages = array('q', page_trace_io.trace_pages(args.trace, args.page_size, args.format))
+    analysis = analyze(pages, args.max_frames)
+    if args.csv:
+        export_mrc_csv(args.csv, [tuple(row[c] for c in MRC_COLUMNS) for row in analysis['miss_ratio_curve']])
+    if args.json:
+        export_json(args.json, analysis)
+    print(f"访问次数 {analysis['references']}，不同页面数 {analysis['distinct_pages']}")
+
+
+if __name__ == "__main__":
+    main()
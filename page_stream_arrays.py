@@ -0,0 +1,134 @@
+import numpy as np
+
+import page_replacement_engine as engine
+import page_shards
+
+
+# NumPy 版页地址流与命中/缺页序列
+# 指令地址序列用 uint32 保存，页地址流用 int32 保存，命中/缺页序列用 uint8 (1=命中, 0=缺页)
+# 或 packbits 压缩后的位数组保存；1000万次访问的页地址流约 40MB，命中序列约 10MB (压缩后 1.25MB)。
+
+
+# 1. 序列表示与转换
+def instruction_array(instructions, dtype=np.uint32):
+    """把指令地址序列转换为 NumPy 数组"""
+    return np.asarray(instructions, dtype=dtype)
+
+
+def convert_to_page_stream(instructions, instructions_per_page=10, dtype=np.int32):
+    """向量化地把指令地址序列转换为页地址流"""
+    return (np.asarray(instructions) // instructions_per_page).astype(dtype, copy=False)
+
+
+def hits_view(hit_miss):
+    """把引擎返回的 bytearray 命中/缺页序列零拷贝地看作 uint8 数组"""
+    return np.frombuffer(hit_miss, dtype=np.uint8)
+
+
+def pack_hits(hits):
+    """把 uint8 命中/缺页序列压缩为位数组，每次访问只占 1 位"""
+    return np.packbits(np.asarray(hits, dtype=np.uint8))
+
+
+def unpack_hits(packed, count):
+    """把位数组还原为长度为 count 的 uint8 命中/缺页序列"""
+    return np.unpackbits(packed, count=count)
+
+
+# 2. 向量化统计
+def hit_count(hits):
+    return int(np.count_nonzero(hits))
+
+
+def hit_rate(hits):
+    """命中率 = 命中次数 / 总访问次数，没有访问时为 0.0"""
+    return hit_count(hits) / len(hits) if len(hits) else 0.0
+
+
+def windowed_hit_rates(hits, window):
+    """按固定窗口统计命中率，最后不足一个窗口的部分单独计算"""
+    hits = np.asarray(hits, dtype=np.uint8)
+    full = len(hits) // window * window
+    rates = hits[:full].reshape(-1, window).mean(axis=1)
+    if full < len(hits):
+        rates = np.append(rates, hits[full:].mean())
+    return rates
+
+
+# 3. 置换算法 (逐次访问的状态更新仍由 page_replacement_engine 完成)
+def next_use_index(pages):
+    """按页号稳定排序后相邻比较，向量化求出每次访问之后同一页面的下一次访问位置"""
+    pages = np.asarray(pages)
+    n = len(pages)
+    order = np.argsort(pages, kind='stable')
+    same_page = pages[order[1:]] == pages[order[:-1]]
+    next_use = np.full(n, n, dtype=np.int64)
+    next_use[order[:-1][same_page]] = order[1:][same_page]
+    return next_use
+
+
+def run_policy(policy, pages):
+    """用给定的置换策略处理页地址流，返回 (缺页次数, uint8 命中/缺页序列, 最终驻留页面)"""
+    page_faults, hit_miss, resident = engine.run_policy(policy, pages)
+    return page_faults, hits_view(hit_miss), resident
+
+
+def simulate_opt(pages, frame_count):
+    """最佳淘汰算法 (OPT)，下一次访问位置由 next_use_index 向量化求出"""
+    page_faults, hit_miss, resident = engine.simulate_opt(pages, frame_count, next_use_index(pages))
+    return page_faults, hits_view(hit_miss), resident
+
+
+def simulate_lfu(pages, frame_count, tie_break='lru'):
+    """最少访问页面算法 (LFU)"""
+    return run_policy(engine.LFUPolicy(frame_count, tie_break), pages)
+
+
+def lru_stack_distances(pages):
+    """LRU 栈距离 (首次访问记为0)，以 int32 数组返回"""
+    return np.frombuffer(engine.lru_stack_distances(pages), dtype=np.int32)
+
+
+def lru_hit_counts(pages, max_frames=None):
+    """一次扫描求出页框数为 0..max_frames 时 LRU 的命中次数，直方图与累加均向量化"""
+    distances = lru_stack_distances(pages)
+    if max_frames is None:
+        max_frames = len(np.unique(pages))
+    histogram = np.bincount(distances, minlength=max_frames + 1)[:max_frames + 1]
+    histogram[0] = 0
+    return np.cumsum(histogram)
+
+
+def lru_hit_miss(distances, frame_count):
+    """由栈距离得到指定页框数下的 LRU 命中/缺页序列"""
+    distances = np.asarray(distances)
+    return ((distances > 0) & (distances <= frame_count)).astype(np.uint8)
+
+
+# 4. SHARDS 采样 (见 page_shards.py)
+def page_hash_array(pages, seed=0):
+    """向量化的 page_shards.page_hash，uint64 乘法自然按 2^64 取模"""
+    z = np.asarray(pages).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(seed)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def shards_mrc(pages, frame_counts, rate=0.01, max_pages=None, groups=8, seed=0, min_pages=None,
+               chunk_size=engine.CHUNK_SIZE):
+    """page_shards.shards_mrc 的 NumPy 版本：按块向量化求哈希，只把被采样的访问交给估计器"""
+    estimator = page_shards.ShardsMRC(rate, max_pages, groups, seed, min_pages)
+    previous = None
+    for start in range(0, len(pages), chunk_size):
+        chunk = np.asarray(pages[start:start + chunk_size])
+        hashes = page_hash_array(chunk, seed)
+        repeats = np.empty(len(chunk), dtype=bool)
+        repeats[1:] = chunk[1:] == chunk[:-1]
+        repeats[0] = previous is not None and chunk[0] == previous
+        previous = chunk[-1]
+        selected = np.flatnonzero((hashes & np.uint64(page_shards.MODULUS - 1)) < estimator.threshold)
+        sample = estimator.sample
+        for page, h, repeat in zip(chunk[selected].tolist(), hashes[selected].tolist(), repeats[selected].tolist()):
+            sample(page, h, repeat)
+        estimator.references += len(chunk)
+    return estimator.miss_ratio_curve(frame_counts)
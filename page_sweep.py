@@ -0,0 +1,258 @@
+import os
+import random
+import warnings
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import instruction_sequence
+import page_replacement_engine as engine
+import page_shards
+
+
+# 并行参数扫描：算法 × 页框数 × 页面大小 × 随机种子
+# 主进程按种子生成指令序列并转换为各页面大小下的页地址流，全部拼接后放入一块共享内存；
+# 工作进程启动时挂载一次共享内存，之后每个任务只传 (偏移, 长度, 算法, 页框数列表)。
+
+# hit_rate_error 只对 SHARDS 估计有值 (约 95% 的误差上限)，精确模拟的算法为 None
+SWEEP_COLUMNS = ('algorithm', 'frames', 'page_size', 'seed', 'references', 'page_faults', 'hit_rate',
+                 'hit_rate_error')
+
+# 支持读写标记 (脏页写回) 的算法，见 page_replacement_engine.run_policy_rw
+RW_ALGORITHMS = ('FIFO', 'LRU', 'SECOND_CHANCE', 'CLOCK', 'CLEAN_CLOCK')
+
+_shared_memory = None
+_shared_pages = None
+
+
+def default_generator(seed, length):
+    """用上机实验5Gemini的规则生成指令序列 (50% 顺序、25% 前向、25% 后向跳转)"""
+    return instruction_sequence.generate_instruction_sequence(length, random.Random(seed))
+
+
+def _attach(name):
+    """工作进程初始化：按名称挂载共享内存中的页地址流"""
+    global _shared_memory, _shared_pages
+    _shared_memory = shared_memory.SharedMemory(name=name)
+    _shared_pages = _shared_memory.buf.cast('i')
+
+
+def simulate_frame_counts(pages, algorithm, frame_counts, **params):
+    """对同一页地址流计算一个算法在多个页框数下的缺页次数，返回 {页框数: 缺页次数}
+
+    SHARDS 的缺页次数是估计值，需要误差上限时用 simulate_frame_counts_with_error。
+    """
+    results = simulate_frame_counts_with_error(pages, algorithm, frame_counts, **params)
+    return {k: faults for k, (faults, _) in results.items()}
+
+
+def simulate_frame_counts_with_error(pages, algorithm, frame_counts, **params):
+    """返回 {页框数: (缺页次数, 命中率的 95% 误差上限)}，只有 SHARDS 有误差，其余算法为 None"""
+    algorithm = algorithm.upper()
+    if algorithm == 'SHARDS':
+        return shards_frame_counts(pages, frame_counts, **params)[1]
+    if algorithm == 'LRU':
+        # 栈距离一次扫描得到所有页框数的结果
+        references = len(pages)
+        hits = engine.lru_hit_counts(pages, max(frame_counts))
+        return {k: (references - hits[k], None) for k in frame_counts}
+    # 其余算法在游程压缩后的页地址流上运行，连续重复的访问整段计为命中
+    faults = simulate_runs(engine.run_lengths(pages), algorithm, frame_counts, **params)
+    return {k: (faults[k], None) for k in frame_counts}
+
+
+def simulate_frame_counts_rw(pages, writes, algorithm, frame_counts, **params):
+    """按读写标记计算一个算法在多个页框数下的结果，返回 {页框数: (缺页次数, 写回次数)}
+
+    writes 与 pages 等长，非 0 表示写；algorithm 须在 RW_ALGORITHMS 中，结束时仍驻留的脏页不计入写回。
+    """
+    algorithm = algorithm.upper()
+    if algorithm not in RW_ALGORITHMS:
+        raise ValueError(f"{algorithm} 不记录脏页，读写模式请使用 {', '.join(RW_ALGORITHMS)}")
+    results = {}
+    for k in frame_counts:
+        page_faults, write_backs, _ = engine.run_policy_rw(engine.make_policy(algorithm, k, **params), pages, writes)
+        results[k] = (page_faults, write_backs)
+    return results
+
+
+def shards_frame_counts(pages, frame_counts, min_pages=page_shards.MIN_SAMPLED_PAGES, **params):
+    """SHARDS 估计的 LRU 缺页次数，返回 (访问次数, {页框数: (缺页次数, 命中率的 95% 误差上限)})
+
+    pages 可以是任意可迭代的页号流 (如边读边产生的轨迹)，只扫描一遍，内存只与采样页面数有关；
+    参数 rate、max_pages 见 page_shards.ShardsMRC。默认至少采样约 min_pages 个页面 (页面更少时全部采样)，
+    最终采样页面仍少于 page_shards.MIN_SAMPLED_PAGES (如 max_pages 更小) 时给出 RuntimeWarning。
+    缺页次数按估计缺页率取整，没有采样到页面时为 None；缺页率的误差上限即命中率的误差上限。
+    """
+    estimator = page_shards.ShardsMRC(min_pages=min_pages, **params).feed(pages)
+    if estimator.sampled_pages < page_shards.MIN_SAMPLED_PAGES and estimator.rate < 1:
+        warnings.warn(f"SHARDS 只采样到 {estimator.sampled_pages} 个页面 (采样率 {estimator.rate:.4g})，"
+                      f"估计不可靠", RuntimeWarning, stacklevel=2)
+    references = estimator.references
+    curve = estimator.miss_ratio_curve(frame_counts)
+    return references, {k: (None if miss_ratio is None else round(miss_ratio * references), error)
+                        for k, miss_ratio, error in curve}
+
+
+def simulate_runs(runs, algorithm, frame_counts, **params):
+    """在游程压缩的页地址流 [(页号, 连续次数)] 上计算多个页框数的缺页次数，返回 {页框数: 缺页次数}"""
+    algorithm = algorithm.upper()
+    if algorithm == 'LRU':
+        # 去掉连续重复后栈距离不变，重复的访问 (栈距离为 1) 在任何页框数下都命中
+        references = sum(count for _, count in runs)
+        repeats = references - len(runs)
+        hits = engine.lru_hit_counts([page for page, _ in runs], max(frame_counts))
+        return {k: references - repeats - hits[k] for k in frame_counts}
+    if algorithm == 'OPT':
+        return {k: engine.simulate_opt_runs(runs, k)[0] for k in frame_counts}
+    return {k: engine.replay_runs(engine.make_policy(algorithm, k, **params), runs)[1] for k in frame_counts}
+
+
+def _sweep_task(task):
+    offset, length, seed, page_size, algorithm, frame_counts, params = task
+    pages = _shared_pages[offset:offset + length]
+    results = simulate_frame_counts_with_error(pages, algorithm, frame_counts, **params)
+    rows = []
+    for k in frame_counts:
+        faults, error = results[k]
+        rows.append((algorithm, k, page_size, seed, length, faults, None if faults is None else 1 - faults / length,
+                     error))
+    return rows
+
+
+def run_sweep(algorithms=('FIFO', 'LRU', 'OPT', 'LFU'), frame_counts=range(4, 33), page_sizes=(10,),
+              seeds=range(1), length=320, generator=None, max_workers=None, params=None):
+    """并行运行参数扫描，返回按 SWEEP_COLUMNS 排列的结果行列表
+
+    generator(seed, length) 返回指令地址序列，默认为 default_generator；
+    params 为 {算法名: 额外参数字典}，如 {'LFU': {'tie_break': 'fifo'}}、{'SHARDS': {'rate': 0.01}}。
+    """
+    generator = generator or default_generator
+    frame_counts = list(frame_counts)
+    params = params or {}
+
+    # 所有页地址流拼接成一个 int32 数组，记录每条流的位置
+    streams = []
+    pages = array('i')
+    for seed in seeds:
+        instructions = generator(seed, length)
+        for page_size in page_sizes:
+            streams.append((len(pages), len(instructions), seed, page_size))
+            pages.extend(addr // page_size for addr in instructions)
+
+    tasks = [(offset, count, seed, page_size, algorithm, frame_counts, params.get(algorithm, {}))
+             for offset, count, seed, page_size in streams
+             for algorithm in algorithms]
+
+    if not pages:
+        return []
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (4 * workers))
+    shm = shared_memory.SharedMemory(create=True, size=pages.itemsize * len(pages))
+    try:
+        shm.buf[:pages.itemsize * len(pages)] = pages.tobytes()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name,)) as executor:
+            rows = [row for result in executor.map(_sweep_task, tasks, chunksize=chunksize) for row in result]
+    finally:
+        shm.close()
+        shm.unlink()
+    return rows
+
+
+# 页面大小扫描
+# 同一条地址轨迹在多种页面大小下求命中率曲面 (页面大小 × 页框数)，用于选择大页的设置。
+# 页面大小从小到大处理：页面大小是某个较小页面大小的 r 倍时，页号 p 变为 p // r，
+# 直接由较小页面的游程合并得到 (相邻游程页号相同则合并)，不再逐条处理原地址；
+# 页面越大，连续访问同一页的游程越长、条数越少，后面的页面大小越算越快。
+
+DEFAULT_PAGE_SIZES = tuple(1 << i for i in range(13))  # 1, 2, 4, ..., 4096
+SURFACE_COLUMNS = ('page_size', 'frames', 'references', 'page_faults', 'hit_rate')
+
+
+def coarsen_runs(runs, ratio):
+    """页面大小扩大 ratio 倍后的游程"""
+    merged = []
+    for page, count in runs:
+        page //= ratio
+        if merged and merged[-1][0] == page:
+            merged[-1] = (page, merged[-1][1] + count)
+        else:
+            merged.append((page, count))
+    return merged
+
+
+def page_size_runs(addresses, page_sizes=DEFAULT_PAGE_SIZES):
+    """按页面大小从小到大产生 (页面大小, 游程压缩的页地址流)
+
+    每个页面大小从能整除它的最大的较小页面大小 (父页面大小) 的游程合并得到，
+    只有没有父页面大小的 (通常只有最小的一个) 才从原地址计算；
+    某个页面大小的游程在以它为父的页面大小都算完后即丢弃，不随页面大小的个数累积。
+    """
+    sizes = sorted(set(page_sizes))
+    parents = {size: max((s for s in sizes if s < size and size % s == 0), default=None) for size in sizes}
+    children = {}  # 页面大小 -> 还没有算出的、以它为父的页面大小个数
+    for parent in parents.values():
+        if parent is not None:
+            children[parent] = children.get(parent, 0) + 1
+    kept = {}
+    for size in sizes:
+        parent = parents[size]
+        if parent is None:
+            runs = engine.run_lengths(address // size for address in engine.iter_pages(addresses))
+        else:
+            runs = coarsen_runs(kept[parent], size // parent)
+            children[parent] -= 1
+            if not children[parent]:
+                del kept[parent]
+        if children.get(size):
+            kept[size] = runs
+        yield size, runs
+
+
+def page_size_surface(addresses, page_sizes=DEFAULT_PAGE_SIZES, frame_counts=range(1, 65), algorithm='LRU',
+                      **params):
+    """求命中率曲面，返回按 SURFACE_COLUMNS 排列的结果行 (页面大小、页框数均从小到大)"""
+    frame_counts = sorted(frame_counts)
+    rows = []
+    for size, runs in page_size_runs(addresses, page_sizes):
+        references = sum(count for _, count in runs)
+        faults = simulate_runs(runs, algorithm, frame_counts, **params) if runs else dict.fromkeys(frame_counts, 0)
+        for k in frame_counts:
+            hit_rate = 1 - faults[k] / references if references else 0.0
+            rows.append((size, k, references, faults[k], hit_rate))
+    return rows
+
+
+def format_surface(rows):
+    """把命中率曲面格式化为文本表格：每行一个页面大小，每列一个页框数"""
+    frames = sorted({k for _, k, _, _, _ in rows})
+    surface = {}
+    for size, k, _, _, hit_rate in rows:
+        surface.setdefault(size, {})[k] = hit_rate
+    lines = ["{:>10}".format('page_size') + "".join(f"{k:>8}" for k in frames)]
+    for size, rates in surface.items():
+        lines.append(f"{size:>10}" + "".join(f"{rates[k]:>8.4f}" for k in frames))
+    return "\n".join(lines)
+
+
+def format_table(rows):
+    """把扫描结果格式化为文本表格"""
+    lines = ["{:<8}{:>8}{:>10}{:>10}{:>12}{:>12}{:>10}{:>16}".format(*SWEEP_COLUMNS)]
+    for algorithm, frames, page_size, seed, references, page_faults, hit_rate, error in rows:
+        if hit_rate is None:
+            page_faults, hit_rate = '-', '-'
+        else:
+            hit_rate = f"{hit_rate:.4f}"
+        error = '' if error is None else f"±{error:.4f}"
+        lines.append(f"{algorithm:<8}{frames:>8}{page_size:>10}{seed:>10}{references:>12}{page_faults:>12}{hit_rate:>10}"
+                     f"{error:>16}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.time()
+    result_rows = run_sweep(seeds=range(1000))
+    print(f"{len(result_rows)} 组结果，用时 {time.time() - start:.2f} 秒")
@@ -0,0 +1,242 @@
+import gzip
+import itertools
+import mmap
+import os
+import sys
+from array import array
+
+import page_replacement_engine as engine
+
+
+# 地址访问轨迹的流式读取
+# 支持以下格式，均可再用 gzip 压缩 (文件名以 .gz 结尾或文件头为 gzip 魔数)：
+#   text  每行一个地址，十进制或 0x 开头的十六进制，可在地址前或后加 R / W 表示读或写 (默认为读)，
+#         '#' 之后为注释
+#   u32   小端 uint32 二进制地址序列
+#   u64   小端 uint64 二进制地址序列
+#   u32w  小端 uint32 二进制，每项为 地址 * 2 + 写标志 (地址少一位)
+#   u64w  小端 uint64 二进制，同上
+# 未压缩的二进制轨迹通过 mmap 分块读取，整条轨迹不会一次性读入内存。
+# read_trace 只产生地址；read_trace_rw 产生 (地址, 是否为写)，不带读写标记的格式全部当作读。
+
+BINARY_TYPECODES = {'u32': 'I', 'u64': 'Q', 'u32w': 'I', 'u64w': 'Q'}
+RW_FORMATS = ('u32w', 'u64w')
+BINARY_SUFFIXES = {'.u32': 'u32', '.bin': 'u32', '.u64': 'u64', '.u32w': 'u32w', '.u64w': 'u64w'}
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def is_gzip(path):
+    with open(path, 'rb') as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def detect_format(path):
+    """根据扩展名判断轨迹格式 (忽略末尾的 .gz)，无法识别时按文本处理"""
+    name = path[:-3] if path.endswith('.gz') else path
+    return BINARY_SUFFIXES.get(os.path.splitext(name)[1].lower(), 'text')
+
+
+def read_text_trace(path):
+    """逐行读取文本轨迹，产生地址"""
+    for address, _ in read_text_trace_rw(path):
+        yield address
+
+
+def read_text_trace_rw(path):
+    """逐行读取文本轨迹，产生 (地址, 是否为写)"""
+    opener = gzip.open if is_gzip(path) else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            fields = line.split(b'#', 1)[0].split()
+            if not fields:
+                continue
+            write = False
+            if len(fields) == 2:
+                # 读写标记可以在地址之前 ("W 0x1f") 或之后 ("0x1f W")
+                mark = fields[0] if fields[0].upper() in (b'R', b'W') else fields[1]
+                fields.remove(mark)
+                mark = mark.upper()
+                if mark not in (b'R', b'W'):
+                    raise ValueError(f"无法识别的读写标记: {line!r}")
+                write = mark == b'W'
+            elif len(fields) > 2:
+                raise ValueError(f"无法解析的轨迹行: {line!r}")
+            yield int(fields[0], 0), write
+
+
+def read_binary_trace(path, fmt='u32', chunk_size=engine.CHUNK_SIZE):
+    """分块读取小端二进制轨迹，产生地址"""
+    typecode = BINARY_TYPECODES[fmt]
+    width = array(typecode).itemsize
+    chunk_bytes = chunk_size * width
+    swap = sys.byteorder != 'little'
+
+    if is_gzip(path):
+        with gzip.open(path, 'rb') as f:
+            pending = b''
+            while True:
+                data = f.read(chunk_bytes)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - len(data) % width
+                pending = data[usable:]
+                values = array(typecode)
+                values.frombytes(data[:usable])
+                if swap:
+                    values.byteswap()
+                yield from values.tolist()
+        return
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        usable = size - size % width
+        if not usable:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, usable, chunk_bytes):
+                end = min(offset + chunk_bytes, usable)
+                # 视图在交出数据之前释放，生成器中途关闭时 mmap 也能正常关闭
+                with memoryview(mm) as view, view[offset:end] as raw, raw.cast(typecode) as chunk:
+                    if swap:
+                        values = array(typecode, chunk)
+                        values.byteswap()
+                        values = values.tolist()
+                    else:
+                        values = chunk.tolist()
+                yield from values
+
+
+def read_trace(path, fmt='auto'):
+    """按格式读取轨迹文件，产生地址；fmt 为 'auto'、'text'、'u32'、'u64'、'u32w' 或 'u64w'"""
+    if fmt == 'auto':
+        fmt = detect_format(path)
+    if fmt == 'text':
+        return read_text_trace(path)
+    if fmt in RW_FORMATS:
+        return (record >> 1 for record in read_binary_trace(path, fmt))
+    if fmt in BINARY_TYPECODES:
+        return read_binary_trace(path, fmt)
+    raise ValueError(f"未知的轨迹格式: {fmt}")
+
+
+def read_trace_rw(path, fmt='auto'):
+    """按格式读取轨迹文件，产生 (地址, 是否为写)"""
+    if fmt == 'auto':
+        fmt = detect_format(path)
+    if fmt == 'text':
+        return read_text_trace_rw(path)
+    if fmt in RW_FORMATS:
+        return ((record >> 1, bool(record & 1)) for record in read_binary_trace(path, fmt))
+    if fmt in BINARY_TYPECODES:
+        return ((address, False) for address in read_binary_trace(path, fmt))
+    raise ValueError(f"未知的轨迹格式: {fmt}")
+
+
+def write_binary_trace(path, addresses, fmt='u32', writes=None):
+    """把地址序列写成小端二进制轨迹，文件名以 .gz 结尾时压缩
+
+    fmt 为 'u32w' / 'u64w' 时 writes 给出与地址等长的写标志 (为 None 时全部为读)。
+    """
+    typecode = BINARY_TYPECODES[fmt]
+    if fmt in RW_FORMATS:
+        flags = writes if writes is not None else itertools.repeat(False)
+        addresses = (address << 1 | bool(write) for address, write in zip(addresses, flags))
+    elif writes is not None:
+        raise ValueError(f"{fmt} 格式不能保存读写标记，请使用 u32w 或 u64w")
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wb') as f:
+        values = array(typecode)
+        for address in addresses:
+            values.append(address)
+            if len(values) >= engine.CHUNK_SIZE:
+                _write_chunk(f, values)
+                values = array(typecode)
+        _write_chunk(f, values)
+
+
+def _write_chunk(f, values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    f.write(values.tobytes())
+
+
+# 流水线：地址 -> 页号 -> 置换策略
+def trace_pages(path, page_size=1, fmt='auto'):
+    """读取轨迹并把地址转换为页号，page_size 为每页包含的地址数"""
+    for address in read_trace(path, fmt):
+        yield address // page_size
+
+
+def trace_pages_rw(path, page_size=1, fmt='auto'):
+    """读取轨迹，产生 (页号, 是否为写)"""
+    for address, write in read_trace_rw(path, fmt):
+        yield address // page_size, write
+
+
+def iter_hits(policy, pages):
+    """把页号流依次交给置换策略，逐个产生是否命中"""
+    access = policy.access
+    for page in pages:
+        yield access(page)
+
+
+def replay(policy, pages):
+    """流式回放页号流，不保存命中序列，返回 (访问次数, 缺页次数)"""
+    access = policy.access
+    references = page_faults = 0
+    for page in pages:
+        references += 1
+        if not access(page):
+            page_faults += 1
+    return references, page_faults
+
+
+def replay_trace(path, algorithm, frame_count, page_size=1, fmt='auto', **params):
+    """用 FIFO/LRU/LFU 等在线策略回放轨迹文件，返回 (访问次数, 缺页次数)
+
+    页号流边读边做游程压缩，同一页上的连续访问整段交给策略处理。
+    """
+    policy = engine.make_policy(algorithm, frame_count, **params)
+    return engine.replay_runs(policy, engine.iter_runs(trace_pages(path, page_size, fmt)))
+
+
+def replay_trace_rw(path, algorithm, frame_count, page_size=1, fmt='auto', **params):
+    """按读写标记回放轨迹文件，返回 (访问次数, 缺页次数, 写回次数)
+
+    算法须支持脏页记录 (FIFO、LRU、SECOND_CHANCE、CLOCK、CLEAN_CLOCK)；结束时仍驻留的脏页不计入写回。
+    """
+    policy = engine.make_policy(algorithm, frame_count, **params)
+    access = policy.access
+    references = page_faults = 0
+    for page, write in trace_pages_rw(path, page_size, fmt):
+        references += 1
+        if not access(page, write):
+            page_faults += 1
+    return references, page_faults, policy.write_backs
+
+
+def replay_trace_opt(path, frame_count, page_size=1, fmt='auto'):
+    """OPT 需要预知未来，分两遍读取轨迹：第一遍求下一次访问位置，第二遍模拟
+
+    只保存每次访问的下一次访问位置 (8 字节/次)，不保存页号流本身。
+    """
+    next_use = array('q')
+    last_seen = {}
+    for t, page in enumerate(trace_pages(path, page_size, fmt)):
+        next_use.append(-1)
+        prev = last_seen.get(page)
+        if prev is not None:
+            next_use[prev] = t
+        last_seen[page] = t
+    references = len(next_use)
+    for t in last_seen.values():
+        next_use[t] = references
+
+    policy = engine.OPTPolicy(frame_count)
+    access = policy.access
+    page_faults = 0
+    for page, page_next_use in zip(trace_pages(path, page_size, fmt), next_use):
+        if not access(page, page_next_use):
+            page_faults += 1
+    return references, page_faults
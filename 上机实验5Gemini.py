@@ -3,6 +3,11 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 from collections import deque
 
+import instruction_sequence
+import page_replacement_engine as engine
+import page_result_cache
+from page_hit_viewer import HitMissViewer
+
 
 # 1. 指令序列生成 (V2 - 确保无重复且符合规则)
 def generate_instruction_sequence(length=320):
@@ -12,60 +17,8 @@ def generate_instruction_sequence(length=320):
     (2) ~25%的指令是前向跳转。
     (3) ~25%的指令是后向跳转。
     """
-    if length <= 0:
-        return []
-
-    # 使用集合(Set)来存储未使用的地址，以实现O(1)的快速查找和删除
-    pool = set(range(length))
-    sequence = []
-
-    # 1. 随机选择一个起点
-    start_addr = random.choice(list(pool))
-    sequence.append(start_addr)
-    pool.remove(start_addr)
-
-    # 2. 循环生成剩余的指令
-    while pool:  # 当池中还有可用的地址时
-        last_instr = sequence[-1]
-
-        # 尝试执行三种操作，直到成功一种
-        # 使用随机的起始点来避免偏见 (例如总是先尝试顺序执行)
-        choice = random.random()
-
-        # 尝试顺序执行 (50% 概率)
-        if choice < 0.50:
-            next_sequential = last_instr + 1
-            if next_sequential < length and next_sequential in pool:
-                sequence.append(next_sequential)
-                pool.remove(next_sequential)
-                continue  # 成功，进入下一次循环
-
-        # 尝试前向跳转 (25% 概率)
-        if choice < 0.75:
-            forward_options = [p for p in pool if p < last_instr]
-            if forward_options:
-                jump_addr = random.choice(forward_options)
-                sequence.append(jump_addr)
-                pool.remove(jump_addr)
-                continue  # 成功，进入下一次循环
-
-        # 尝试后向跳转 (25% 概率 + 作为其他失败情况的备选)
-        backward_options = [p for p in pool if p > last_instr]
-        if backward_options:
-            jump_addr = random.choice(backward_options)
-            sequence.append(jump_addr)
-            pool.remove(jump_addr)
-            continue  # 成功，进入下一次循环
-
-        # **全局备选方案 (Fallback)**
-        # 如果上述所有尝试都失败了（例如，想顺序但m+1已被用，想前向但前方无可用地址，想后向但后方也无可用地址），
-        # 为了避免程序卡死，就从剩余的池中随机选一个。
-        if pool:
-            fallback_addr = random.choice(list(pool))
-            sequence.append(fallback_addr)
-            pool.remove(fallback_addr)
-
-    return sequence
+    # 未使用的地址用树状数组维护，随机选取前向/后向地址只需 O(log n)
+    return instruction_sequence.generate_instruction_sequence(length)
 
 
 # 2. 转换为页地址流 (无变化)
@@ -116,58 +69,55 @@ def simulate_lru(page_stream, frame_count):
 
 def simulate_opt(page_stream, frame_count):
     """最佳淘汰算法 (OPT)"""
-    memory = []
-    page_faults = 0
-    hit_miss_sequence = []
-
-    for i, page in enumerate(page_stream):
-        if page not in memory:
-            page_faults += 1
-            if len(memory) < frame_count:
-                memory.append(page)
-            else:
-                future_uses = {}
-                for mem_page in memory:
-                    try:
-                        next_use_index = page_stream[i + 1:].index(mem_page)
-                        future_uses[mem_page] = next_use_index
-                    except ValueError:
-                        future_uses[mem_page] = float('inf')
-
-                page_to_replace = max(future_uses, key=future_uses.get)
-                memory[memory.index(page_to_replace)] = page
-            hit_miss_sequence.append('MISS')
-        else:
-            hit_miss_sequence.append('HIT')
+    page_faults, hits, _ = engine.simulate_opt(page_stream, frame_count)
+    hit_miss_sequence = ['HIT' if hit else 'MISS' for hit in hits]
 
     return page_faults, hit_miss_sequence
 
 
 def simulate_lfu(page_stream, frame_count):
     """最少访问页面算法 (LFU)"""
-    memory = {}  # page -> [frequency, entry_time]
-    page_faults = 0
-    hit_miss_sequence = []
+    # 如果频率相同，则找最早进入的页 (FIFO tie-breaker)
+    page_faults, hits, _ = engine.simulate_lfu(page_stream, frame_count, tie_break='fifo')
+    hit_miss_sequence = ['HIT' if hit else 'MISS' for hit in hits]
+
+    return page_faults, hit_miss_sequence
 
-    for t, page in enumerate(page_stream):
-        if page in memory:
-            memory[page][0] += 1  # 增加频率
-            hit_miss_sequence.append('HIT')
-        else:
-            page_faults += 1
-            if len(memory) < frame_count:
-                memory[page] = [1, t]
-            else:
-                # 找到最不常用的页 (LFU)
-                # 如果频率相同，则找最早进入的页 (FIFO tie-breaker)
-                lfu_page = min(memory.keys(), key=lambda p: (memory[p][0], memory[p][1]))
-                del memory[lfu_page]
-                memory[page] = [1, t]
-            hit_miss_sequence.append('MISS')
+
+# 引擎中的其他置换算法 (CLOCK、第二次机会、ARC、2Q、LIRS)
+OTHER_ALGORITHMS = [name for name in engine.ALGORITHMS if name not in ("FIFO", "LRU", "OPT", "LFU")]
+
+
+def simulate_policy(algorithm, page_stream, frame_count):
+    """用引擎中的置换策略模拟，返回格式与 simulate_fifo 等相同"""
+    page_faults, hits, _ = engine.run_policy(engine.make_policy(algorithm, frame_count), page_stream)
+    hit_miss_sequence = ['HIT' if hit else 'MISS' for hit in hits]
 
     return page_faults, hit_miss_sequence
 
 
+def cached_simulation(algorithm, page_stream, frame_count, fingerprint=None):
+    """从结果缓存中取模拟结果 (没有时计算并存入)，返回格式与 simulate_fifo 等相同"""
+    # LFU 频率相同时淘汰最早进入的页
+    params = {'tie_break': 'fifo'} if algorithm == "LFU" else {}
+    page_faults, hits, _ = page_result_cache.simulate(page_stream, algorithm, frame_count,
+                                                      fingerprint=fingerprint, **params)
+    hit_miss_sequence = ['HIT' if hit else 'MISS' for hit in hits]
+
+    return page_faults, hit_miss_sequence
+
+
+def resident_after(algorithm, page_stream, frame_count, index):
+    """第 index 次访问之后驻留的页面"""
+    if algorithm == "OPT":
+        return engine.opt_resident_after(page_stream, frame_count, index)
+    if algorithm == "LFU":
+        policy = engine.LFUPolicy(frame_count, tie_break='fifo')
+    else:
+        policy = engine.make_policy(algorithm, frame_count)
+    return engine.resident_after(policy, page_stream, index)
+
+
 # 4. GUI 界面 (无变化)
 class PageReplacementSimulator(tk.Tk):
     def __init__(self):
@@ -189,6 +139,11 @@ class PageReplacementSimulator(tk.Tk):
         self.run_button = ttk.Button(control_frame, text="1. 生成序列并开始模拟", command=self.run_simulation)
         self.run_button.pack(side="left", padx=10)
 
+        ttk.Label(control_frame, text="算法:").pack(side="left", padx=(10, 5))
+        self.trace_algo_var = tk.StringVar(value="FIFO")
+        ttk.Combobox(control_frame, textvariable=self.trace_algo_var, values=engine.ALGORITHMS,
+                     state="readonly", width=14).pack(side="left", padx=5)
+
         self.show_trace_button = ttk.Button(control_frame, text="2. 查看选中容量的命中序列",
                                             command=self.show_hit_miss_trace)
         self.show_trace_button.pack(side="left", padx=10)
@@ -212,18 +167,21 @@ class PageReplacementSimulator(tk.Tk):
         paned_window.add(right_pane, weight=2)
 
         ttk.Label(right_pane, text="不同内存容量下的命中率结果").pack(anchor='w')
-        cols = ("k (页框数)", "FIFO", "LRU", "OPT", "LFU")
+        cols = ("k (页框数)", *engine.ALGORITHMS)
         self.tree = ttk.Treeview(right_pane, columns=cols, show='headings')
         for col in cols:
             self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, anchor='center')
+            self.tree.column(col, width=70, anchor='center')
         self.tree.pack(fill='both', expand=True)
 
         trace_frame = ttk.Frame(main_frame)
         trace_frame.pack(fill='both', expand=True, pady=5)
         ttk.Label(trace_frame, text="命中/缺页(Hit/Miss)详细序列").pack(anchor='w')
-        self.trace_text = scrolledtext.ScrolledText(trace_frame, height=10, wrap=tk.WORD, state='disabled')
-        self.trace_text.pack(fill='both', expand=True)
+        self.trace_text = scrolledtext.ScrolledText(trace_frame, height=4, wrap=tk.WORD, state='disabled')
+        self.trace_text.pack(fill='x')
+        # 只绘制可见部分的命中序列查看器
+        self.trace_viewer = HitMissViewer(trace_frame, labels=('MISS', 'HIT'))
+        self.trace_viewer.pack(fill='both', expand=True, pady=(5, 0))
 
         self.full_results = {}
 
@@ -245,22 +203,31 @@ class PageReplacementSimulator(tk.Tk):
             self.tree.delete(item)
         self.full_results = {}
 
+        # LRU满足栈性质，栈距离 <= k 的访问即为 k 个页框时的命中
+        lru_distances = engine.lru_stack_distances(page_stream)
+        # 其他算法的结果按页地址流的哈希缓存，同一序列再次模拟时直接取出
+        fingerprint = page_result_cache.stream_fingerprint(page_stream)
+
         for k in range(4, 33):
-            fifo_faults, fifo_trace = simulate_fifo(page_stream, k)
+            fifo_faults, fifo_trace = cached_simulation("FIFO", page_stream, k, fingerprint)
             fifo_rate = 1 - fifo_faults / len(page_stream)
-            lru_faults, lru_trace = simulate_lru(page_stream, k)
-            lru_rate = 1 - lru_faults / len(page_stream)
-            opt_faults, opt_trace = simulate_opt(page_stream, k)
+            lru_trace = ['HIT' if hit else 'MISS' for hit in engine.lru_hit_miss(lru_distances, k)]
+            lru_rate = lru_trace.count('HIT') / len(page_stream)
+            opt_faults, opt_trace = cached_simulation("OPT", page_stream, k, fingerprint)
             opt_rate = 1 - opt_faults / len(page_stream)
-            lfu_faults, lfu_trace = simulate_lfu(page_stream, k)
+            lfu_faults, lfu_trace = cached_simulation("LFU", page_stream, k, fingerprint)
             lfu_rate = 1 - lfu_faults / len(page_stream)
 
-            self.tree.insert("", "end", values=(
-                k, f"{fifo_rate:.4f}", f"{lru_rate:.4f}", f"{opt_rate:.4f}", f"{lfu_rate:.4f}"
-            ))
+            row = [k, f"{fifo_rate:.4f}", f"{lru_rate:.4f}", f"{opt_rate:.4f}", f"{lfu_rate:.4f}"]
             self.full_results[k] = {
                 'FIFO': fifo_trace, 'LRU': lru_trace, 'OPT': opt_trace, 'LFU': lfu_trace
             }
+            for name in OTHER_ALGORITHMS:
+                faults, trace = cached_simulation(name, page_stream, k, fingerprint)
+                row.append(f"{1 - faults / len(page_stream):.4f}")
+                self.full_results[k][name] = trace
+
+            self.tree.insert("", "end", values=row)
 
         self.show_trace_button['state'] = 'normal'
         self.display_in_text_widget(self.trace_text, "模拟完成！请在上方选择内存容量(k)并点击按钮查看详细命中序列。")
@@ -272,17 +239,26 @@ class PageReplacementSimulator(tk.Tk):
             return
 
         results_for_k = self.full_results[k]
+        algorithm = self.trace_algo_var.get()
 
-        trace_output = f"--- 内存容量 k = {k} 时的详细命中序列 ---\n\n"
-        trace_output += f"页地址流: {str(self.page_stream_data)}\n\n"
-        trace_output += f"FIFO 序列: {' '.join(results_for_k['FIFO'])}\n\n"
-        trace_output += f"LRU  序列: {' '.join(results_for_k['LRU'])}\n\n"
-        trace_output += f"OPT  序列: {' '.join(results_for_k['OPT'])}\n\n"
-        trace_output += f"LFU  序列: {' '.join(results_for_k['LFU'])}\n"
-
+        trace_output = f"--- 内存容量 k = {k} 时的命中次数 (共 {len(self.page_stream_data)} 次访问) ---\n"
+        for name in engine.ALGORITHMS:
+            trace_output += f"{name:<13} 命中: {results_for_k[name].count('HIT')}\n"
+        trace_output += f"下方显示 {algorithm} 的详细命中序列，点击某次访问可查看当时驻留的页面。"
         self.display_in_text_widget(self.trace_text, trace_output)
 
+        page_stream = self.page_stream_data
+        self.trace_viewer.set_trace(
+            page_stream,
+            bytearray(result == 'HIT' for result in results_for_k[algorithm]),
+            lambda index: resident_after(algorithm, page_stream, k, index)
+        )
 
-if __name__ == "__main__":
+
+def main():
     app = PageReplacementSimulator()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
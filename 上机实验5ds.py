@@ -2,7 +2,10 @@ import random
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from collections import deque, OrderedDict
-import time
+
+import page_replacement_engine as engine
+from page_batch_worker import BatchWorker, POLL_INTERVAL_MS
+from page_hit_viewer import HitMissViewer
 
 
 class PageReplacementSimulator:
@@ -97,78 +100,74 @@ class PageReplacementSimulator:
 
     def opt_algorithm(self, memory_size):
         """最佳淘汰页面置换算法"""
-        memory = set()
-        page_faults = 0
-        hit_miss_sequence = []
-
-        for i, page in enumerate(self.page_stream):
-            if page not in memory:
-                page_faults += 1
-                hit_miss_sequence.append('M')
-                if len(memory) == memory_size:
-                    farthest_use = -1
-                    page_to_remove = None
-
-                    for mem_page in memory:
-                        found = False
-                        for j in range(i + 1, len(self.page_stream)):
-                            if self.page_stream[j] == mem_page:
-                                if j > farthest_use:
-                                    farthest_use = j
-                                    page_to_remove = mem_page
-                                found = True
-                                break
-
-                        if not found:
-                            page_to_remove = mem_page
-                            break
-
-                    if page_to_remove is not None:
-                        memory.remove(page_to_remove)
-                    else:
-                        memory.remove(next(iter(memory)))
-
-                memory.add(page)
-            else:
-                hit_miss_sequence.append('H')
+        page_faults, hits, memory = engine.simulate_opt(self.page_stream, memory_size)
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
         hit_rate = 1 - page_faults / len(self.page_stream)
-        return hit_rate, hit_miss_sequence, list(memory)
+        return hit_rate, hit_miss_sequence, memory
 
-    def lfu_algorithm(self, memory_size):
-        """最少访问页面算法"""
-        memory = {}
-        page_faults = 0
-        hit_miss_sequence = []
+    def lru_batch_hit_rates(self, max_memory_size):
+        """栈距离算法一次扫描求出1到max_memory_size页内存时的LRU命中率"""
+        hits = engine.lru_hit_counts(self.page_stream, max_memory_size)
+        return [h / len(self.page_stream) for h in hits]
 
-        for page in self.page_stream:
-            for mem_page in memory:
-                if mem_page != page:
-                    memory[mem_page] = (memory[mem_page][0], memory[mem_page][1] + 1)
+    def run_algorithm(self, algorithm, memory_size):
+        """按算法名称运行，返回 (命中率, 命中序列, 最终内存页面)"""
+        if algorithm == "FIFO":
+            return self.fifo_algorithm(memory_size)
+        elif algorithm == "LRU":
+            return self.lru_algorithm(memory_size)
+        elif algorithm == "OPT":
+            return self.opt_algorithm(memory_size)
+        elif algorithm == "LFU":
+            return self.lfu_algorithm(memory_size)
+        elif algorithm in engine.POLICIES:
+            return self.policy_algorithm(algorithm, memory_size)
+        raise ValueError(f"未知的页面置换算法: {algorithm}")
 
-            if page not in memory:
-                page_faults += 1
-                hit_miss_sequence.append('M')
-                if len(memory) == memory_size:
-                    min_freq = float('inf')
-                    page_to_remove = None
+    def policy_algorithm(self, algorithm, memory_size):
+        """引擎中的其他置换算法 (CLOCK、第二次机会、ARC、2Q、LIRS)"""
+        policy = engine.make_policy(algorithm, memory_size)
+        page_faults, hits, memory = engine.run_policy(policy, self.page_stream)
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
+
+        hit_rate = 1 - page_faults / len(self.page_stream)
+        return hit_rate, hit_miss_sequence, memory
 
-                    for mem_page, (freq, age) in memory.items():
-                        if freq < min_freq or (
-                                freq == min_freq and age > (memory[page_to_remove][1] if page_to_remove else 0)):
-                            min_freq = freq
-                            page_to_remove = mem_page
+    def batch_results(self, algorithm, memory_sizes):
+        """依次产生每个内存容量下的 (内存容量, 命中率, 命中序列, 最终内存页面)
 
-                    if page_to_remove is not None:
-                        del memory[page_to_remove]
+        只有最后一个内存容量给出命中序列，其余为 None。
+        """
+        memory_sizes = list(memory_sizes)
+        if algorithm == "LRU":
+            # LRU满足栈性质，一次扫描即可得到所有内存容量下的命中率
+            lru_hit_rates = self.lru_batch_hit_rates(max(memory_sizes))
 
-                memory[page] = [1, 0]
+        for memory_size in memory_sizes:
+            if memory_size == memory_sizes[-1]:
+                yield (memory_size,) + self.run_algorithm(algorithm, memory_size)
+            elif algorithm == "LRU":
+                yield memory_size, lru_hit_rates[memory_size], None, None
             else:
-                hit_miss_sequence.append('H')
-                memory[page] = [memory[page][0] + 1, 0]
+                hit_rate, _, _ = self.run_algorithm(algorithm, memory_size)
+                yield memory_size, hit_rate, None, None
+
+    def resident_after(self, algorithm, memory_size, index):
+        """第index次访问之后内存中的页面"""
+        if algorithm == "OPT":
+            return engine.opt_resident_after(self.page_stream, memory_size, index)
+        policy = engine.make_policy(algorithm, memory_size)
+        return engine.resident_after(policy, self.page_stream, index)
+
+    def lfu_algorithm(self, memory_size):
+        """最少访问页面算法"""
+        # 访问次数相同时淘汰最久未被访问的页面
+        page_faults, hits, memory = engine.simulate_lfu(self.page_stream, memory_size, tie_break='lru')
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
         hit_rate = 1 - page_faults / len(self.page_stream)
-        return hit_rate, hit_miss_sequence, list(memory.keys())
+        return hit_rate, hit_miss_sequence, memory
 
 
 class GUI:
@@ -181,6 +180,8 @@ class GUI:
         self.current_memory_size = 4
         self.current_algorithm = "FIFO"
         self.is_batch_running = False
+        self.batch_worker = None
+        self.batch_algorithm = None
 
         self.create_widgets()
 
@@ -199,7 +200,7 @@ class GUI:
         ttk.Label(algo_frame, text="算法:").pack(side=tk.LEFT)
         self.algo_var = tk.StringVar(value="FIFO")
         algo_combo = ttk.Combobox(algo_frame, textvariable=self.algo_var,
-                                  values=["FIFO", "LRU", "OPT", "LFU"], state="readonly")
+                                  values=engine.ALGORITHMS, state="readonly")
         algo_combo.pack(side=tk.LEFT, padx=5)
 
         # 内存容量选择
@@ -215,6 +216,7 @@ class GUI:
         ttk.Button(control_frame, text="运行算法", command=self.run_algorithm).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="批量运行(4-32页)", command=self.run_batch).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="暂停/继续", command=self.toggle_pause).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="停止", command=self.stop_batch).pack(side=tk.LEFT, padx=5)
 
         # 进度条
         self.progress = ttk.Progressbar(control_frame, orient=tk.HORIZONTAL, length=200, mode='determinate')
@@ -242,8 +244,12 @@ class GUI:
         self.hits_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.hits_tab, text="命中情况")
 
-        self.hits_text = scrolledtext.ScrolledText(self.hits_tab, width=120, height=15)
-        self.hits_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.hits_text = scrolledtext.ScrolledText(self.hits_tab, width=120, height=8)
+        self.hits_text.pack(fill=tk.X, padx=5, pady=5)
+
+        # 命中序列查看器，只绘制可见部分
+        self.hit_viewer = HitMissViewer(self.hits_tab)
+        self.hit_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # 结果标签页
         self.results_tab = ttk.Frame(self.notebook)
@@ -264,21 +270,16 @@ class GUI:
         algorithm = self.algo_var.get()
         memory_size = int(self.memory_var.get())
 
-        if algorithm == "FIFO":
-            hit_rate, hit_miss_sequence, memory = self.simulator.fifo_algorithm(memory_size)
-        elif algorithm == "LRU":
-            hit_rate, hit_miss_sequence, memory = self.simulator.lru_algorithm(memory_size)
-        elif algorithm == "OPT":
-            hit_rate, hit_miss_sequence, memory = self.simulator.opt_algorithm(memory_size)
-        elif algorithm == "LFU":
-            hit_rate, hit_miss_sequence, memory = self.simulator.lfu_algorithm(memory_size)
+        hit_rate, hit_miss_sequence, memory = self.simulator.run_algorithm(algorithm, memory_size)
 
         self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
         self.update_results(algorithm, memory_size, hit_rate)
 
     def run_batch(self):
         """批量运行从4页到32页的所有情况"""
-        self.is_batch_running = True
+        if self.batch_worker is not None and self.batch_worker.is_alive():
+            return
+
         algorithm = self.algo_var.get()
 
         self.results_text.delete(1.0, tk.END)
@@ -288,44 +289,58 @@ class GUI:
         self.progress['maximum'] = 29  # 4到32共29个值
         self.progress['value'] = 0
 
-        for memory_size in range(4, 33):
-            if not self.is_batch_running:
-                break
-
-            if algorithm == "FIFO":
-                hit_rate, hit_miss_sequence, memory = self.simulator.fifo_algorithm(memory_size)
-            elif algorithm == "LRU":
-                hit_rate, hit_miss_sequence, memory = self.simulator.lru_algorithm(memory_size)
-            elif algorithm == "OPT":
-                hit_rate, hit_miss_sequence, memory = self.simulator.opt_algorithm(memory_size)
-            elif algorithm == "LFU":
-                hit_rate, hit_miss_sequence, memory = self.simulator.lfu_algorithm(memory_size)
-
-            # 更新结果文本
-            result_line = f"{algorithm}算法, {memory_size:2d}页内存: 命中率 = {hit_rate:.3f}\n"
-            self.results_text.insert(tk.END, result_line)
-            self.results_text.see(tk.END)
-            self.results_text.update()
-
-            # 如果是最后一个内存大小，更新命中情况标签页
-            if memory_size == 32:
-                self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
-
-            # 更新进度条
-            self.progress['value'] = memory_size - 4
-            self.root.update()
-
-            # 添加短暂延迟，以便观察进度
-            time.sleep(0.1)
+        # 在工作线程中计算，使用页地址流的副本，避免运行中重新生成序列造成干扰
+        simulator = PageReplacementSimulator()
+        simulator.page_stream = list(self.simulator.page_stream)
+        self.batch_algorithm = algorithm
+        self.batch_worker = BatchWorker(simulator.batch_results(algorithm, range(4, 33)))
+        self.is_batch_running = True
+        self.batch_worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_batch)
+
+    def poll_batch(self):
+        """定时取出工作线程的结果并更新界面"""
+        algorithm = self.batch_algorithm
+        for kind, value in self.batch_worker.drain():
+            if kind == 'result':
+                memory_size, hit_rate, hit_miss_sequence, memory = value
+                # 更新结果文本
+                result_line = f"{algorithm}算法, {memory_size:2d}页内存: 命中率 = {hit_rate:.3f}\n"
+                self.results_text.insert(tk.END, result_line)
+                self.results_text.see(tk.END)
+
+                # 如果是最后一个内存大小，更新命中情况标签页
+                if hit_miss_sequence is not None:
+                    self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
+
+                # 更新进度条
+                self.progress['value'] = memory_size - 4
+            elif kind == 'error':
+                self.results_text.insert(tk.END, f"\n运行出错: {value}\n")
+            else:
+                if value:
+                    self.results_text.insert(tk.END, "\n批量运行已停止\n")
+                self.progress['value'] = 0
+                self.is_batch_running = False
+                return
 
-        self.progress['value'] = 0
-        self.is_batch_running = False
+        self.root.after(POLL_INTERVAL_MS, self.poll_batch)
 
     def toggle_pause(self):
         """暂停或继续批量运行"""
-        self.is_batch_running = not self.is_batch_running
-        if self.is_batch_running:
-            self.run_batch()
+        worker = self.batch_worker
+        if worker is None or not worker.is_alive():
+            return
+        if worker.paused:
+            worker.resume()
+        else:
+            worker.pause()
+        self.is_batch_running = not worker.paused
+
+    def stop_batch(self):
+        """停止批量运行"""
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
 
     def display_instructions(self):
         self.instructions_text.delete(1.0, tk.END)
@@ -361,9 +376,11 @@ class GUI:
         misses = hit_miss_sequence.count('M')
 
         # 显示命中序列
-        for i in range(0, len(hit_miss_sequence), 50):
-            line = " ".join(hit_miss_sequence[i:i + 50])
-            self.hits_text.insert(tk.END, line + "\n")
+        self.hit_viewer.set_trace(
+            self.simulator.page_stream,
+            bytearray(h == 'H' for h in hit_miss_sequence),
+            lambda index: self.simulator.resident_after(algorithm, memory_size, index)
+        )
 
         self.hits_text.insert(tk.END, f"\n统计信息:")
         self.hits_text.insert(tk.END, f"\n命中次数: {hits}")
@@ -2,7 +2,19 @@ import random
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from collections import deque, OrderedDict
-import time
+
+import instruction_sequence
+import page_replacement_engine as engine
+import page_result_cache
+import page_shards
+from page_batch_worker import BatchWorker, POLL_INTERVAL_MS
+from page_hit_viewer import HitMissViewer
+
+
+# 批量运行中可选的 SHARDS 采样估计 (LRU 缺页率曲线的近似)
+# 页地址流只有 32 个不同页面，采样率取得较高，结果附带约 95% 的误差上限
+SHARDS_ALGORITHM = "SHARDS"
+SHARDS_RATE = 0.5
 
 
 class PageReplacementSimulator:
@@ -12,75 +24,9 @@ class PageReplacementSimulator:
         self.page_stream = []
 
     def generate_instructions(self):
-        self.instructions = []
-
-        available_addresses = set(range(320))
-
-        available_even_addresses = [addr for addr in range(0, 320, 2) if addr in available_addresses]
-
-        if available_even_addresses:
-            m = random.choice(available_even_addresses)
-        else:
-            m = None
-
-        for i in range(80):
-            if m is None or m not in available_addresses:
-                available_even_addresses = [addr for addr in range(0, 320, 2) if addr in available_addresses]
-                if available_even_addresses:
-                    m = random.choice(available_even_addresses)
-                else:
-                    break
-
-            if m in available_addresses:
-                self.instructions.append(m)
-                available_addresses.remove(m)
-
-            odd_addr = m + 1
-            if odd_addr <= 319 and odd_addr in available_addresses:
-                self.instructions.append(odd_addr)
-                available_addresses.remove(odd_addr)
-
-            available_even_addresses = [addr for addr in range(0, 320, 2) if addr in available_addresses]
-            prev_even_addresses = [addr for addr in available_even_addresses if addr < m]
-
-            if prev_even_addresses:
-                m_prime = random.choice(prev_even_addresses)
-            elif available_even_addresses:
-                m_prime = random.choice(available_even_addresses)
-            else:
-                break
-
-            if m_prime in available_addresses:
-                self.instructions.append(m_prime)
-                available_addresses.remove(m_prime)
-
-            odd_prime_addr = m_prime + 1
-            if odd_prime_addr <= 319 and odd_prime_addr in available_addresses:
-                self.instructions.append(odd_prime_addr)
-                available_addresses.remove(odd_prime_addr)
-
-            available_even_addresses = [addr for addr in range(0, 320, 2) if addr in available_addresses]
-            after_even_addresses = [addr for addr in available_even_addresses if addr > m_prime]
-
-            if after_even_addresses:
-                m = random.choice(after_even_addresses)
-            elif available_even_addresses:
-                m = random.choice(available_even_addresses)
-            else:
-                m = None
-
-        if len(self.instructions) == 320:
-            return self.instructions
-
-        remaining_addresses = list(available_addresses)
-        random.shuffle(remaining_addresses)
-        self.instructions.extend(remaining_addresses)
-
-        if len(self.instructions) > 320:
-            self.instructions = self.instructions[:320]
-
+        # 空闲偶地址用树状数组维护，每次随机选取 m 之前/之后的偶地址只需 O(log n)
+        self.instructions = instruction_sequence.generate_paired_instructions(320)
         return self.instructions
-            
 
     def convert_to_page_stream(self):
         """将指令序列转换为页地址流"""
@@ -128,78 +74,95 @@ class PageReplacementSimulator:
 
     def opt_algorithm(self, memory_size):
         """最佳淘汰页面置换算法"""
-        memory = set()
-        page_faults = 0
-        hit_miss_sequence = []
+        page_faults, hits, memory = engine.simulate_opt(self.page_stream, memory_size)
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
-        for i, page in enumerate(self.page_stream):
-            if page not in memory:
-                page_faults += 1
-                hit_miss_sequence.append('M')
-                if len(memory) == memory_size:
-                    farthest_use = -1
-                    page_to_remove = None
-
-                    for mem_page in memory:
-                        found = False
-                        for j in range(i + 1, len(self.page_stream)):
-                            if self.page_stream[j] == mem_page:
-                                if j > farthest_use:
-                                    farthest_use = j
-                                    page_to_remove = mem_page
-                                found = True
-                                break
-
-                        if not found:
-                            page_to_remove = mem_page
-                            break
-
-                    if page_to_remove is not None:
-                        memory.remove(page_to_remove)
-                    else:
-                        memory.remove(next(iter(memory)))
-
-                memory.add(page)
-            else:
-                hit_miss_sequence.append('H')
+        hit_rate = 1 - page_faults / len(self.page_stream)
+        return hit_rate, hit_miss_sequence, memory
+
+    def lru_batch_hit_rates(self, max_memory_size):
+        """栈距离算法一次扫描求出1到max_memory_size页内存时的LRU命中率"""
+        hits = page_result_cache.lru_hit_counts(self.page_stream, max_memory_size)
+        return [h / len(self.page_stream) for h in hits]
+
+    def run_algorithm(self, algorithm, memory_size):
+        """按算法名称运行，返回 (命中率, 命中序列, 最终内存页面)
+
+        页地址流不变时，同一算法和内存容量的结果直接从缓存中取出。
+        """
+        if algorithm not in engine.ALGORITHMS:
+            raise ValueError(f"未知的页面置换算法: {algorithm}")
+        # LFU 访问次数相同时淘汰最久未被访问的页面
+        params = {'tie_break': 'lru'} if algorithm == "LFU" else {}
+        page_faults, hits, memory = page_result_cache.simulate(self.page_stream, algorithm, memory_size, **params)
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
         hit_rate = 1 - page_faults / len(self.page_stream)
         return hit_rate, hit_miss_sequence, list(memory)
 
-    def lfu_algorithm(self, memory_size):
-        """最少访问页面算法"""
-        memory = {}
-        page_faults = 0
-        hit_miss_sequence = []
+    def simulate_algorithm(self, algorithm, memory_size):
+        """不经缓存，直接用本模块的实现运行"""
+        if algorithm == "FIFO":
+            return self.fifo_algorithm(memory_size)
+        elif algorithm == "LRU":
+            return self.lru_algorithm(memory_size)
+        elif algorithm == "OPT":
+            return self.opt_algorithm(memory_size)
+        elif algorithm == "LFU":
+            return self.lfu_algorithm(memory_size)
+        elif algorithm in engine.POLICIES:
+            return self.policy_algorithm(algorithm, memory_size)
+        raise ValueError(f"未知的页面置换算法: {algorithm}")
 
-        for page in self.page_stream:
-            for mem_page in memory:
-                if mem_page != page:
-                    memory[mem_page] = (memory[mem_page][0], memory[mem_page][1] + 1)
+    def policy_algorithm(self, algorithm, memory_size):
+        """引擎中的其他置换算法 (CLOCK、第二次机会、ARC、2Q、LIRS)"""
+        policy = engine.make_policy(algorithm, memory_size)
+        page_faults, hits, memory = engine.run_policy(policy, self.page_stream)
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
-            if page not in memory:
-                page_faults += 1
-                hit_miss_sequence.append('M')
-                if len(memory) == memory_size:
-                    min_freq = float('inf')
-                    page_to_remove = None
+        hit_rate = 1 - page_faults / len(self.page_stream)
+        return hit_rate, hit_miss_sequence, memory
 
-                    for mem_page, (freq, age) in memory.items():
-                        if freq < min_freq or (
-                                freq == min_freq and age > (memory[page_to_remove][1] if page_to_remove else 0)):
-                            min_freq = freq
-                            page_to_remove = mem_page
+    def batch_results(self, algorithm, memory_sizes):
+        """依次产生每个内存容量下的 (内存容量, 命中率, 命中序列, 最终内存页面)
+
+        只有最后一个内存容量给出命中序列，其余为 None。
+        """
+        memory_sizes = list(memory_sizes)
+        if algorithm == SHARDS_ALGORITHM:
+            # 一次扫描估计所有内存容量下的命中率，第5项为误差上限
+            for memory_size, miss_ratio, error in page_shards.shards_mrc(self.page_stream, memory_sizes,
+                                                                         rate=SHARDS_RATE):
+                yield memory_size, None if miss_ratio is None else 1 - miss_ratio, None, None, error
+            return
+        if algorithm == "LRU":
+            # LRU满足栈性质，一次扫描即可得到所有内存容量下的命中率
+            lru_hit_rates = self.lru_batch_hit_rates(max(memory_sizes))
+
+        for memory_size in memory_sizes:
+            if memory_size == memory_sizes[-1]:
+                yield (memory_size,) + self.run_algorithm(algorithm, memory_size)
+            elif algorithm == "LRU":
+                yield memory_size, lru_hit_rates[memory_size], None, None
+            else:
+                hit_rate, _, _ = self.run_algorithm(algorithm, memory_size)
+                yield memory_size, hit_rate, None, None
 
-                    if page_to_remove is not None:
-                        del memory[page_to_remove]
+    def resident_after(self, algorithm, memory_size, index):
+        """第index次访问之后内存中的页面"""
+        if algorithm == "OPT":
+            return engine.opt_resident_after(self.page_stream, memory_size, index)
+        policy = engine.make_policy(algorithm, memory_size)
+        return engine.resident_after(policy, self.page_stream, index)
 
-                memory[page] = [1, 0]
-            else:
-                hit_miss_sequence.append('H')
-                memory[page] = [memory[page][0] + 1, 0]
+    def lfu_algorithm(self, memory_size):
+        """最少访问页面算法"""
+        # 访问次数相同时淘汰最久未被访问的页面
+        page_faults, hits, memory = engine.simulate_lfu(self.page_stream, memory_size, tie_break='lru')
+        hit_miss_sequence = ['H' if hit else 'M' for hit in hits]
 
         hit_rate = 1 - page_faults / len(self.page_stream)
-        return hit_rate, hit_miss_sequence, list(memory.keys())
+        return hit_rate, hit_miss_sequence, memory
 
 
 class GUI:
@@ -212,6 +175,8 @@ class GUI:
         self.current_memory_size = 4
         self.current_algorithm = "FIFO"
         self.is_batch_running = False
+        self.batch_worker = None
+        self.batch_algorithm = None
         self.font_size = 10
 
         self.create_widgets()
@@ -231,7 +196,7 @@ class GUI:
         ttk.Label(algo_frame, text="算法:").pack(side=tk.LEFT)
         self.algo_var = tk.StringVar(value="FIFO")
         algo_combo = ttk.Combobox(algo_frame, textvariable=self.algo_var,
-                                  values=["FIFO", "LRU", "OPT", "LFU"], state="readonly")
+                                  values=engine.ALGORITHMS + [SHARDS_ALGORITHM], state="readonly")
         algo_combo.pack(side=tk.LEFT, padx=5)
 
         # 内存容量选择
@@ -258,6 +223,7 @@ class GUI:
         ttk.Button(control_frame, text="运行算法", command=self.run_algorithm).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="批量运行(4-32页)", command=self.run_batch).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="暂停/继续", command=self.toggle_pause).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="停止", command=self.stop_batch).pack(side=tk.LEFT, padx=5)
 
         self.progress = ttk.Progressbar(control_frame, orient=tk.HORIZONTAL, length=200, mode='determinate')
         self.progress.pack(side=tk.LEFT, padx=10)
@@ -293,10 +259,13 @@ class GUI:
         self.hits_text = scrolledtext.ScrolledText(
             self.hits_tab,
             width=120,
-            height=15,
+            height=8,
             font=("Courier", self.font_size)
         )
-        self.hits_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.hits_text.pack(fill=tk.X, padx=5, pady=5)
+
+        self.hit_viewer = HitMissViewer(self.hits_tab)
+        self.hit_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         self.results_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.results_tab, text="批量运行结果")
@@ -329,21 +298,21 @@ class GUI:
     def run_algorithm(self):
         algorithm = self.algo_var.get()
         memory_size = int(self.memory_var.get())
+        if algorithm == SHARDS_ALGORITHM:
+            # 采样估计只给出命中率曲线，没有逐次访问的命中序列
+            self.run_batch()
+            return
 
-        if algorithm == "FIFO":
-            hit_rate, hit_miss_sequence, memory = self.simulator.fifo_algorithm(memory_size)
-        elif algorithm == "LRU":
-            hit_rate, hit_miss_sequence, memory = self.simulator.lru_algorithm(memory_size)
-        elif algorithm == "OPT":
-            hit_rate, hit_miss_sequence, memory = self.simulator.opt_algorithm(memory_size)
-        elif algorithm == "LFU":
-            hit_rate, hit_miss_sequence, memory = self.simulator.lfu_algorithm(memory_size)
+        hit_rate, hit_miss_sequence, memory = self.simulator.run_algorithm(algorithm, memory_size)
 
         self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
         self.update_results(algorithm, memory_size, hit_rate)
 
     def run_batch(self):
-        self.is_batch_running = True
+        # 工作线程算完后轮询还要取出剩余结果，batch_worker 由轮询在结束时清空，之前不能开始新的批量运行
+        if self.batch_worker is not None:
+            return
+
         algorithm = self.algo_var.get()
 
         self.results_text.delete(1.0, tk.END)
@@ -353,39 +322,61 @@ class GUI:
         self.progress['maximum'] = 29
         self.progress['value'] = 0
 
-        for memory_size in range(4, 33):
-            if not self.is_batch_running:
-                break
-
-            if algorithm == "FIFO":
-                hit_rate, hit_miss_sequence, memory = self.simulator.fifo_algorithm(memory_size)
-            elif algorithm == "LRU":
-                hit_rate, hit_miss_sequence, memory = self.simulator.lru_algorithm(memory_size)
-            elif algorithm == "OPT":
-                hit_rate, hit_miss_sequence, memory = self.simulator.opt_algorithm(memory_size)
-            elif algorithm == "LFU":
-                hit_rate, hit_miss_sequence, memory = self.simulator.lfu_algorithm(memory_size)
-
-            result_line = f"{algorithm}算法, {memory_size:2d}页内存: 命中率 = {hit_rate:.3f}\n"
-            self.results_text.insert(tk.END, result_line)
-            self.results_text.see(tk.END)
-            self.results_text.update()
-
-            if memory_size == 32:
-                self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
+        # 在工作线程中计算，使用页地址流的副本，避免运行中重新生成序列造成干扰
+        simulator = PageReplacementSimulator()
+        simulator.page_stream = list(self.simulator.page_stream)
+        self.batch_algorithm = algorithm
+        self.batch_worker = BatchWorker(simulator.batch_results(algorithm, range(4, 33)))
+        self.is_batch_running = True
+        self.batch_worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_batch, self.batch_worker)
+
+    def poll_batch(self, worker):
+        """定时取出工作线程的结果并更新界面"""
+        if worker is not self.batch_worker:
+            return  # 已被新的运行取代
+        algorithm = self.batch_algorithm
+        for kind, value in worker.drain():
+            if kind == 'result':
+                memory_size, hit_rate, hit_miss_sequence, memory = value[:4]
+                if hit_rate is None:
+                    result_line = f"{algorithm}算法, {memory_size:2d}页内存: 没有采样到页面，无法估计\n"
+                elif len(value) > 4 and value[4] is not None:
+                    result_line = f"{algorithm}算法, {memory_size:2d}页内存: 命中率 ≈ {hit_rate:.3f} ± {value[4]:.3f}\n"
+                else:
+                    result_line = f"{algorithm}算法, {memory_size:2d}页内存: 命中率 = {hit_rate:.3f}\n"
+                self.results_text.insert(tk.END, result_line)
+                self.results_text.see(tk.END)
 
-            self.progress['value'] = memory_size - 4
-            self.root.update()
+                if hit_miss_sequence is not None:
+                    self.display_hit_miss(hit_miss_sequence, algorithm, memory_size, hit_rate, memory)
 
-            time.sleep(0.1)
+                self.progress['value'] = memory_size - 4
+            elif kind == 'error':
+                self.results_text.insert(tk.END, f"\n运行出错: {value}\n")
+            else:
+                if value:
+                    self.results_text.insert(tk.END, "\n批量运行已停止\n")
+                self.progress['value'] = 0
+                self.is_batch_running = False
+                self.batch_worker = None
+                return
 
-        self.progress['value'] = 0
-        self.is_batch_running = False
+        self.root.after(POLL_INTERVAL_MS, self.poll_batch, worker)
 
     def toggle_pause(self):
-        self.is_batch_running = not self.is_batch_running
-        if self.is_batch_running:
-            self.run_batch()
+        worker = self.batch_worker
+        if worker is None or not worker.is_alive():
+            return
+        if worker.paused:
+            worker.resume()
+        else:
+            worker.pause()
+        self.is_batch_running = not worker.paused
+
+    def stop_batch(self):
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
 
     def display_instructions(self):
         self.instructions_text.delete(1.0, tk.END)
@@ -421,9 +412,11 @@ class GUI:
         misses = hit_miss_sequence.count('M')
 
         # 显示命中序列
-        for i in range(0, len(hit_miss_sequence), 50):
-            line = " ".join(hit_miss_sequence[i:i + 50])
-            self.hits_text.insert(tk.END, line + "\n")
+        self.hit_viewer.set_trace(
+            self.simulator.page_stream,
+            bytearray(h == 'H' for h in hit_miss_sequence),
+            lambda index: self.simulator.resident_after(algorithm, memory_size, index)
+        )
 
         self.hits_text.insert(tk.END, f"\n统计信息:")
         self.hits_text.insert(tk.END, f"\n命中次数: {hits}")
@@ -1,150 +1,138 @@
-import random
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.font_manager as fm
 
-# 设置中文字体支持
-plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']  # 用于正常显示中文标签
-plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
-
-
-# 1. 生成指令序列
-def generate_instructions():
-    random.seed()  # 初始化随机数生成器
-    instructions = [0] * 320
-    m = 160  # 起始地址
-
-    for i in range(80):
-        j = i * 4
-        # 顺序执行指令
-        instructions[j] = m
-        instructions[j + 1] = m + 1
-
-        # 生成前地址部分指令（[0, m-1]）
-        instructions[j + 2] = int(instructions[j] * random.random())
-        instructions[j + 2] = max(0, min(instructions[j] - 1, instructions[j + 2]))  # 边界保护
-
-        # 顺序执行下一条
-        instructions[j + 3] = instructions[j + 2] + 1
-
-        # 生成后地址部分指令（(a[j+3], 319]）
-        next_m = instructions[j + 3] + int((319 - instructions[j + 3]) * random.random())
-        m = max(instructions[j + 3] + 1, min(319, next_m))  # 边界保护
-
-    return instructions
-
-
-# 2. 转换为页地址流（每页10条指令）
-def instructions_to_pages(instructions):
-    return [addr // 10 for addr in instructions]
-
-
-# 3. FIFO页面置换算法
-def fifo(page_stream, frame_count):
-    frames = []  # 按进入顺序存储页面
-    page_faults = 0
-    hit_miss = []  # 记录每个页面的命中状态（True=命中，False=缺页）
-
-    for page in page_stream:
-        if page not in frames:
-            page_faults += 1
-            hit_miss.append(False)
-            if len(frames) >= frame_count:
-                frames.pop(0)  # 淘汰队首页面
-            frames.append(page)
-        else:
-            hit_miss.append(True)
-
-    hit_rate = 1 - (page_faults / len(page_stream))
-    return hit_rate, hit_miss
+import page_replacement_engine as engine
+from page_batch_worker import BatchWorker, POLL_INTERVAL_MS
+from page_hit_viewer import HitMissViewer
+from 上机实验5豆包_core import (generate_instructions, instructions_to_pages, fifo, lru, opt, lfu,
+                             OTHER_ALGORITHMS, policy_hit_rate, hit_rate_rows, hit_rate_table)
+
+# 模拟部分在 上机实验5豆包_core.py 中；matplotlib 在第一次显示趋势图时才导入，启动时不加载
+
+
+# 趋势图中各算法的标记
+MARKERS = {'FIFO': 'o', 'LRU': 's', 'OPT': '^', 'LFU': '*', 'CLOCK': 'v',
+           'SECOND_CHANCE': '<', 'ARC': 'D', '2Q': 'p', 'LIRS': 'h'}
+
+
+# 每条曲线超过该点数时改为抽稀绘制并去掉标记
+DECIMATE_THRESHOLD = 2000
+
+
+def decimate(xs, ys, max_points):
+    """把曲线抽稀到约 max_points 个点：按顺序分成 max_points/2 段，每段只保留 y 最小和最大的点，起伏不会丢失"""
+    n = len(xs)
+    if n <= max_points:
+        return xs, ys
+    buckets = max_points // 2
+    out_x, out_y = [], []
+    for b in range(buckets):
+        segment = range(b * n // buckets, (b + 1) * n // buckets)
+        low = min(segment, key=ys.__getitem__)
+        high = max(segment, key=ys.__getitem__)
+        for i in sorted({low, high}):
+            out_x.append(xs[i])
+            out_y.append(ys[i])
+    return out_x, out_y
+
+
+class HitRateChart:
+    """命中率趋势图 (创建时才导入 matplotlib)
+
+    每个算法保留一条 Line2D，结果到达时追加数据点，用 blit 只重画曲线，坐标轴、图例等背景不重画；
+    只有窗口大小改变或纵轴范围需要扩大时才整幅重画。
+    """
+
+    def __init__(self, master):
+        import matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        # 设置中文字体支持
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']  # 用于正常显示中文标签
+        matplotlib.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.background = None
+        self.lines = {}
+        self.xs = []
+        self.ys = {}
+        self.y_range = None  # 已有数据的 (最小值, 最大值)
+        self.decimated = False
+
+    def reset(self, names, frame_list):
+        """清空图表，按帧数范围设置横轴，为每个算法建立一条空曲线"""
+        ax = self.ax
+        ax.clear()
+        self.xs = []
+        self.ys = {name: [] for name in names}
+        self.y_range = None
+        self.decimated = False
+        self.lines = {}
+        for name in names:
+            self.lines[name], = ax.plot([], [], marker=MARKERS.get(name, '.'), label=name, linestyle='-',
+                                        animated=True)
+        ax.set_xlim(frame_list[0], max(frame_list[-1], frame_list[0] + 1))
+        ax.set_ylim(0, 1)
+        ax.set_xlabel("实存页数")
+        ax.set_ylabel("命中率")
+        ax.set_title("页面置换算法命中率对比")
+        ax.legend(fontsize=8)
+        ax.grid(True, alpha=0.3)
+        self.canvas.draw()
 
+    def on_draw(self, event):
+        """整幅重画后保存不含曲线的背景，再把曲线画上"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_lines()
 
-# 4. LRU页面置换算法
-def lru(page_stream, frame_count):
-    frames = {}  # {页面: 最后使用时间戳}
-    page_faults = 0
-    hit_miss = []
-    time = 0
+    def draw_lines(self):
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
 
-    for page in page_stream:
-        time += 1
-        if page in frames:
-            frames[page] = time  # 更新最后使用时间
-            hit_miss.append(True)
-        else:
-            page_faults += 1
-            hit_miss.append(False)
-            if len(frames) >= frame_count:
-                # 淘汰最久未使用的页面
-                lru_page = min(frames, key=frames.get)
-                del frames[lru_page]
-            frames[page] = time
-
-    hit_rate = 1 - (page_faults / len(page_stream))
-    return hit_rate, hit_miss
-
-
-# 5. OPT页面置换算法（最佳淘汰）
-def opt(page_stream, frame_count):
-    frames = []
-    page_faults = 0
-    hit_miss = []
-
-    for i in range(len(page_stream)):
-        page = page_stream[i]
-        if page in frames:
-            hit_miss.append(True)
-        else:
-            page_faults += 1
-            hit_miss.append(False)
-            if len(frames) >= frame_count:
-                # 找到未来最久不使用的页面
-                farthest = -1
-                victim = None
-                for f in frames:
-                    try:
-                        pos = page_stream.index(f, i + 1)
-                    except ValueError:
-                        pos = float('inf')  # 未来不再出现
-                    if pos > farthest:
-                        farthest = pos
-                        victim = f
-                frames.remove(victim)
-            frames.append(page)
-
-    hit_rate = 1 - (page_faults / len(page_stream))
-    return hit_rate, hit_miss
-
-
-# 6. LFU页面置换算法（最少访问）
-def lfu(page_stream, frame_count):
-    frames = {}  # {页面: (访问次数, 最后使用时间)}
-    page_faults = 0
-    hit_miss = []
-    time = 0
-
-    for page in page_stream:
-        time += 1
-        if page in frames:
-            count, _ = frames[page]
-            frames[page] = (count + 1, time)  # 增加访问次数
-            hit_miss.append(True)
+    def extend(self, rows):
+        """追加若干行结果 [(帧数, [按 reset 时的算法顺序排列的命中率])] 并更新曲线"""
+        if not rows:
+            return
+        for fc, rates in rows:
+            self.xs.append(fc)
+            for series, rate in zip(self.ys.values(), rates):
+                series.append(rate)
+        low = min(min(rates) for _, rates in rows)
+        high = max(max(rates) for _, rates in rows)
+        if self.y_range is not None:
+            low, high = min(low, self.y_range[0]), max(high, self.y_range[1])
+        refit = self.y_range is None or (low, high) != self.y_range
+        self.y_range = (low, high)
+
+        if not self.decimated and len(self.xs) > DECIMATE_THRESHOLD:
+            self.decimated = True
+            for line in self.lines.values():
+                line.set_marker('')
+        for name, line in self.lines.items():
+            if self.decimated:
+                line.set_data(*decimate(self.xs, self.ys[name], DECIMATE_THRESHOLD))
+            else:
+                line.set_data(self.xs, self.ys[name])
+
+        if refit:
+            # 纵轴范围变化时整幅重画 (每次运行只发生少数几次)
+            margin = max(0.02, (high - low) * 0.05)
+            self.ax.set_ylim(max(0.0, low - margin), min(1.0, high + margin))
+            self.canvas.draw()
+        elif self.background is None:
+            self.canvas.draw()
         else:
-            page_faults += 1
-            hit_miss.append(False)
-            if len(frames) >= frame_count:
-                # 淘汰访问次数最少的，次数相同则淘汰最久未使用的
-                victim = min(frames.items(), key=lambda x: (x[1][0], x[1][1]))[0]
-                del frames[victim]
-            frames[page] = (1, time)
-
-    hit_rate = 1 - (page_faults / len(page_stream))
-    return hit_rate, hit_miss
+            self.canvas.restore_region(self.background)
+            self.draw_lines()
+            self.canvas.blit(self.figure.bbox)
 
 
-# 7. GUI界面实现
+# 8. GUI界面实现
 class PageReplacementSimulator:
     def __init__(self, root):
         self.root = root
@@ -155,6 +143,9 @@ class PageReplacementSimulator:
         self.instructions = []
         self.page_stream = []
         self.frame_count_var = tk.IntVar(value=4)  # 默认显示4页的命中情况
+        self.max_frames_var = tk.IntVar(value=32)  # 命中率对比的最大帧数
+        self.worker = None
+        self.rows = []  # 已算出的 (帧数, [各算法命中率])
 
         # 创建界面组件
         self.create_widgets()
@@ -177,6 +168,11 @@ class PageReplacementSimulator:
                                  command=self.update_hit_display, width=10)
         frame_spin.pack(side=tk.LEFT, padx=5)
 
+        # 对比的帧数范围 (4 到最大帧数)，结果逐行显示
+        ttk.Label(control_panel, text="最大帧数:").pack(side=tk.LEFT, padx=5)
+        ttk.Spinbox(control_panel, from_=8, to=10000, increment=8, textvariable=self.max_frames_var,
+                    width=10).pack(side=tk.LEFT, padx=5)
+
         # 左侧面板：序列展示区
         left_panel = ttk.LabelFrame(self.root, text="序列详情")
         left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -193,8 +189,8 @@ class PageReplacementSimulator:
 
         # 命中情况展示
         ttk.Label(left_panel, text="FIFO命中情况 (T=命中, F=缺页):").pack(anchor=tk.W)
-        self.hit_text = scrolledtext.ScrolledText(left_panel, height=8, width=40)
-        self.hit_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.hit_viewer = HitMissViewer(left_panel, labels=('F', 'T'))
+        self.hit_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # 右侧面板：结果展示区
         right_panel = ttk.LabelFrame(self.root, text="算法结果")
@@ -202,21 +198,21 @@ class PageReplacementSimulator:
 
         # 结果表格
         ttk.Label(right_panel, text="各算法命中率对比表:").pack(anchor=tk.W)
-        self.result_table = ttk.Treeview(right_panel, columns=("帧数", "FIFO", "LRU", "OPT", "LFU"), show="headings")
+        self.result_table = ttk.Treeview(right_panel, columns=("帧数", *engine.ALGORITHMS), show="headings")
         self.result_table.heading("帧数", text="帧数")
-        self.result_table.heading("FIFO", text="FIFO")
-        self.result_table.heading("LRU", text="LRU")
-        self.result_table.heading("OPT", text="OPT")
-        self.result_table.heading("LFU", text="LFU")
-        self.result_table.column("帧数", width=80)
+        for name in engine.ALGORITHMS:
+            self.result_table.heading(name, text=name)
+            self.result_table.column(name, width=70)
+        self.result_table.column("帧数", width=60)
         self.result_table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        # 结果图表
+        # 结果图表：点击按钮后才导入 matplotlib 创建图表
         ttk.Label(right_panel, text="命中率趋势图:").pack(anchor=tk.W)
-        self.fig = plt.Figure(figsize=(8, 4), dpi=100)
-        self.ax = self.fig.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=right_panel)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.chart_panel = ttk.Frame(right_panel)
+        self.chart_panel.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.chart_button = ttk.Button(self.chart_panel, text="显示趋势图", command=self.show_chart)
+        self.chart_button.pack(expand=True)
+        self.chart = None
 
     def run_simulation(self):
         """运行/重新运行整个模拟过程"""
@@ -229,8 +225,6 @@ class PageReplacementSimulator:
             self.update_sequence_display()
             self.update_hit_display()
             self.calculate_all_results()
-
-            messagebox.showinfo("成功", "模拟运行完成！")
         except Exception as e:
             messagebox.showerror("错误", f"运行过程中出现错误：{str(e)}")
 
@@ -248,57 +242,81 @@ class PageReplacementSimulator:
             return
 
         frame_count = self.frame_count_var.get()
-        _, hit_miss = fifo(self.page_stream, frame_count)
-        hit_str = " ".join(["T" if h else "F" for h in hit_miss])
-        self.hit_text.delete(1.0, tk.END)
-        self.hit_text.insert(tk.END, hit_str)
+        page_stream = self.page_stream
+        _, hit_miss = fifo(page_stream, frame_count)
+        # 查看器只绘制可见部分，点击某次访问显示当时驻留的页面
+        self.hit_viewer.set_trace(
+            page_stream,
+            bytearray(hit_miss),
+            lambda index: engine.resident_after(engine.FIFOPolicy(frame_count), page_stream, index)
+        )
 
     def calculate_all_results(self):
-        """计算所有算法在不同帧数下的结果"""
-        # 计算4-32页的所有算法结果
-        self.frame_list = list(range(4, 33))
-        self.fifo_rates = []
-        self.lru_rates = []
-        self.opt_rates = []
-        self.lfu_rates = []
-
-        # 清空表格
+        """在工作线程中计算所有算法在不同帧数下的结果，算出一行显示一行"""
+        if self.worker is not None:
+            self.worker.cancel()
+
+        # 计算4到最大帧数的所有算法结果
+        self.frame_list = list(range(4, max(self.max_frames_var.get(), 5) + 1))
+        self.rates = {name: [] for name in engine.ALGORITHMS}
+        self.rows = []
+
+        # 清空表格和图表
         for item in self.result_table.get_children():
             self.result_table.delete(item)
-
-        # 计算并填充数据
-        for fc in self.frame_list:
-            fifo_rate, _ = fifo(self.page_stream, fc)
-            lru_rate, _ = lru(self.page_stream, fc)
-            opt_rate, _ = opt(self.page_stream, fc)
-            lfu_rate, _ = lfu(self.page_stream, fc)
-
-            self.fifo_rates.append(round(fifo_rate, 4))
-            self.lru_rates.append(round(lru_rate, 4))
-            self.opt_rates.append(round(opt_rate, 4))
-            self.lfu_rates.append(round(lfu_rate, 4))
-
-            # 插入表格
-            self.result_table.insert("", tk.END, values=(fc, round(fifo_rate, 4), round(lru_rate, 4),
-                                                         round(opt_rate, 4), round(lfu_rate, 4)))
-
-        # 绘制趋势图（使用中文标签）
-        self.ax.clear()
-        self.ax.plot(self.frame_list, self.fifo_rates, marker='o', label='FIFO', linestyle='-')
-        self.ax.plot(self.frame_list, self.lru_rates, marker='s', label='LRU', linestyle='-')
-        self.ax.plot(self.frame_list, self.opt_rates, marker='^', label='OPT', linestyle='-')
-        self.ax.plot(self.frame_list, self.lfu_rates, marker='*', label='LFU', linestyle='-')
-
-        self.ax.set_xlabel("实存页数")
-        self.ax.set_ylabel("命中率")
-        self.ax.set_title("页面置换算法命中率对比")
-        self.ax.legend()
-        self.ax.grid(True, alpha=0.3)
-        self.canvas.draw()
+        if self.chart is not None:
+            self.chart.reset(engine.ALGORITHMS, self.frame_list)
+
+        # 使用页地址流的副本，避免运行中重新生成序列造成干扰
+        self.worker = BatchWorker(hit_rate_rows(list(self.page_stream), self.frame_list))
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_results, self.worker)
+
+    def poll_results(self, worker):
+        """定时取出工作线程算出的各行，填入表格并追加到图表"""
+        if worker is not self.worker:
+            return  # 已被新的运行取代
+
+        rows = []
+        for kind, value in worker.drain():
+            if kind == 'result':
+                rows.append(value)
+            elif kind == 'error':
+                self.add_rows(rows)
+                messagebox.showerror("错误", f"运行过程中出现错误：{str(value)}")
+                return
+            elif not value:
+                self.add_rows(rows)
+                messagebox.showinfo("成功", "模拟运行完成！")
+                return
+        self.add_rows(rows)
+        self.root.after(POLL_INTERVAL_MS, self.poll_results, worker)
+
+    def add_rows(self, rows):
+        for fc, rates in rows:
+            for name, rate in zip(engine.ALGORITHMS, rates):
+                self.rates[name].append(rate)
+            self.result_table.insert("", tk.END, values=(fc, *rates))
+        self.rows.extend(rows)
+        if self.chart is not None:
+            self.chart.extend(rows)
+
+    def show_chart(self):
+        """第一次显示时创建图表，并画出已算出的结果"""
+        if self.chart is not None:
+            return
+        self.chart_button.destroy()
+        self.chart = HitRateChart(self.chart_panel)
+        self.chart.reset(engine.ALGORITHMS, self.frame_list)
+        self.chart.extend(self.rows)
 
 
 # 主程序入口
-if __name__ == "__main__":
+def main():
     root = tk.Tk()
     app = PageReplacementSimulator(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import random
+
+import page_replacement_engine as engine
+import page_result_cache
+
+
+# 上机实验5豆包的模拟部分：指令序列、页地址流、各算法命中率
+# 不导入 tkinter / matplotlib，可在没有图形界面的环境中直接使用；界面见 上机实验5豆包.py。
+
+
+# 1. 生成指令序列
+def generate_instructions():
+    random.seed()  # 初始化随机数生成器
+    instructions = [0] * 320
+    m = 160  # 起始地址
+
+    for i in range(80):
+        j = i * 4
+        # 顺序执行指令
+        instructions[j] = m
+        instructions[j + 1] = m + 1
+
+        # 生成前地址部分指令（[0, m-1]）
+        instructions[j + 2] = int(instructions[j] * random.random())
+        instructions[j + 2] = max(0, min(instructions[j] - 1, instructions[j + 2]))  # 边界保护
+
+        # 顺序执行下一条
+        instructions[j + 3] = instructions[j + 2] + 1
+
+        # 生成后地址部分指令（(a[j+3], 319]）
+        next_m = instructions[j + 3] + int((319 - instructions[j + 3]) * random.random())
+        m = max(instructions[j + 3] + 1, min(319, next_m))  # 边界保护
+
+    return instructions
+
+
+# 2. 转换为页地址流（每页10条指令）
+def instructions_to_pages(instructions):
+    return [addr // 10 for addr in instructions]
+
+
+# 3. FIFO页面置换算法
+def fifo(page_stream, frame_count):
+    frames = []  # 按进入顺序存储页面
+    page_faults = 0
+    hit_miss = []  # 记录每个页面的命中状态（True=命中，False=缺页）
+
+    for page in page_stream:
+        if page not in frames:
+            page_faults += 1
+            hit_miss.append(False)
+            if len(frames) >= frame_count:
+                frames.pop(0)  # 淘汰队首页面
+            frames.append(page)
+        else:
+            hit_miss.append(True)
+
+    hit_rate = 1 - (page_faults / len(page_stream))
+    return hit_rate, hit_miss
+
+
+# 4. LRU页面置换算法
+def lru(page_stream, frame_count):
+    frames = {}  # {页面: 最后使用时间戳}
+    page_faults = 0
+    hit_miss = []
+    time = 0
+
+    for page in page_stream:
+        time += 1
+        if page in frames:
+            frames[page] = time  # 更新最后使用时间
+            hit_miss.append(True)
+        else:
+            page_faults += 1
+            hit_miss.append(False)
+            if len(frames) >= frame_count:
+                # 淘汰最久未使用的页面
+                lru_page = min(frames, key=frames.get)
+                del frames[lru_page]
+            frames[page] = time
+
+    hit_rate = 1 - (page_faults / len(page_stream))
+    return hit_rate, hit_miss
+
+
+# 5. OPT页面置换算法（最佳淘汰）
+def opt(page_stream, frame_count):
+    # 预先求出每个页面的下一次访问位置，驻留页面按下一次访问位置放入堆中
+    page_faults, hits, _ = engine.simulate_opt(page_stream, frame_count)
+    hit_miss = [bool(hit) for hit in hits]
+
+    hit_rate = 1 - (page_faults / len(page_stream))
+    return hit_rate, hit_miss
+
+
+# 6. LFU页面置换算法（最少访问）
+def lfu(page_stream, frame_count):
+    # 淘汰访问次数最少的，次数相同则淘汰最久未使用的
+    page_faults, hits, _ = engine.simulate_lfu(page_stream, frame_count, tie_break='lru')
+    hit_miss = [bool(hit) for hit in hits]
+
+    hit_rate = 1 - (page_faults / len(page_stream))
+    return hit_rate, hit_miss
+
+
+# 7. 其他页面置换算法（CLOCK、第二次机会、ARC、2Q、LIRS、WSClock，由引擎实现）
+OTHER_ALGORITHMS = [name for name in engine.ALGORITHMS if name not in ("FIFO", "LRU", "OPT", "LFU")]
+
+
+def policy_hit_rate(algorithm, page_stream, frame_count, fingerprint=None):
+    """命中率，同一页地址流的结果从缓存中取 (LFU 次数相同时淘汰最久未使用的)"""
+    params = {'tie_break': 'lru'} if algorithm == 'LFU' else {}
+    page_faults = page_result_cache.fault_count(page_stream, algorithm, frame_count,
+                                                fingerprint=fingerprint, **params)
+    return 1 - (page_faults / len(page_stream))
+
+
+def hit_rate_rows(page_stream, frame_list):
+    """逐个帧数计算各算法的命中率，产生 (帧数, [按 engine.ALGORITHMS 排列的命中率])，保留 4 位小数"""
+    # 页地址流不变时 (如重画图表) 各算法的结果直接从缓存中取出
+    fingerprint = page_result_cache.stream_fingerprint(page_stream)
+    # LRU满足栈性质，用栈距离一次扫描求出所有帧数下的命中次数
+    lru_hits = page_result_cache.lru_hit_counts(page_stream, max(frame_list), fingerprint=fingerprint)
+    # 帧数不少于不同页面数时任何算法都只有首次访问缺页，不必再模拟
+    distinct = len(set(page_stream))
+    cold_rate = round(1 - distinct / len(page_stream), 4)
+    for fc in frame_list:
+        if fc >= distinct:
+            yield fc, [cold_rate] * len(engine.ALGORITHMS)
+            continue
+        rates = []
+        for name in engine.ALGORITHMS:
+            if name == 'LRU':
+                rate = lru_hits[fc] / len(page_stream)
+            else:
+                rate = policy_hit_rate(name, page_stream, fc, fingerprint)
+            rates.append(round(rate, 4))
+        yield fc, rates
+
+
+def hit_rate_table(page_stream, frame_list):
+    """各算法在 frame_list 中每个帧数下的命中率，返回 {算法: [命中率]}"""
+    rates = {name: [] for name in engine.ALGORITHMS}
+    for _, row in hit_rate_rows(page_stream, frame_list):
+        for name, rate in zip(engine.ALGORITHMS, row):
+            rates[name].append(rate)
+    return rates